@@ -0,0 +1,91 @@
+"""
+Gunicorn settings (picked up automatically when gunicorn runs from backend/).
+
+The app is built once in the master (`preload_app`): imports, table/index
+checks and the facet rollup happen a single time, and workers share those pages
+copy-on-write instead of each paying for them. `gc.freeze()` before forking
+keeps the garbage collector from touching, and so copying, the shared objects.
+Every worker disposes the inherited connection pool right after fork so no
+database socket is ever shared between processes.
+
+Each worker runs GUNICORN_THREADS request threads (gthread, default 4). A
+login blocks its thread while the password is hashed, so the hash pool is
+sized against them: unless PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_PENDING
+are set, at most half of a worker's threads hash or wait for a hash and
+further concurrent logins get 503, leaving the rest free for listings.
+
+Workers write their Prometheus metrics to a directory of this server's own
+under METRICS_DIR (default: the temp dir) so /metrics in any worker covers them
+all.
+
+Override with env vars: PORT, WEB_CONCURRENCY, GUNICORN_THREADS,
+GUNICORN_TIMEOUT, GUNICORN_PRELOAD=0.
+"""
+import gc
+import os
+import tempfile
+import time
+
+wsgi_app = 'src.main:create_app()'
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') not in ('0', 'false', 'no')
+accesslog = '-'
+
+# Set before the app is built so config_from_env() sees them
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '1')
+os.environ.setdefault('PASSWORD_HASH_MAX_PENDING',
+                      str(max(0, threads // 2 - int(os.environ['PASSWORD_HASH_WORKERS']))))
+# Metrics snapshots go to a directory of this server's own under METRICS_DIR
+# (or the temp dir); the check keeps a config reload on SIGHUP from nesting it
+_metrics_subdir = f'jobconnect-metrics-{os.getpid()}'
+_metrics_base = os.environ.get('METRICS_DIR') or tempfile.gettempdir()
+if os.path.basename(_metrics_base) != _metrics_subdir:
+    os.environ['METRICS_DIR'] = os.path.join(_metrics_base, _metrics_subdir)
+
+
+def _remove_metrics_snapshots():
+    metrics_dir = os.environ['METRICS_DIR']
+    for name in os.listdir(metrics_dir):
+        if name.endswith(('.json', '.json.tmp')):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def on_starting(server):
+    # Drop snapshots left by an earlier server with the same pid; nothing else is touched
+    os.makedirs(os.environ['METRICS_DIR'], exist_ok=True)
+    _remove_metrics_snapshots()
+
+
+def on_exit(server):
+    _remove_metrics_snapshots()
+    try:
+        os.rmdir(os.environ['METRICS_DIR'])
+    except OSError:
+        pass
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is built, before workers fork
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.monotonic()
+    if preload_app:
+        from src.main import dispose_engines
+        dispose_engines(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    worker.log.info('Worker %s ready in %.3fs', worker.pid, time.monotonic() - worker.forked_at)
+
+
+def worker_exit(server, worker):
+    # Keep the counts since the last periodic flush of a recycled worker
+    from src.services.metrics import metrics
+    metrics.flush(server.app.wsgi())
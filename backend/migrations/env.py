@@ -14,8 +14,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 # Import the db and models
 from models.user import db
-from models.job import Job, Application, SavedJob  # Import all models
+from models.job import Job, Application, SavedJob, Skill, JobSkill, JobFacetCount  # Import all models
 from models.user import User
+from models.upload import FileBlob
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,56 @@
+"""add full-text search index for jobs
+
+Revision ID: 0002_job_search_index
+Revises: add_saved_jobs_001
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '0002_job_search_index'
+down_revision = 'add_saved_jobs_001'
+branch_labels = None
+depends_on = None
+
+PG_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(skills, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if 'jobs' not in inspector.get_table_names():
+        # Table doesn't exist yet, the app creates the index on startup
+        return
+
+    if bind.dialect.name == 'postgresql':
+        cols = [col['name'] for col in inspector.get_columns('jobs')]
+        if 'search_vector' not in cols:
+            op.execute("ALTER TABLE jobs ADD COLUMN search_vector tsvector")
+        op.execute(f"UPDATE jobs SET search_vector = {PG_VECTOR_SQL}")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING gin (search_vector)")
+    elif bind.dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts "
+            "USING fts5(title, description, skills, tokenize='unicode61')"
+        )
+        op.execute("DELETE FROM jobs_fts")
+        op.execute(
+            "INSERT INTO jobs_fts(rowid, title, description, skills) "
+            "SELECT id, title, description, coalesce(skills, '') FROM jobs WHERE is_active = 1"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_jobs_search_vector")
+        op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS search_vector")
+    elif bind.dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS jobs_fts")
@@ -0,0 +1,113 @@
+"""normalize job skills into skills + job_skills
+
+Revision ID: 0003_normalized_skills
+Revises: 0002_job_search_index
+Create Date: 2026-10-16 00:00:00.000000
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '0003_normalized_skills'
+down_revision = '0002_job_search_index'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _parse_skills(value):
+    # Same rules as models.job.parse_skills, frozen here for the migration
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+        items = parsed if isinstance(parsed, list) else value.split(',')
+    except (ValueError, TypeError):
+        items = value.split(',')
+    names = []
+    seen = set()
+    for item in items:
+        name = str(item).strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name[:100])
+    return names
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    tables = inspect(bind).get_table_names()
+
+    if 'skills' not in tables:
+        op.create_table('skills',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('slug', sa.String(length=100), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_skills_slug', 'skills', ['slug'], unique=True)
+
+    if 'job_skills' not in tables:
+        op.create_table('job_skills',
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('skill_id', sa.Integer(), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+            sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+            sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+            sa.PrimaryKeyConstraint('job_id', 'skill_id')
+        )
+        op.create_index('ix_job_skills_skill_job', 'job_skills', ['skill_id', 'job_id'])
+
+    if 'jobs' not in tables:
+        return
+
+    # Backfill from the legacy JSON / comma-separated column
+    skills_table = sa.table('skills', sa.column('id'), sa.column('name'), sa.column('slug'))
+    job_skills_table = sa.table('job_skills', sa.column('job_id'), sa.column('skill_id'), sa.column('position'))
+
+    skill_ids = {row.slug: row.id for row in bind.execute(sa.text("SELECT id, slug FROM skills"))}
+    already_linked = {row.job_id for row in bind.execute(sa.text("SELECT DISTINCT job_id FROM job_skills"))}
+    rows = bind.execute(sa.text("SELECT id, skills FROM jobs WHERE skills IS NOT NULL AND skills != ''")).fetchall()
+
+    parsed = {}
+    for job_id, raw in rows:
+        if job_id in already_linked:
+            continue
+        parsed[job_id] = _parse_skills(raw)
+
+    new_skills = {}
+    for names in parsed.values():
+        for name in names:
+            slug = name.lower()
+            if slug not in skill_ids and slug not in new_skills:
+                new_skills[slug] = name
+    if new_skills:
+        op.bulk_insert(skills_table, [{'name': name, 'slug': slug} for slug, name in new_skills.items()])
+        skill_ids = {row.slug: row.id for row in bind.execute(sa.text("SELECT id, slug FROM skills"))}
+
+    links = []
+    for job_id, names in parsed.items():
+        for position, name in enumerate(names):
+            links.append({'job_id': job_id, 'skill_id': skill_ids[name.lower()], 'position': position})
+            if len(links) >= BATCH_SIZE:
+                op.bulk_insert(job_skills_table, links)
+                links = []
+        # Rewrite the denormalized column in the canonical comma-separated form
+        bind.execute(sa.text("UPDATE jobs SET skills = :skills WHERE id = :id"),
+                     {'skills': ', '.join(names), 'id': job_id})
+    if links:
+        op.bulk_insert(job_skills_table, links)
+
+
+def downgrade() -> None:
+    tables = inspect(op.get_bind()).get_table_names()
+    if 'job_skills' in tables:
+        op.drop_index('ix_job_skills_skill_job', table_name='job_skills')
+        op.drop_table('job_skills')
+    if 'skills' in tables:
+        op.drop_index('ix_skills_slug', table_name='skills')
+        op.drop_table('skills')
@@ -0,0 +1,57 @@
+"""add job_facet_counts rollup
+
+Revision ID: 0004_job_facet_counts
+Revises: 0003_normalized_skills
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '0004_job_facet_counts'
+down_revision = '0003_normalized_skills'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    tables = inspect(bind).get_table_names()
+
+    if 'job_facet_counts' not in tables:
+        op.create_table('job_facet_counts',
+            sa.Column('facet', sa.String(length=20), nullable=False),
+            sa.Column('value', sa.String(length=200), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('facet', 'value')
+        )
+
+    if 'jobs' not in tables:
+        return
+
+    # Backfill from the current active jobs
+    active = {'active': True}
+    op.execute("DELETE FROM job_facet_counts")
+    bind.execute(sa.text(
+        "INSERT INTO job_facet_counts (facet, value, count) "
+        "SELECT 'job_type', job_type, count(*) FROM jobs "
+        "WHERE is_active = :active AND job_type IS NOT NULL AND job_type != '' GROUP BY job_type"
+    ), active)
+    bind.execute(sa.text(
+        "INSERT INTO job_facet_counts (facet, value, count) "
+        "SELECT 'location', location, count(*) FROM jobs "
+        "WHERE is_active = :active AND location IS NOT NULL AND location != '' GROUP BY location"
+    ), active)
+    bind.execute(sa.text(
+        "INSERT INTO job_facet_counts (facet, value, count) "
+        "SELECT 'skills', skills.name, count(*) FROM job_skills "
+        "JOIN skills ON skills.id = job_skills.skill_id "
+        "JOIN jobs ON jobs.id = job_skills.job_id "
+        "WHERE jobs.is_active = :active GROUP BY skills.name"
+    ), active)
+
+
+def downgrade() -> None:
+    if 'job_facet_counts' in inspect(op.get_bind()).get_table_names():
+        op.drop_table('job_facet_counts')
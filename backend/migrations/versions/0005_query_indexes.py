@@ -0,0 +1,50 @@
+"""add secondary indexes for listing and auth queries
+
+Revision ID: 0005_query_indexes
+Revises: 0004_job_facet_counts
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '0005_query_indexes'
+down_revision = '0004_job_facet_counts'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial predicate per dialect)
+INDEXES = [
+    ('ix_jobs_active_created_at', 'jobs', ['created_at', 'id'],
+     {'postgresql_where': sa.text('is_active = true'), 'sqlite_where': sa.text('is_active = 1')}),
+    ('ix_jobs_employer_active_created_at', 'jobs', ['employer_id', 'is_active', 'created_at'], {}),
+    ('ix_applications_applicant_applied_at', 'applications', ['applicant_id', 'applied_at'], {}),
+    ('ix_applications_job_applied_at', 'applications', ['job_id', 'applied_at'], {}),
+    ('ix_saved_jobs_user_saved_at', 'saved_jobs', ['user_id', 'saved_at'], {}),
+    ('ix_refresh_tokens_user_revoked', 'refresh_tokens', ['user_id', 'revoked'], {}),
+]
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    for name, table, columns, kwargs in INDEXES:
+        if table not in tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        table_columns = {col['name'] for col in inspector.get_columns(table)}
+        # Skip tables whose columns predate the current models
+        if name in existing or not set(columns) <= table_columns:
+            continue
+        op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    for name, table, _, _ in reversed(INDEXES):
+        if table in tables and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
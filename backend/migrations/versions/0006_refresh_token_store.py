@@ -0,0 +1,120 @@
+"""hash refresh tokens, add rotation families and purge indexes
+
+Revision ID: 0006_refresh_token_store
+Revises: 0005_query_indexes
+Create Date: 2026-10-16 00:00:00.000000
+"""
+import hashlib
+import uuid
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '0006_refresh_token_store'
+down_revision = '0005_query_indexes'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+INDEXES = [
+    ('ix_refresh_tokens_family_id', ['family_id']),
+    ('ix_refresh_tokens_revoked_at', ['revoked_at']),
+    ('ix_refresh_tokens_expires_at', ['expires_at']),
+    ('ix_refresh_tokens_user_revoked', ['user_id', 'revoked']),
+]
+
+
+def _create_indexes(inspector):
+    existing = {index['name'] for index in inspector.get_indexes('refresh_tokens')}
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, 'refresh_tokens', columns)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    tables = inspector.get_table_names()
+
+    # The table was only ever created by db.create_all(); create it here if missing
+    if 'refresh_tokens' not in tables:
+        op.create_table('refresh_tokens',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('token_hash', sa.String(length=64), nullable=False),
+            sa.Column('family_id', sa.String(length=32), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('revoked', sa.Boolean(), nullable=True),
+            sa.Column('revoked_at', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('token_hash')
+        )
+        _create_indexes(inspect(bind))
+        return
+
+    columns = {col['name'] for col in inspector.get_columns('refresh_tokens')}
+    if 'token_hash' in columns:
+        _create_indexes(inspector)
+        return
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.add_column(sa.Column('token_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('family_id', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('revoked_at', sa.DateTime(), nullable=True))
+
+    # Hash existing cookies in place so current sessions survive; each legacy
+    # token becomes its own family
+    now = datetime.utcnow()
+    select_batch = sa.text("SELECT id, token, revoked FROM refresh_tokens WHERE id > :after "
+                           "ORDER BY id LIMIT :limit")
+    statement = sa.text("UPDATE refresh_tokens SET token_hash = :token_hash, family_id = :family_id, "
+                        "revoked_at = :revoked_at WHERE id = :id")
+    # Keyset batches by id so a large table is never held in memory at once
+    last_id = 0
+    while True:
+        rows = bind.execute(select_batch, {'after': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(statement, [{
+            'id': row.id,
+            'token_hash': hashlib.sha256(row.token.encode()).hexdigest(),
+            'family_id': uuid.uuid4().hex,
+            'revoked_at': now if row.revoked else None,
+        } for row in rows])
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_column('token')
+        batch_op.alter_column('token_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.alter_column('family_id', existing_type=sa.String(length=32), nullable=False)
+        batch_op.create_unique_constraint('uq_refresh_tokens_token_hash', ['token_hash'])
+
+    _create_indexes(inspect(bind))
+
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if 'refresh_tokens' not in inspector.get_table_names():
+        return
+    columns = {col['name'] for col in inspector.get_columns('refresh_tokens')}
+    if 'token_hash' not in columns:
+        return
+
+    existing = {index['name'] for index in inspector.get_indexes('refresh_tokens')}
+    for name, _ in INDEXES[:3]:
+        if name in existing:
+            op.drop_index(name, table_name='refresh_tokens')
+
+    # Raw tokens cannot be recovered: the hashes are kept as unusable values,
+    # so every session has to log in again after a downgrade
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.alter_column('token_hash', new_column_name='token', existing_type=sa.String(length=64),
+                              type_=sa.String(length=128), existing_nullable=False)
+        batch_op.drop_column('family_id')
+        batch_op.drop_column('revoked_at')
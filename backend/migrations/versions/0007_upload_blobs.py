@@ -0,0 +1,56 @@
+"""content-addressed upload blobs with reference counts
+
+Revision ID: 0007_upload_blobs
+Revises: 0006_refresh_token_store
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '0007_upload_blobs'
+down_revision = '0006_refresh_token_store'
+branch_labels = None
+depends_on = None
+
+USER_COLUMNS = ['resume_sha256', 'company_logo_sha256']
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if 'file_blobs' not in inspector.get_table_names():
+        op.create_table('file_blobs',
+            sa.Column('sha256', sa.String(length=64), nullable=False),
+            sa.Column('size', sa.BigInteger(), nullable=False),
+            sa.Column('content_type', sa.String(length=100), nullable=True),
+            sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('sha256')
+        )
+
+    # Existing uploads keep their files in uploads/ and are served from there
+    # until they are replaced; only new uploads get a blob reference.
+    existing = {column['name'] for column in inspector.get_columns('users')}
+    missing = [name for name in USER_COLUMNS if name not in existing]
+    if missing:
+        with op.batch_alter_table('users') as batch_op:
+            for name in missing:
+                batch_op.add_column(sa.Column(name, sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    existing = {column['name'] for column in inspector.get_columns('users')}
+    present = [name for name in USER_COLUMNS if name in existing]
+    if present:
+        with op.batch_alter_table('users') as batch_op:
+            for name in present:
+                batch_op.drop_column(name)
+
+    if 'file_blobs' in inspector.get_table_names():
+        op.drop_table('file_blobs')
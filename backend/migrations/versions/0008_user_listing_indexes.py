@@ -0,0 +1,35 @@
+"""add indexes for the paginated admin user listing
+
+Revision ID: 0008_user_listing_indexes
+Revises: 0007_upload_blobs
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '0008_user_listing_indexes'
+down_revision = '0007_upload_blobs'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_users_created_at', ['created_at', 'id']),
+    ('ix_users_role_created_at', ['role', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing = {index['name'] for index in inspector.get_indexes('users')}
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, 'users', columns)
+
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing = {index['name'] for index in inspector.get_indexes('users')}
+    for name, _ in reversed(INDEXES):
+        if name in existing:
+            op.drop_index(name, table_name='users')
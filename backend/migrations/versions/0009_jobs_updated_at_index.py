@@ -0,0 +1,29 @@
+"""add an index on jobs.updated_at for the recommendation sync
+
+Revision ID: 0009_jobs_updated_at_index
+Revises: 0008_user_listing_indexes
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '0009_jobs_updated_at_index'
+down_revision = '0008_user_listing_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing = {index['name'] for index in inspector.get_indexes('jobs')}
+    columns = {col['name'] for col in inspector.get_columns('jobs')}
+    # Skip tables whose columns predate the current models
+    if 'ix_jobs_updated_at' not in existing and 'updated_at' in columns:
+        op.create_index('ix_jobs_updated_at', 'jobs', ['updated_at'])
+
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if 'ix_jobs_updated_at' in {index['name'] for index in inspector.get_indexes('jobs')}:
+        op.drop_index('ix_jobs_updated_at', table_name='jobs')
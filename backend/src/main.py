@@ -3,79 +3,212 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask, current_app
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from src.models.user import db
 from src.models.job import Job, Application
+from src.models.upload import FileBlob
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.jobs import jobs_bp
+from src.routes.system import system_bp
+from src.routes.health import health_bp
+from src.services.search import search_index
+from src.services.cache import response_cache
+from src.services.tokens import refresh_tokens
+from src.services.passwords import password_hasher
+from src.services.storage import upload_storage
+from src.services.static_files import static_files
+from src.services.recommendations import job_recommender
+from src.services.db_pool import engine_options_from_env, pool_metrics
+from src.services.query_stats import query_stats
+from src.services.metrics import metrics
+from src.services.facets import ensure_rollup as ensure_facet_rollup
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
-app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-string')
-
-# Initialize CORS (allow credentials for refresh token cookie)
-CORS(app, supports_credentials=True)
-
-# Initialize JWT
-jwt = JWTManager(app)
-
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(user_bp, url_prefix='/api/users')
-app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
-
-# Database configuration
-# Use PostgreSQL in production (Render), SQLite for local development
-database_url = os.environ.get('DATABASE_URL')
-if database_url:
-    # Render provides DATABASE_URL, use PostgreSQL
-    # Fix for SQLAlchemy 1.4+ (postgres:// -> postgresql://)
-    if database_url.startswith('postgres://'):
-        database_url = database_url.replace('postgres://', 'postgresql://', 1)
-    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-else:
+
+def _database_uri():
+    # Use PostgreSQL in production (Render), SQLite for local development
+    database_url = os.environ.get('DATABASE_URL')
+    if database_url:
+        # Render provides DATABASE_URL, use PostgreSQL
+        # Fix for SQLAlchemy 1.4+ (postgres:// -> postgresql://)
+        if database_url.startswith('postgres://'):
+            database_url = database_url.replace('postgres://', 'postgresql://', 1)
+        return database_url
     # Local development with SQLite
     db_path = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
+    return f"sqlite:///{db_path}"
+
+
+def config_from_env():
+    """Settings read from the environment; `create_app(config)` overrides them."""
+    return {
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT'),
+        'JWT_SECRET_KEY': os.environ.get('JWT_SECRET_KEY', 'jwt-secret-string'),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        # Response cache for anonymous job listings/details.
+        # With the per-process memory backend CACHE_TTL bounds how long another
+        # worker may serve a job that was just edited; use redis to share invalidations.
+        'CACHE_BACKEND': os.environ.get('CACHE_BACKEND', 'redis' if os.environ.get('CACHE_REDIS_URL') else 'memory'),
+        'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL'),
+        'CACHE_TTL': int(os.environ.get('CACHE_TTL', 30)),
+        'CACHE_MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 1024)),
+        # Expired/revoked refresh tokens are purged by
+        # `flask --app src.main purge-refresh-tokens` or, when this is set
+        # (seconds), by a background thread.
+        'REFRESH_TOKEN_PURGE_INTERVAL': int(os.environ.get('REFRESH_TOKEN_PURGE_INTERVAL', 0)),
+        # Password hashing policy and per-process concurrency cap. Stored hashes
+        # below PASSWORD_HASH_METHOD are upgraded on the next successful login.
+        'PASSWORD_HASH_METHOD': os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'),
+        'PASSWORD_HASH_WORKERS': int(os.environ.get('PASSWORD_HASH_WORKERS', 2)),
+        'PASSWORD_HASH_MAX_PENDING': int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 16)),
+        # Uploads: bodies over MAX_CONTENT_LENGTH are refused from their
+        # Content-Length; a single file is cut off once it streams past
+        # UPLOAD_MAX_FILE_BYTES. UPLOAD_STORAGE is `local` or `s3`.
+        'MAX_CONTENT_LENGTH': int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024)),
+        'UPLOAD_MAX_FILE_BYTES': int(os.environ.get('UPLOAD_MAX_FILE_BYTES', 5 * 1024 * 1024)),
+        'UPLOAD_STORAGE': os.environ.get('UPLOAD_STORAGE', 'local'),
+        'UPLOAD_STORAGE_PATH': os.environ.get('UPLOAD_STORAGE_PATH',
+                                              os.path.join(os.path.dirname(__file__), 'uploads', 'blobs')),
+        'UPLOAD_S3_ENDPOINT': os.environ.get('UPLOAD_S3_ENDPOINT'),
+        'UPLOAD_S3_BUCKET': os.environ.get('UPLOAD_S3_BUCKET'),
+        'UPLOAD_S3_REGION': os.environ.get('UPLOAD_S3_REGION', 'us-east-1'),
+        'UPLOAD_S3_ACCESS_KEY': os.environ.get('UPLOAD_S3_ACCESS_KEY'),
+        'UPLOAD_S3_SECRET_KEY': os.environ.get('UPLOAD_S3_SECRET_KEY'),
+        'UPLOAD_S3_PREFIX': os.environ.get('UPLOAD_S3_PREFIX', ''),
+        # `app`, or `x-accel-redirect` / `x-sendfile` to let a fronting proxy
+        # send resume and logo bytes (see services/storage.py)
+        'UPLOAD_DELIVERY': os.environ.get('UPLOAD_DELIVERY', 'app'),
+        'UPLOAD_ACCEL_PREFIX': os.environ.get('UPLOAD_ACCEL_PREFIX', '/_protected_uploads'),
+        # Most rows accepted by POST /api/jobs/bulk (the body is also capped by MAX_CONTENT_LENGTH)
+        'JOB_IMPORT_MAX_ROWS': int(os.environ.get('JOB_IMPORT_MAX_ROWS', 5000)),
+        # Most ids accepted by PUT /api/jobs/<id>/applications/status
+        'APPLICATION_STATUS_MAX_IDS': int(os.environ.get('APPLICATION_STATUS_MAX_IDS', 1000)),
+        # How often each worker picks up jobs changed by other workers for
+        # GET /api/jobs/recommended
+        'RECOMMEND_SYNC_SECONDS': float(os.environ.get('RECOMMEND_SYNC_SECONDS', 30)),
+        # Browser cache lifetime of index.html and of non-fingerprinted static
+        # files; fingerprinted build assets are always cached as immutable.
+        'STATIC_INDEX_MAX_AGE': int(os.environ.get('STATIC_INDEX_MAX_AGE', 60)),
+        'STATIC_DEFAULT_MAX_AGE': int(os.environ.get('STATIC_DEFAULT_MAX_AGE', 3600)),
+        # SQL instrumentation (services/query_stats.py): Server-Timing header
+        # with per-request DB time, and slow statement / slow request logs
+        'SQL_SERVER_TIMING': os.environ.get('SQL_SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes', 'on'),
+        'SLOW_QUERY_MS': float(os.environ.get('SLOW_QUERY_MS', 100)),
+        'SLOW_REQUEST_DB_MS': float(os.environ.get('SLOW_REQUEST_DB_MS', 500)),
+        # Prometheus /metrics: each gunicorn worker writes its numbers to
+        # METRICS_DIR (set by gunicorn.conf.py) so any worker can report all of
+        # them. METRICS_TOKEN, when set, is required as a Bearer token.
+        'METRICS_DIR': os.environ.get('METRICS_DIR'),
+        'METRICS_FLUSH_SECONDS': float(os.environ.get('METRICS_FLUSH_SECONDS', 5)),
+        'METRICS_TOKEN': os.environ.get('METRICS_TOKEN'),
+    }
+
+
+def create_app(config=None):
+    """Build the Flask app; `config` (a dict) overrides settings from the environment."""
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config.update(config_from_env())
+    if config:
+        app.config.update(config)
+
+    # Initialize CORS (allow credentials for refresh token cookie)
+    CORS(app, supports_credentials=True)
+
+    # Initialize JWT
+    JWTManager(app)
+
+    # Registered first so request timing covers the other before/after hooks
+    metrics.init_app(app)
+
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(user_bp, url_prefix='/api/users')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    app.register_blueprint(system_bp, url_prefix='/api/system')
+    app.register_blueprint(health_bp)
+
+    # Database configuration
+    if not app.config.get('SQLALCHEMY_DATABASE_URI'):
+        app.config['SQLALCHEMY_DATABASE_URI'] = _database_uri()
+    use_sqlite = app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite')
+    # Pool sizing from DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT / DB_POOL_RECYCLE / DB_POOL_PRE_PING
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS',
+                          engine_options_from_env(os.environ, app.config['SQLALCHEMY_DATABASE_URI']))
+    db.init_app(app)
+    pool_metrics.init_app(app, db)
+    query_stats.init_app(app, db)
 
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+    response_cache.init_app(app)
+    refresh_tokens.init_app(app)
+    password_hasher.init_app(app)
 
-# Create upload directory
-upload_dir = os.path.join(os.path.dirname(__file__), 'uploads')
-os.makedirs(upload_dir, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = upload_dir
+    # Create upload directory
+    upload_dir = os.path.join(os.path.dirname(__file__), 'uploads')
+    os.makedirs(upload_dir, exist_ok=True)
+    app.config['UPLOAD_FOLDER'] = upload_dir
+    upload_storage.init_app(app)
 
-# Only create tables if using SQLite (for PostgreSQL, use Alembic migrations)
-if not database_url:
+    # Only create tables if using SQLite (for PostgreSQL, use Alembic migrations)
+    if use_sqlite:
+        with app.app_context():
+            db.create_all()
+            ensure_facet_rollup(db.session)
+
+    # Full-text search index (FTS5 table is created here for SQLite; the
+    # PostgreSQL tsvector column and GIN index come from the Alembic migration)
+    search_index.init_app(app, db=db if use_sqlite else None)
+    job_recommender.init_app(app)
+
+    # Manifest of the frontend build, scanned once instead of on every request
+    static_files.init_app(app)
+    app.add_url_rule('/', 'serve', serve, defaults={'path': ''})
+    app.add_url_rule('/<path:path>', 'serve', serve)
+    return app
+
+
+def dispose_engines(app):
+    """Forget pooled connections inherited from the parent process without closing them.
+
+    Called in each gunicorn worker right after fork when the app is preloaded:
+    the parent's sockets are left alone and the worker opens its own.
+    """
     with app.app_context():
-        db.create_all()
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
 def serve(path):
     # Don't serve API routes as static files
     if path.startswith('api/'):
         return "API endpoint not found", 404
-        
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+
+    if current_app.static_folder is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
+    asset = static_files.lookup(path) if path != "" else None
+    if asset is not None:
+        return static_files.send(asset, path)
     else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+        index = static_files.lookup('index.html')
+        if index is not None:
+            return static_files.send(index, 'index.html')
         else:
             return "index.html not found", 404
 
 
+def __getattr__(name):
+    # `src.main:app` (gunicorn, flask --app) keeps working, while importing this
+    # module just for create_app() no longer builds an app as a side effect
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
-    app.run(debug=False, host='0.0.0.0', port=port)
+    create_app().run(debug=False, host='0.0.0.0', port=port)
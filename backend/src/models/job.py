@@ -1,13 +1,88 @@
+import json
 from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload, selectinload
 from src.models.user import db
 
+_INSERT_SKILL_SQL = text("INSERT INTO skills (name, slug) VALUES (:name, :slug) ON CONFLICT (slug) DO NOTHING")
+
+def parse_skills(value):
+    """Normalize skills given as a list, a JSON array string or a comma-separated string.
+
+    Returns display names with surrounding whitespace removed and case-insensitive
+    duplicates dropped, preserving the original order.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+            value = parsed if isinstance(parsed, list) else value.split(',')
+        except (json.JSONDecodeError, TypeError):
+            value = value.split(',')
+    names = []
+    seen = set()
+    for item in value:
+        name = str(item).strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name[:100])
+    return names
+
+class Skill(db.Model):
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)  # Display name as first entered
+    slug = db.Column(db.String(100), unique=True, nullable=False, index=True)  # Lowercased lookup key
+    
+    @staticmethod
+    def slugify(name):
+        return name.strip().lower()
+    
+    @classmethod
+    def insert_missing(cls, rows):
+        """Insert `rows` ({'name', 'slug'}) whose slug is not taken yet.
+
+        ON CONFLICT DO NOTHING instead of select-then-insert, so two requests
+        adding the same new skill at once both end up using the one row.
+        """
+        if rows:
+            db.session.execute(_INSERT_SKILL_SQL, rows)
+
+    @classmethod
+    def get_or_create_many(cls, names):
+        """Return Skill rows for `names` (in order), creating missing ones race-free."""
+        slugs = [cls.slugify(name) for name in names]
+        existing = {skill.slug: skill for skill in cls.query.filter(cls.slug.in_(slugs)).all()} if slugs else {}
+        missing = {}
+        for name, slug in zip(names, slugs):
+            if slug not in existing:
+                missing.setdefault(slug, name)
+        if missing:
+            cls.insert_missing([{'name': name, 'slug': slug} for slug, name in missing.items()])
+            existing.update((skill.slug, skill) for skill in cls.query.filter(cls.slug.in_(list(missing))))
+        return [existing[slug] for slug in slugs]
+
+class JobSkill(db.Model):
+    __tablename__ = 'job_skills'
+    
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)  # Order as entered by the employer
+    
+    skill = db.relationship('Skill')
+    
+    # Facet filtering looks jobs up by skill
+    __table_args__ = (db.Index('ix_job_skills_skill_job', 'skill_id', 'job_id'),)
+
 class Job(db.Model):
     __tablename__ = 'jobs'
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    skills = db.Column(db.String(500), nullable=True)  # Comma-separated skills
+    skills = db.Column(db.String(500), nullable=True)  # Comma-separated skills (denormalized for search)
     job_type = db.Column(db.String(50), nullable=False)  # Full-time, Part-time, Contract, etc.
     location = db.Column(db.String(200), nullable=False)
     deadline = db.Column(db.Date, nullable=True)
@@ -27,18 +102,27 @@ class Job(db.Model):
     # Relationship to saved jobs
     saved_by = db.relationship('SavedJob', backref='job', lazy=True, cascade='all, delete-orphan')
     
+    # Normalized skills: rows to write, and a read-only ordered view of the skills
+    job_skills = db.relationship('JobSkill', lazy=True, cascade='all, delete-orphan',
+                                 order_by='JobSkill.position')
+    skill_list = db.relationship('Skill', secondary='job_skills', lazy=True, viewonly=True,
+                                 order_by='JobSkill.position')
+    
+    @classmethod
+    def serialization_options(cls):
+        """Loader options for the relationships touched by to_dict()."""
+        return [joinedload(cls.employer), selectinload(cls.skill_list)]
+    
+    def set_skills(self, value):
+        """Replace the job's skills from a list, JSON array or comma-separated string."""
+        names = parse_skills(value)
+        skills = Skill.get_or_create_many(names)
+        self.job_skills = [JobSkill(skill=skill, position=position) for position, skill in enumerate(skills)]
+        self.skills = ', '.join(names)
+        # Keep the read-only view in step for serialization in this request
+        self.skill_list = skills
+    
     def to_dict(self):
-        # Handle skills - check if it's JSON or comma-separated
-        skills_list = []
-        if self.skills:
-            try:
-                import json
-                # Try to parse as JSON first
-                skills_list = json.loads(self.skills) if isinstance(self.skills, str) else self.skills
-            except (json.JSONDecodeError, TypeError):
-                # Fall back to comma-separated
-                skills_list = [s.strip() for s in self.skills.split(',') if s.strip()]
-        
         # Get employer name with fallback
         employer_name = None
         if self.employer:
@@ -48,7 +132,7 @@ class Job(db.Model):
             'id': self.id,
             'title': self.title,
             'description': self.description,
-            'skills': skills_list,
+            'skills': [skill.name for skill in self.skill_list],
             'job_type': self.job_type,
             'location': self.location,
             'deadline': self.deadline.isoformat() if self.deadline else None,
@@ -59,11 +143,21 @@ class Job(db.Model):
             'employer_name': employer_name
         }
 
+# Public listing: active jobs newest first (also serves keyset pagination)
+db.Index('ix_jobs_active_created_at', Job.created_at, Job.id,
+         postgresql_where=Job.is_active == True, sqlite_where=Job.is_active == True)
+# Employer's own postings
+db.Index('ix_jobs_employer_active_created_at', Job.employer_id, Job.is_active, Job.created_at)
+# Incremental sync of the recommendation model
+db.Index('ix_jobs_updated_at', Job.updated_at)
+
+APPLICATION_STATUSES = ('Applied', 'Under Review', 'Accepted', 'Rejected')
+
 class Application(db.Model):
     __tablename__ = 'applications'
     
     id = db.Column(db.Integer, primary_key=True)
-    status = db.Column(db.String(50), default='Applied')  # Applied, Under Review, Accepted, Rejected
+    status = db.Column(db.String(50), default='Applied')  # One of APPLICATION_STATUSES
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     cover_letter = db.Column(db.Text, nullable=True)
@@ -76,7 +170,17 @@ class Application(db.Model):
     applicant = db.relationship('User', backref=db.backref('applications', lazy=True))
     
     # Unique constraint to prevent duplicate applications
-    __table_args__ = (db.UniqueConstraint('job_id', 'applicant_id', name='unique_job_applicant'),)
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'applicant_id', name='unique_job_applicant'),
+        # my-applications and per-job application listings, newest first
+        db.Index('ix_applications_applicant_applied_at', 'applicant_id', 'applied_at'),
+        db.Index('ix_applications_job_applied_at', 'job_id', 'applied_at'),
+    )
+    
+    @classmethod
+    def serialization_options(cls):
+        """Loader options for the relationships touched by to_dict()."""
+        return [joinedload(cls.job), joinedload(cls.applicant)]
     
     def to_dict(self):
         return {
@@ -106,7 +210,19 @@ class SavedJob(db.Model):
     user = db.relationship('User', backref=db.backref('saved_jobs', lazy=True))
     
     # Unique constraint to prevent duplicate saves
-    __table_args__ = (db.UniqueConstraint('job_id', 'user_id', name='unique_saved_job'),)
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'user_id', name='unique_saved_job'),
+        # Saved-jobs listing, newest first
+        db.Index('ix_saved_jobs_user_saved_at', 'user_id', 'saved_at'),
+    )
+    
+    @classmethod
+    def serialization_options(cls, job_loader=joinedload):
+        """Loader options for to_dict(), including the nested job's relationships.
+
+        Pass `job_loader=contains_eager` when the query already joins `jobs`.
+        """
+        return [job_loader(cls.job).options(*Job.serialization_options())]
     
     def to_dict(self):
         return {
@@ -117,3 +233,11 @@ class SavedJob(db.Model):
             'job': self.job.to_dict() if self.job else None
         }
 
+
+class JobFacetCount(db.Model):
+    """Rollup of active job counts per facet value, maintained by services.facets."""
+    __tablename__ = 'job_facet_counts'
+    
+    facet = db.Column(db.String(20), primary_key=True)  # job_type, location, skills
+    value = db.Column(db.String(200), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
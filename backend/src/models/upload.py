@@ -0,0 +1,19 @@
+from datetime import datetime
+from src.models.user import db
+
+class FileBlob(db.Model):
+    """A stored upload, addressed by the SHA-256 of its content.
+
+    `ref_count` is the number of user fields (resume, logo) pointing at the
+    blob; identical files uploaded by several users are stored once.
+    """
+    __tablename__ = 'file_blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<FileBlob {self.sha256[:12]} refs={self.ref_count}>'
@@ -1,6 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+try:
+    from src.services.passwords import password_hasher
+except ModuleNotFoundError:
+    # create_admin_production.py puts backend/src itself on sys.path
+    from services.passwords import password_hasher
 
 db = SQLAlchemy()
 
@@ -22,21 +26,37 @@ class User(db.Model):
     education = db.Column(db.Text, nullable=True)
     experience = db.Column(db.Text, nullable=True)
     resume_filename = db.Column(db.String(255), nullable=True)
+    resume_sha256 = db.Column(db.String(64), nullable=True)  # blob in services.storage
     
     # Employer specific fields
     company_name = db.Column(db.String(200), nullable=True)
     company_description = db.Column(db.Text, nullable=True)
     company_logo_filename = db.Column(db.String(255), nullable=True)
+    company_logo_sha256 = db.Column(db.String(64), nullable=True)
     company_website = db.Column(db.String(255), nullable=True)
 
+    __table_args__ = (
+        # Admin user listing, newest first, optionally for one role
+        db.Index('ix_users_created_at', 'created_at', 'id'),
+        db.Index('ix_users_role_created_at', 'role', 'created_at'),
+    )
+
     def __repr__(self):
         return f'<User {self.email}>'
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def rehash_password_if_needed(self, password):
+        """Re-hash under the current policy; call only after check_password succeeded."""
+        if not password_hasher.needs_rehash(self.password_hash):
+            return False
+        self.set_password(password)
+        password_hasher.stats.incr('rehashes')
+        return True
 
     def to_dict(self):
         base_dict = {
@@ -64,13 +84,20 @@ class RefreshToken(db.Model):
     __tablename__ = 'refresh_tokens'
 
     id = db.Column(db.Integer, primary_key=True)
-    token = db.Column(db.String(128), unique=True, nullable=False)
+    # SHA-256 of the cookie value; the raw token is never stored
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)
+    # All tokens rotated from one login share a family
+    family_id = db.Column(db.String(32), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     revoked = db.Column(db.Boolean, default=False)
+    revoked_at = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
 
     user = db.relationship('User', backref=db.backref('refresh_tokens', lazy=True))
 
+    # Logout revokes all live tokens of a user
+    __table_args__ = (db.Index('ix_refresh_tokens_user_revoked', 'user_id', 'revoked'),)
+
     def __repr__(self):
-        return f'<RefreshToken {self.token[:8]} for user {self.user_id}>'
+        return f'<RefreshToken {self.token_hash[:8]} for user {self.user_id}>'
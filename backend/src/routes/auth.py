@@ -1,12 +1,19 @@
 from flask import Blueprint, request, jsonify, make_response
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, verify_jwt_in_request
-from src.models.user import db, User, RefreshToken
-from datetime import datetime, timedelta
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from src.models.user import db, User
+from src.services.access import create_user_access_token
+from src.services.passwords import PasswordHasherBusy
+from src.services.tokens import refresh_tokens, InvalidRefreshToken
+from src.services.conditional import user_validators, not_modified, apply_validators
 import re
-import uuid
 
 auth_bp = Blueprint('auth', __name__)
 
+def _hasher_busy(error):
+    resp = make_response(jsonify({'error': str(error)}), 503)
+    resp.headers['Retry-After'] = '1'
+    return resp
+
 def validate_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
@@ -58,13 +65,10 @@ def register():
         db.session.commit()
         
         # Create access token
-        access_token = create_access_token(identity=str(user.id))
+        access_token = create_user_access_token(user)
 
-        # Create refresh token record and set cookie
-        refresh_token_value = uuid.uuid4().hex
-        expires = datetime.utcnow() + timedelta(days=7)
-        rt = RefreshToken(token=refresh_token_value, user_id=user.id, expires_at=expires)
-        db.session.add(rt)
+        # Start a refresh token family and set cookie
+        refresh_token_value = refresh_tokens.issue(user.id)
         db.session.commit()
 
         resp = make_response(jsonify({
@@ -76,6 +80,9 @@ def register():
         resp.set_cookie('refresh_token', refresh_token_value, httponly=True, samesite='Lax')
         return resp
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return _hasher_busy(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Registration failed', 'details': str(e)}), 500
@@ -100,14 +107,14 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
+        # Upgrade hashes made under an older cost policy while the password is at hand
+        user.rehash_password_if_needed(password)
+        
         # Create access token
-        access_token = create_access_token(identity=str(user.id))
+        access_token = create_user_access_token(user)
 
-        # Create refresh token record and set cookie
-        refresh_token_value = uuid.uuid4().hex
-        expires = datetime.utcnow() + timedelta(days=7)
-        rt = RefreshToken(token=refresh_token_value, user_id=user.id, expires_at=expires)
-        db.session.add(rt)
+        # Start a refresh token family and set cookie
+        refresh_token_value = refresh_tokens.issue(user.id)
         db.session.commit()
 
         resp = make_response(jsonify({
@@ -118,7 +125,10 @@ def login():
         resp.set_cookie('refresh_token', refresh_token_value, httponly=True, samesite='Lax')
         return resp
         
+    except PasswordHasherBusy as e:
+        return _hasher_busy(e)
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Login failed', 'details': str(e)}), 500
 
 @auth_bp.route('/me', methods=['GET'])
@@ -126,12 +136,22 @@ def login():
 def get_current_user():
     try:
         current_user_id = get_jwt_identity()
+        
+        # Answer revalidations from the updated_at column alone
+        validators = user_validators(current_user_id)
+        if not validators:
+            return jsonify({'error': 'User not found'}), 404
+        unchanged = not_modified(*validators, private=True)
+        if unchanged:
+            return unchanged
+        
         user = User.query.get(current_user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify({'user': user.to_dict()}), 200
+        resp = make_response(jsonify({'user': user.to_dict()}), 200)
+        return apply_validators(resp, *validators, private=True)
         
     except Exception as e:
         return jsonify({'error': 'Failed to get user info', 'details': str(e)}), 500
@@ -143,26 +163,14 @@ def refresh():
         if not refresh_token_value:
             return jsonify({'error': 'Refresh token missing'}), 401
 
-        rt = RefreshToken.query.filter_by(token=refresh_token_value, revoked=False).first()
-        if not rt:
-            return jsonify({'error': 'Invalid refresh token'}), 401
-
-        if rt.expires_at < datetime.utcnow():
-            return jsonify({'error': 'Refresh token expired'}), 401
-
-        user = User.query.get(rt.user_id)
-        if not user or not user.is_active:
-            return jsonify({'error': 'User not found or inactive'}), 401
-
-        # Rotate refresh token: revoke old and issue a new one
-        rt.revoked = True
-        new_refresh_value = uuid.uuid4().hex
-        expires = datetime.utcnow() + timedelta(days=7)
-        new_rt = RefreshToken(token=new_refresh_value, user_id=user.id, expires_at=expires)
-        db.session.add(new_rt)
+        # Rotate refresh token: revoke the presented one and issue its successor
+        try:
+            user, new_refresh_value = refresh_tokens.rotate(refresh_token_value)
+        except InvalidRefreshToken as e:
+            return jsonify({'error': str(e)}), 401
         db.session.commit()
 
-        access_token = create_access_token(identity=str(user.id))
+        access_token = create_user_access_token(user)
         resp = make_response(jsonify({'access_token': access_token}), 200)
         resp.set_cookie('refresh_token', new_refresh_value, httponly=True, samesite='Lax')
         return resp
@@ -181,9 +189,7 @@ def logout():
         # Attempt to revoke by cookie token if present
         refresh_token_value = request.cookies.get('refresh_token')
         if refresh_token_value:
-            rt = RefreshToken.query.filter_by(token=refresh_token_value, revoked=False).first()
-            if rt:
-                rt.revoked = True
+            if refresh_tokens.revoke(refresh_token_value):
                 db.session.commit()
 
         # Also support logout via Authorization header: if an access token
@@ -194,7 +200,7 @@ def logout():
             current_user_id = get_jwt_identity()
             if current_user_id:
                 # Revoke any non-revoked refresh tokens for this user
-                RefreshToken.query.filter_by(user_id=int(current_user_id), revoked=False).update({'revoked': True})
+                refresh_tokens.revoke_user(int(current_user_id))
                 db.session.commit()
         except Exception:
             # ignore token parsing/verification errors and continue with cookie-based logout
@@ -0,0 +1,38 @@
+import hmac
+from flask import Blueprint, Response, request, jsonify, current_app
+from sqlalchemy import text
+from src.models.user import db
+from src.services.metrics import metrics
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness for load balancers: one round trip to the database, nothing on disk"""
+    try:
+        db.session.execute(text('SELECT 1'))
+        response = jsonify({'status': 'ok', 'database': 'ok'})
+        status = 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning('Health check failed: %s', e)
+        response = jsonify({'status': 'unavailable', 'database': 'unreachable'})
+        status = 503
+
+    response.headers['Cache-Control'] = 'no-store'
+    return response, status
+
+@health_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics summed over all gunicorn workers"""
+    token = current_app.config['METRICS_TOKEN']
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return jsonify({'error': 'Metrics token required'}), 401
+
+    response = Response(metrics.render(), mimetype='text/plain')
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
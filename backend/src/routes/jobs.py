@@ -1,108 +1,205 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from flask import Blueprint, request, jsonify, make_response, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db, User
-from src.models.job import Job, Application, SavedJob
+from src.models.job import Job, Application, SavedJob, Skill, JobSkill, parse_skills, APPLICATION_STATUSES
+from src.services.access import role_required, get_current_principal, get_current_user, get_optional_principal
+from src.services.search import search_index
+from src.services.pagination import paginate_request, parse_bool, InvalidCursor
+from src.services.cache import response_cache, cached_response
+from src.services.conditional import make_etag, not_modified, apply_validators
+from src.services.facets import facet_values, record_change, rollup_facets, filtered_facets
+from src.services.job_import import parse_rows, import_jobs, InvalidImport
+from src.services.recommendations import job_recommender
 from datetime import datetime
-from sqlalchemy import or_, and_
+from werkzeug.exceptions import RequestEntityTooLarge
+from sqlalchemy import or_, and_, func, update
+from sqlalchemy.orm import contains_eager
 
 jobs_bp = Blueprint('jobs', __name__)
 
+def _job_validators(job_id):
+    """Cheap (etag, last_modified) lookup for an active job, or None.
+
+    The employer's updated_at is included because `employer_name` is part of
+    the payload; for authenticated callers the saved flag is folded into the
+    ETag and Last-Modified is dropped since it cannot reflect that flag.
+    """
+    row = db.session.query(Job.updated_at, Job.is_active, User.updated_at.label('employer_updated_at'))\
+                    .join(User, Job.employer_id == User.id)\
+                    .filter(Job.id == job_id).first()
+    if not row or not row.is_active:
+        return None
+    last_modified = max(filter(None, [row.updated_at, row.employer_updated_at]), default=None)
+    
+    principal = get_optional_principal()
+    if not principal:
+        return make_etag('job', job_id, row.updated_at, row.employer_updated_at), last_modified
+    
+    is_saved = bool(_saved_job_ids(principal, [job_id]))
+    return make_etag('job', job_id, row.updated_at, row.employer_updated_at, principal.id, is_saved), None
+
+def _jobs_with_skills(skills, match_all=False):
+    """Subquery of job ids tagged with any (or all) of `skills`, driven by the skill index."""
+    slugs = {Skill.slugify(name) for name in skills}
+    query = db.select(JobSkill.job_id)\
+              .join(Skill, Skill.id == JobSkill.skill_id)\
+              .where(Skill.slug.in_(slugs))
+    if match_all:
+        query = query.group_by(JobSkill.job_id)\
+                     .having(func.count(JobSkill.skill_id) == len(slugs))
+    return query
+
+def _filter_active_jobs(query, args):
+    """Apply the job board's search/filter query parameters to an active-jobs query."""
+    search = args.get('search', '').strip()
+    location = args.get('location', '').strip()
+    job_type = args.get('job_type', '').strip()
+    skills = parse_skills(args.get('skills', ''))
+    skills_match = args.get('skills_match', 'any').strip().lower()
+    
+    query = query.filter(Job.is_active == True)
+    
+    if search:
+        query = search_index.filter_query(query, Job, search)
+    
+    if location:
+        query = query.filter(Job.location.ilike(f'%{location}%'))
+    
+    if job_type:
+        query = query.filter(Job.job_type.ilike(f'%{job_type}%'))
+    
+    if skills:
+        query = query.filter(Job.id.in_(_jobs_with_skills(skills, match_all=skills_match == 'all')))
+    
+    return query
+
+def _saved_job_ids(principal, job_ids):
+    """Return the subset of `job_ids` saved by the caller, using a single query."""
+    if not principal or principal.role != 'job_seeker' or not job_ids:
+        return set()
+    rows = db.session.query(SavedJob.job_id)\
+                     .filter(SavedJob.user_id == principal.id, SavedJob.job_id.in_(job_ids))\
+                     .all()
+    return {row.job_id for row in rows}
+
+def _with_saved_status(job_dicts, principal, saved_ids=None):
+    """Set `is_saved` on serialized jobs; `saved_ids` skips the lookup when already known."""
+    if saved_ids is None:
+        saved_ids = _saved_job_ids(principal, [job_dict['id'] for job_dict in job_dicts])
+    for job_dict in job_dicts:
+        job_dict['is_saved'] = job_dict['id'] in saved_ids
+    return job_dicts
+
 @jobs_bp.route("/", methods=["GET"], strict_slashes=False)
+@cached_response(tags=lambda: ['jobs'])
 def get_jobs():
     try:
-        # Get query parameters
-        search = request.args.get('search', '').strip()
-        location = request.args.get('location', '').strip()
-        job_type = request.args.get('job_type', '').strip()
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        
-        # Build query
-        query = Job.query.filter_by(is_active=True)
-        
-        # Apply filters
-        if search:
-            query = query.filter(
-                or_(
-                    Job.title.ilike(f'%{search}%'),
-                    Job.description.ilike(f'%{search}%'),
-                    Job.skills.ilike(f'%{search}%')
-                )
-            )
-        
-        if location:
-            query = query.filter(Job.location.ilike(f'%{location}%'))
-        
-        if job_type:
-            query = query.filter(Job.job_type.ilike(f'%{job_type}%'))
+        # Build query with the search/filter parameters
+        query = _filter_active_jobs(Job.query.options(*Job.serialization_options()), request.args)
         
         # Order by creation date (newest first)
         query = query.order_by(Job.created_at.desc())
         
-        # Paginate
-        jobs = query.paginate(page=page, per_page=per_page, error_out=False)
+        # Paginate (page numbers by default, keyset when `cursor` is given)
+        jobs, meta = paginate_request(request.args, query, Job.created_at, Job.id)
         
-        # Check if user is authenticated to include saved status
-        current_user_id = None
-        try:
-            verify_jwt_in_request(optional=True)
-            current_user_id = get_jwt_identity()
-        except:
-            pass
-        
-        # Get jobs data with saved status if user is authenticated
-        jobs_data = []
-        for job in jobs.items:
-            job_dict = job.to_dict()
-            
-            # Add saved status for job seekers
-            if current_user_id:
-                user = User.query.get(int(current_user_id))
-                if user and user.role == 'job_seeker':
-                    saved_job = SavedJob.query.filter_by(job_id=job.id, user_id=user.id).first()
-                    job_dict['is_saved'] = bool(saved_job)
-                else:
-                    job_dict['is_saved'] = False
-            else:
-                job_dict['is_saved'] = False
-                
-            jobs_data.append(job_dict)
+        # Resolve the caller once and fetch the saved set for the whole page
+        jobs_data = _with_saved_status([job.to_dict() for job in jobs], get_optional_principal())
         
-        return jsonify({
-            'jobs': jobs_data,
-            'total': jobs.total,
-            'pages': jobs.pages,
-            'current_page': page,
-            'per_page': per_page
-        }), 200
+        return jsonify({'jobs': jobs_data, **meta}), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        import traceback
-        print(f"Error in get_jobs: {str(e)}")
-        print(traceback.format_exc())
+        current_app.logger.exception('Failed to fetch jobs')
         return jsonify({'error': 'Failed to fetch jobs', 'details': str(e)}), 500
 
+# Query parameters that narrow the facet counts below the whole board
+FACET_FILTER_ARGS = ('search', 'location', 'job_type', 'skills')
+# Most values returned per facet
+MAX_FACET_LIMIT = 100
+
+@jobs_bp.route('/facets', methods=['GET'])
+@cached_response(tags=lambda: ['jobs'], per_user=False)
+def get_job_facets():
+    """Counts per job_type, location and skill for active jobs under the current filters"""
+    try:
+        try:
+            limit = max(1, min(int(request.args.get('limit', 20)), MAX_FACET_LIMIT))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        if any(request.args.get(arg, '').strip() for arg in FACET_FILTER_ARGS):
+            facets, total = filtered_facets(_filter_active_jobs(Job.query, request.args), limit)
+        else:
+            # Whole board: served from the incrementally maintained rollup
+            facets, total = rollup_facets(limit)
+        
+        return jsonify({'facets': facets, 'total': total}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch job facets', 'details': str(e)}), 500
+
+@jobs_bp.route('/recommended', methods=['GET'])
+@jwt_required()
+@role_required('job_seeker', error='Only job seekers can get job recommendations')
+def get_recommended_jobs():
+    """Active jobs ranked by similarity to the seeker's profile and past applications"""
+    try:
+        user = get_current_user()
+        limit = int(request.args.get('limit', 10))
+        
+        applied_ids = [job_id for (job_id,) in db.session.query(Application.job_id).filter_by(applicant_id=user.id)]
+        profile = ' '.join(filter(None, [user.experience, user.education]))
+        ranked = job_recommender.recommend(db.session, profile, applied_ids, limit=limit)
+        
+        jobs = {}
+        if ranked:
+            jobs = {job.id: job for job in Job.query.options(*Job.serialization_options())
+                                                    .filter(Job.id.in_([job_id for job_id, _ in ranked]),
+                                                            Job.is_active == True)}
+        job_dicts = []
+        for job_id, score in ranked:
+            if job_id in jobs:
+                job_dicts.append({**jobs[job_id].to_dict(), 'score': round(score, 4)})
+        
+        return jsonify({'jobs': _with_saved_status(job_dicts, get_current_principal())}), 200
+        
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch recommendations', 'details': str(e)}), 500
+
 @jobs_bp.route('/<int:job_id>', methods=['GET'])
+@cached_response(tags=lambda job_id: [f'job:{job_id}'])
 def get_job(job_id):
     try:
-        job = Job.query.get(job_id)
+        validators = _job_validators(job_id)
+        if not validators:
+            return jsonify({'error': 'Job not found'}), 404
+        # Signed-in callers get their saved flag, so keep their copy out of shared caches
+        principal = get_optional_principal()
+        unchanged = not_modified(*validators, private=principal is not None)
+        if unchanged:
+            return unchanged
+        
+        job = Job.query.options(*Job.serialization_options()).get(job_id)
         if not job or not job.is_active:
             return jsonify({'error': 'Job not found'}), 404
         
-        return jsonify({'job': job.to_dict()}), 200
+        job_dict, = _with_saved_status([job.to_dict()], principal)
+        resp = make_response(jsonify({'job': job_dict}), 200)
+        return apply_validators(resp, *validators, private=principal is not None)
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch job', 'details': str(e)}), 500
 
 @jobs_bp.route("/", methods=["POST"], strict_slashes=False)
 @jwt_required()
+@role_required('employer', error='Only employers can post jobs')
 def create_job():
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user or user.role != 'employer':
-            return jsonify({'error': 'Only employers can post jobs'}), 403
         
         data = request.get_json()
         
@@ -112,19 +209,10 @@ def create_job():
             if not data.get(field):
                 return jsonify({'error': f'{field} is required'}), 400
         
-        # Handle skills - accept both array and comma-separated string
-        skills = data.get('skills', '')
-        if isinstance(skills, list):
-            import json
-            skills = json.dumps(skills)  # Store as JSON if it's an array
-        elif not skills:
-            skills = ''
-        
         # Create new job
         job = Job(
             title=data['title'].strip(),
             description=data['description'].strip(),
-            skills=skills,
             job_type=data['job_type'].strip(),
             location=data['location'].strip(),
             employer_id=int(current_user_id)
@@ -137,8 +225,16 @@ def create_job():
             except ValueError:
                 return jsonify({'error': 'Invalid deadline format. Use YYYY-MM-DD'}), 400
         
+        # Skills may be an array or a comma-separated string
+        job.set_skills(data.get('skills'))
+        
         db.session.add(job)
+        db.session.flush()
+        search_index.index_job(db.session, job)
+        record_change(db.session, set(), facet_values(job))
         db.session.commit()
+        response_cache.invalidate('jobs')
+        job_recommender.touch()
         
         return jsonify({
             'message': 'Job posted successfully',
@@ -149,6 +245,34 @@ def create_job():
         db.session.rollback()
         return jsonify({'error': 'Failed to create job', 'details': str(e)}), 500
 
+@jobs_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@role_required('employer', error='Only employers can post jobs')
+def bulk_create_jobs():
+    """Import many jobs from JSON, NDJSON or CSV; invalid rows are reported, not inserted"""
+    try:
+        rows = parse_rows(request, current_app.config['JOB_IMPORT_MAX_ROWS'])
+        atomic = parse_bool(request.args.get('atomic'), default=False)
+        
+        result = import_jobs(int(get_jwt_identity()), rows, atomic=atomic)
+        if not result['created']:
+            db.session.rollback()
+            return jsonify({'error': 'No jobs were imported', **result}), 400
+        
+        db.session.commit()
+        response_cache.invalidate('jobs')
+        job_recommender.touch()
+        
+        return jsonify({'message': f"Imported {result['created']} of {result['received']} jobs", **result}), 201
+        
+    except RequestEntityTooLarge as e:
+        return jsonify({'error': 'Import too large', 'details': e.description}), 413
+    except InvalidImport as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import jobs', 'details': str(e)}), 500
+
 @jobs_bp.route('/<int:job_id>', methods=['PUT'])
 @jwt_required()
 def update_job(job_id):
@@ -163,6 +287,7 @@ def update_job(job_id):
             return jsonify({'error': 'You can only edit your own jobs'}), 403
         
         data = request.get_json()
+        facets_before = facet_values(job)
         
         # Update fields
         if 'title' in data:
@@ -170,7 +295,7 @@ def update_job(job_id):
         if 'description' in data:
             job.description = data['description'].strip()
         if 'skills' in data:
-            job.skills = data['skills'].strip()
+            job.set_skills(data['skills'])
         if 'job_type' in data:
             job.job_type = data['job_type'].strip()
         if 'location' in data:
@@ -185,7 +310,12 @@ def update_job(job_id):
                 job.deadline = None
         
         job.updated_at = datetime.utcnow()
+        db.session.flush()
+        search_index.index_job(db.session, job)
+        record_change(db.session, facets_before, facet_values(job))
         db.session.commit()
+        response_cache.invalidate('jobs', f'job:{job.id}')
+        job_recommender.touch()
         
         return jsonify({
             'message': 'Job updated successfully',
@@ -209,8 +339,13 @@ def delete_job(job_id):
         if job.employer_id != int(current_user_id):
             return jsonify({'error': 'You can only delete your own jobs'}), 403
         
+        facets_before = facet_values(job)
         job.is_active = False
+        search_index.remove_job(db.session, job.id)
+        record_change(db.session, facets_before, set())
         db.session.commit()
+        response_cache.invalidate('jobs', f'job:{job.id}')
+        job_recommender.touch()
         
         return jsonify({'message': 'Job deleted successfully'}), 200
         
@@ -220,30 +355,65 @@ def delete_job(job_id):
 
 @jobs_bp.route('/my-jobs', methods=['GET'])
 @jwt_required()
+@role_required('employer', error='Only employers can view their jobs')
 def get_my_jobs():
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user or user.role != 'employer':
-            return jsonify({'error': 'Only employers can view their jobs'}), 403
         
-        jobs = Job.query.filter_by(employer_id=int(current_user_id), is_active=True).order_by(Job.created_at.desc()).all()
+        jobs = Job.query.options(*Job.serialization_options())\
+                        .filter_by(employer_id=int(current_user_id), is_active=True)\
+                        .order_by(Job.created_at.desc()).all()
         
         return jsonify({'jobs': [job.to_dict() for job in jobs]}), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch jobs', 'details': str(e)}), 500
 
+def _application_counts(job_ids):
+    """Applications per status for each of `job_ids`, from one GROUP BY."""
+    counts = {job_id: dict.fromkeys(APPLICATION_STATUSES, 0) for job_id in job_ids}
+    if job_ids:
+        rows = db.session.query(Application.job_id, Application.status, func.count(Application.id))\
+                         .filter(Application.job_id.in_(job_ids))\
+                         .group_by(Application.job_id, Application.status)
+        for job_id, status, count in rows:
+            counts[job_id][status] = count
+    return counts
+
+@jobs_bp.route('/my-jobs/summary', methods=['GET'])
+@jwt_required()
+@role_required('employer', error='Only employers can view their jobs')
+def get_my_jobs_summary():
+    """The employer's active jobs, newest first, each with application counts by status"""
+    try:
+        current_user_id = get_jwt_identity()
+        
+        query = Job.query.options(*Job.serialization_options())\
+                         .filter_by(employer_id=int(current_user_id), is_active=True)\
+                         .order_by(Job.created_at.desc(), Job.id.desc())
+        jobs, meta = paginate_request(request.args, query, Job.created_at, Job.id, default_per_page=20)
+        
+        counts = _application_counts([job.id for job in jobs])
+        job_dicts = []
+        for job in jobs:
+            job_dict = job.to_dict()
+            job_dict['application_counts'] = counts[job.id]
+            job_dict['application_total'] = sum(counts[job.id].values())
+            job_dicts.append(job_dict)
+        
+        return jsonify({'jobs': job_dicts, **meta}), 200
+        
+    except (InvalidCursor, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch jobs', 'details': str(e)}), 500
+
 @jobs_bp.route('/<int:job_id>/apply', methods=['POST'])
 @jwt_required()
+@role_required('job_seeker', error='Only job seekers can apply for jobs')
 def apply_for_job(job_id):
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user or user.role != 'job_seeker':
-            return jsonify({'error': 'Only job seekers can apply for jobs'}), 403
         
         job = Job.query.get(job_id)
         if not job or not job.is_active:
@@ -278,20 +448,28 @@ def apply_for_job(job_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to apply for job', 'details': str(e)}), 500
 
+def _application_listing(query):
+    """Serialize an application listing; keyset pages are opt-in via `cursor`."""
+    if request.args.get('cursor') is None:
+        return jsonify({'applications': [app.to_dict() for app in query.all()]}), 200
+    applications, meta = paginate_request(request.args, query, Application.applied_at, Application.id)
+    return jsonify({'applications': [app.to_dict() for app in applications], **meta}), 200
+
 @jobs_bp.route('/my-applications', methods=['GET'])
 @jwt_required()
+@role_required('job_seeker', error='Only job seekers can view their applications')
 def get_my_applications():
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user or user.role != 'job_seeker':
-            return jsonify({'error': 'Only job seekers can view their applications'}), 403
         
-        applications = Application.query.filter_by(applicant_id=int(current_user_id)).order_by(Application.applied_at.desc()).all()
+        query = Application.query.options(*Application.serialization_options())\
+                                 .filter_by(applicant_id=int(current_user_id))\
+                                 .order_by(Application.applied_at.desc())
         
-        return jsonify({'applications': [app.to_dict() for app in applications]}), 200
+        return _application_listing(query)
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch applications', 'details': str(e)}), 500
 
@@ -308,10 +486,14 @@ def get_job_applications(job_id):
         if job.employer_id != int(current_user_id):
             return jsonify({'error': 'You can only view applications for your own jobs'}), 403
         
-        applications = Application.query.filter_by(job_id=job_id).order_by(Application.applied_at.desc()).all()
+        query = Application.query.options(*Application.serialization_options())\
+                                 .filter_by(job_id=job_id)\
+                                 .order_by(Application.applied_at.desc())
         
-        return jsonify({'applications': [app.to_dict() for app in applications]}), 200
+        return _application_listing(query)
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch applications', 'details': str(e)}), 500
 
@@ -333,7 +515,7 @@ def update_application_status(application_id):
         data = request.get_json()
         new_status = data.get('status')
         
-        if new_status not in ['Applied', 'Under Review', 'Accepted', 'Rejected']:
+        if new_status not in APPLICATION_STATUSES:
             return jsonify({'error': 'Invalid status'}), 400
         
         application.status = new_status
@@ -349,51 +531,108 @@ def update_application_status(application_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to update application status', 'details': str(e)}), 500
 
+@jobs_bp.route('/<int:job_id>/applications/status', methods=['PUT'])
+@jwt_required()
+def bulk_update_application_status(job_id):
+    """Set the status of many applications to one job in a single UPDATE.
+
+    Takes {"status": ..., "application_ids": [...]} or, to act on every
+    application currently in one status, {"status": ..., "filter": {"status": ...}}.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        employer_id = db.session.query(Job.employer_id).filter(Job.id == job_id).scalar()
+        
+        if employer_id is None:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if employer_id != int(current_user_id):
+            return jsonify({'error': 'You can only update applications for your own jobs'}), 403
+        
+        data = request.get_json(silent=True) or {}
+        new_status = data.get('status')
+        
+        if new_status not in APPLICATION_STATUSES:
+            return jsonify({'error': 'Invalid status'}), 400
+        
+        conditions = [Application.job_id == job_id]
+        application_ids = data.get('application_ids')
+        status_filter = data.get('filter')
+        if application_ids is not None:
+            if not isinstance(application_ids, list) or not application_ids \
+                    or not all(isinstance(i, int) and not isinstance(i, bool) for i in application_ids):
+                return jsonify({'error': 'application_ids must be a non-empty list of ids'}), 400
+            max_ids = current_app.config['APPLICATION_STATUS_MAX_IDS']
+            if len(application_ids) > max_ids:
+                return jsonify({'error': f'At most {max_ids} application ids per request'}), 400
+            conditions.append(Application.id.in_(application_ids))
+        elif isinstance(status_filter, dict) and status_filter.get('status') in APPLICATION_STATUSES:
+            conditions.append(Application.status == status_filter['status'])
+        else:
+            return jsonify({'error': 'Provide application_ids or a filter with a valid status'}), 400
+        
+        rows = db.session.execute(
+            update(Application)
+            .where(*conditions)
+            .values(status=new_status, updated_at=datetime.utcnow())
+            .returning(Application.id, Application.status, Application.updated_at),
+            execution_options={'synchronize_session': False}
+        ).all()
+        db.session.commit()
+        
+        updated = sorted(rows, key=lambda row: row.id)
+        result = {
+            'message': f'Updated {len(updated)} applications',
+            'updated': len(updated),
+            'applications': [{'id': row.id, 'status': row.status, 'updated_at': row.updated_at.isoformat()}
+                             for row in updated],
+        }
+        if application_ids is not None:
+            # Ids that do not exist or belong to another job
+            found = {row.id for row in updated}
+            result['not_found'] = sorted(set(application_ids) - found)
+        return jsonify(result), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update application status', 'details': str(e)}), 500
+
 # Saved Jobs Endpoints
 @jobs_bp.route('/saved', methods=['GET'])
 @jwt_required()
+@role_required('job_seeker', error='Only job seekers can save jobs')
 def get_saved_jobs():
     """Get all saved jobs for the current user with pagination"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user or user.role != 'job_seeker':
-            return jsonify({'error': 'Only job seekers can save jobs'}), 403
-        
-        # Get pagination parameters
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
         
         # Query saved jobs with pagination
-        saved_jobs_query = SavedJob.query.filter_by(user_id=user.id)\
+        saved_jobs_query = SavedJob.query.filter_by(user_id=int(current_user_id))\
                                         .join(Job)\
+                                        .options(*SavedJob.serialization_options(job_loader=contains_eager))\
                                         .filter(Job.is_active == True)\
                                         .order_by(SavedJob.saved_at.desc())
         
-        saved_jobs = saved_jobs_query.paginate(page=page, per_page=per_page, error_out=False)
+        saved_jobs, meta = paginate_request(request.args, saved_jobs_query, SavedJob.saved_at, SavedJob.id)
         
-        return jsonify({
-            'saved_jobs': [saved_job.to_dict() for saved_job in saved_jobs.items],
-            'total': saved_jobs.total,
-            'pages': saved_jobs.pages,
-            'current_page': page,
-            'per_page': per_page
-        }), 200
+        saved_jobs_data = [saved_job.to_dict() for saved_job in saved_jobs]
+        _with_saved_status([item['job'] for item in saved_jobs_data if item['job']], get_current_principal(),
+                           saved_ids={saved_job.job_id for saved_job in saved_jobs})
+        
+        return jsonify({'saved_jobs': saved_jobs_data, **meta}), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch saved jobs', 'details': str(e)}), 500
 
 @jobs_bp.route('/<int:job_id>/save', methods=['POST'])
 @jwt_required()
+@role_required('job_seeker', error='Only job seekers can save jobs')
 def save_job(job_id):
     """Save a job for the current user"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user or user.role != 'job_seeker':
-            return jsonify({'error': 'Only job seekers can save jobs'}), 403
         
         # Check if job exists and is active
         job = Job.query.get(job_id)
@@ -401,12 +640,12 @@ def save_job(job_id):
             return jsonify({'error': 'Job not found'}), 404
         
         # Check if job is already saved
-        existing_save = SavedJob.query.filter_by(job_id=job_id, user_id=user.id).first()
+        existing_save = SavedJob.query.filter_by(job_id=job_id, user_id=int(current_user_id)).first()
         if existing_save:
             return jsonify({'error': 'Job already saved'}), 400
         
         # Create new saved job
-        saved_job = SavedJob(job_id=job_id, user_id=user.id)
+        saved_job = SavedJob(job_id=job_id, user_id=int(current_user_id))
         db.session.add(saved_job)
         db.session.commit()
         
@@ -421,17 +660,14 @@ def save_job(job_id):
 
 @jobs_bp.route('/<int:job_id>/unsave', methods=['DELETE'])
 @jwt_required()
+@role_required('job_seeker', error='Only job seekers can unsave jobs')
 def unsave_job(job_id):
     """Remove a job from saved jobs for the current user"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user or user.role != 'job_seeker':
-            return jsonify({'error': 'Only job seekers can unsave jobs'}), 403
         
         # Find the saved job
-        saved_job = SavedJob.query.filter_by(job_id=job_id, user_id=user.id).first()
+        saved_job = SavedJob.query.filter_by(job_id=job_id, user_id=int(current_user_id)).first()
         if not saved_job:
             return jsonify({'error': 'Job not found in saved jobs'}), 404
         
@@ -450,14 +686,13 @@ def unsave_job(job_id):
 def is_job_saved(job_id):
     """Check if a job is saved by the current user"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
+        principal = get_current_principal()
         
-        if not user or user.role != 'job_seeker':
+        if not principal or principal.role != 'job_seeker':
             return jsonify({'is_saved': False}), 200
         
         # Check if job is saved
-        saved_job = SavedJob.query.filter_by(job_id=job_id, user_id=user.id).first()
+        saved_job = SavedJob.query.filter_by(job_id=job_id, user_id=principal.id).first()
         
         return jsonify({'is_saved': bool(saved_job)}), 200
         
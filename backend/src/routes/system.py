@@ -0,0 +1,65 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from src.services.access import role_required
+from src.services.cache import response_cache
+from src.services.tokens import refresh_tokens
+from src.services.passwords import password_hasher
+from src.services.db_pool import pool_metrics
+from src.services.query_stats import query_stats
+
+system_bp = Blueprint('system', __name__)
+
+@system_bp.route('/cache', methods=['GET'])
+@jwt_required()
+@role_required('admin', error='Admin access required')
+def get_cache_stats():
+    """Hit/miss counters for this worker's response cache (admin only)"""
+    try:
+        return jsonify({'cache': response_cache.info()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch cache stats', 'details': str(e)}), 500
+
+@system_bp.route('/refresh-tokens', methods=['GET'])
+@jwt_required()
+@role_required('admin', error='Admin access required')
+def get_refresh_token_stats():
+    """Refresh-token table size and this worker's purge throughput (admin only)"""
+    try:
+        return jsonify({'refresh_tokens': refresh_tokens.info()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch refresh token stats', 'details': str(e)}), 500
+
+@system_bp.route('/passwords', methods=['GET'])
+@jwt_required()
+@role_required('admin', error='Admin access required')
+def get_password_hasher_stats():
+    """Hashing policy, pool size and this worker's hash/rejection counters (admin only)"""
+    try:
+        return jsonify({'passwords': password_hasher.info()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch password hashing stats', 'details': str(e)}), 500
+
+@system_bp.route('/db-pool', methods=['GET'])
+@jwt_required()
+@role_required('admin', error='Admin access required')
+def get_db_pool_stats():
+    """Engine pool settings, current usage and this worker's checkout metrics (admin only)"""
+    try:
+        return jsonify({'db_pool': pool_metrics.info()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch database pool stats', 'details': str(e)}), 500
+
+@system_bp.route('/queries', methods=['GET'])
+@jwt_required()
+@role_required('admin', error='Admin access required')
+def get_query_stats():
+    """Queries and database time per endpoint in this worker (admin only)"""
+    try:
+        return jsonify({'queries': query_stats.info()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch query stats', 'details': str(e)}), 500
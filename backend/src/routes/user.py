@@ -1,13 +1,26 @@
-from flask import Blueprint, request, jsonify, current_app, send_from_directory
+from flask import Blueprint, request, jsonify, current_app, send_from_directory, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db, User
+from src.models.job import Job
+from src.services.access import role_required, get_current_principal, get_current_user
+from src.services.cache import response_cache
+from src.services.conditional import user_validators, not_modified, apply_validators
+from src.services.storage import upload_storage
+from src.services.pagination import paginate_request, parse_bool, InvalidCursor
+from src.services.export import export_response, EXPORT_FORMATS
+from sqlalchemy import select, or_, func
+from datetime import datetime, timedelta
 import os
+import re
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
 user_bp = Blueprint('user', __name__)
 # pylint: disable=broad-except  # Allow generic exception handling for API endpoints to return JSON errors uniformly
 
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt', 'png', 'jpg', 'jpeg', 'gif'}
+# Uploads saved before content-addressed storage; still served and cleaned up
+_LEGACY_UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'uploads')
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -17,12 +30,21 @@ def allowed_file(filename):
 def get_profile():
     try:
         current_user_id = get_jwt_identity()
+        
+        validators = user_validators(current_user_id)
+        if not validators:
+            return jsonify({'error': 'User not found'}), 404
+        unchanged = not_modified(*validators, private=True)
+        if unchanged:
+            return unchanged
+        
         user = User.query.get(int(current_user_id))
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify({'user': user.to_dict()}), 200
+        resp = make_response(jsonify({'user': user.to_dict()}), 200)
+        return apply_validators(resp, *validators, private=True)
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch profile', 'details': str(e)}), 500
@@ -31,8 +53,7 @@ def get_profile():
 @jwt_required()
 def update_profile():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
+        user = get_current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -49,6 +70,8 @@ def update_profile():
             user.email = email
         
         # Update role-specific fields
+        renamed = user.role == 'employer' and 'company_name' in data \
+            and data['company_name'].strip() != user.company_name
         if user.role == 'job_seeker':
             if 'first_name' in data:
                 user.first_name = data['first_name'].strip()
@@ -70,6 +93,11 @@ def update_profile():
         
         db.session.commit()
         
+        # Cached job listings and details carry the company name as employer_name
+        if renamed:
+            job_ids = db.session.scalars(select(Job.id).where(Job.employer_id == user.id)).all()
+            response_cache.invalidate('jobs', *[f'job:{job_id}' for job_id in job_ids])
+        
         return jsonify({
             'message': 'Profile updated successfully',
             'user': user.to_dict()
@@ -83,8 +111,7 @@ def update_profile():
 @jwt_required()
 def upload_resume():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
+        user = get_current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -105,14 +132,15 @@ def upload_resume():
             name, ext = os.path.splitext(filename)
             filename = f"resume_{user.id}_{name}{ext}"
             
-            # Save file
-            upload_folder = os.path.join(os.path.dirname(__file__), '..', 'uploads')
-            os.makedirs(upload_folder, exist_ok=True)
-            file_path = os.path.join(upload_folder, filename)
-            file.save(file_path)
+            # Stream into content-addressed storage (identical files are stored once)
+            sha256, size, content_type = upload_storage.save(file)
+            upload_storage.attach(sha256, size, content_type)
+            upload_storage.release(user.resume_sha256)
+            _remove_legacy_upload(user.resume_filename)
             
             # Update user's resume filename
             user.resume_filename = filename
+            user.resume_sha256 = sha256
             db.session.commit()
             
             return jsonify({
@@ -122,12 +150,15 @@ def upload_resume():
         else:
             return jsonify({'error': 'Invalid file type. Allowed: PDF, DOC, DOCX, TXT, PNG, JPG, JPEG, GIF'}), 400
         
+    except RequestEntityTooLarge as e:
+        db.session.rollback()
+        return jsonify({'error': 'File too large', 'details': e.description}), 413
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Failed to upload resume', 'details': str(e)}), 500
 
 def _delete_resume_impl():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(int(current_user_id))
+    user = get_current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     if user.role != 'job_seeker':
@@ -135,14 +166,10 @@ def _delete_resume_impl():
     if not user.resume_filename:
         return jsonify({'error': 'No resume to delete'}), 400
 
-    upload_folder = os.path.join(os.path.dirname(__file__), '..', 'uploads')
-    file_path = os.path.join(upload_folder, user.resume_filename)
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-        except Exception as rm_err:
-            current_app.logger.warning(f"Failed to delete resume file {file_path}: {rm_err}")
+    upload_storage.release(user.resume_sha256)
+    _remove_legacy_upload(user.resume_filename)
     user.resume_filename = None
+    user.resume_sha256 = None
     db.session.commit()
     return jsonify({'message': 'Resume deleted successfully'}), 200
 
@@ -181,8 +208,7 @@ def delete_resume_slash():
 @jwt_required()
 def upload_logo():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
+        user = get_current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -203,14 +229,15 @@ def upload_logo():
             name, ext = os.path.splitext(filename)
             filename = f"logo_{user.id}_{name}{ext}"
             
-            # Save file
-            upload_folder = os.path.join(os.path.dirname(__file__), '..', 'uploads')
-            os.makedirs(upload_folder, exist_ok=True)
-            file_path = os.path.join(upload_folder, filename)
-            file.save(file_path)
+            # Stream into content-addressed storage (identical files are stored once)
+            sha256, size, content_type = upload_storage.save(file)
+            upload_storage.attach(sha256, size, content_type)
+            upload_storage.release(user.company_logo_sha256)
+            _remove_legacy_upload(user.company_logo_filename)
             
             # Update user's logo filename
             user.company_logo_filename = filename
+            user.company_logo_sha256 = sha256
             db.session.commit()
             
             return jsonify({
@@ -220,39 +247,122 @@ def upload_logo():
         else:
             return jsonify({'error': 'Invalid file type. Allowed: PDF, DOC, DOCX, TXT, PNG, JPG, JPEG, GIF'}), 400
         
+    except RequestEntityTooLarge as e:
+        db.session.rollback()
+        return jsonify({'error': 'File too large', 'details': e.description}), 413
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Failed to upload logo', 'details': str(e)}), 500
 
+def _remove_legacy_upload(filename):
+    """Delete a file saved in the flat uploads/ directory before blob storage existed."""
+    if not filename:
+        return
+    file_path = os.path.join(_LEGACY_UPLOAD_FOLDER, filename)
+    if os.path.exists(file_path):
+        try:
+            os.remove(file_path)
+        except Exception as rm_err:
+            current_app.logger.warning(f"Failed to delete upload file {file_path}: {rm_err}")
+
+def _send_upload(filename, prefix, filename_field, sha_field):
+    """Serve an upload by its public filename, from blob storage or the legacy folder."""
+    match = re.match(rf'^{prefix}_(\d+)_', filename)
+    user = db.session.get(User, int(match.group(1))) if match else None
+    if user and getattr(user, filename_field) == filename and getattr(user, sha_field):
+        return upload_storage.send(getattr(user, sha_field), filename)
+    return send_from_directory(_LEGACY_UPLOAD_FOLDER, filename)
+
 @user_bp.route('/resume/<filename>', methods=['GET'])
 def get_resume(filename):
     try:
-        upload_folder = os.path.join(os.path.dirname(__file__), '..', 'uploads')
-        return send_from_directory(upload_folder, filename)
+        return _send_upload(filename, 'resume', 'resume_filename', 'resume_sha256')
     except Exception:
         return jsonify({'error': 'File not found'}), 404
 
 @user_bp.route('/logo/<filename>', methods=['GET'])
 def get_logo(filename):
     try:
-        upload_folder = os.path.join(os.path.dirname(__file__), '..', 'uploads')
-        return send_from_directory(upload_folder, filename)
+        return _send_upload(filename, 'logo', 'company_logo_filename', 'company_logo_sha256')
     except Exception:
         return jsonify({'error': 'File not found'}), 404
 
 # Admin routes
+# Every to_dict() field except secrets, in export column order
+USER_EXPORT_COLUMNS = (
+    User.id, User.email, User.role, User.is_active, User.created_at, User.updated_at,
+    User.first_name, User.last_name, User.phone, User.education, User.experience, User.resume_filename,
+    User.company_name, User.company_description, User.company_logo_filename, User.company_website,
+)
+
+def _parse_datetime(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 date or datetime')
+
+def _user_conditions(args):
+    """SQL conditions for the admin listing filters: role, is_active, created_from/created_to, search."""
+    conditions = []
+    role = args.get('role', '').strip()
+    if role:
+        conditions.append(User.role == role)
+    if args.get('is_active', '').strip():
+        conditions.append(User.is_active.is_(parse_bool(args.get('is_active'))))
+    if args.get('created_from'):
+        conditions.append(User.created_at >= _parse_datetime(args['created_from'], 'created_from'))
+    if args.get('created_to'):
+        created_to = args['created_to']
+        bound = _parse_datetime(created_to, 'created_to')
+        # A bare date includes the whole day
+        if 'T' not in created_to and ' ' not in created_to:
+            conditions.append(User.created_at < bound + timedelta(days=1))
+        else:
+            conditions.append(User.created_at <= bound)
+    search = args.get('search', '').strip()
+    if search:
+        pattern = f'%{search}%'
+        conditions.append(or_(User.email.ilike(pattern), User.first_name.ilike(pattern),
+                              User.last_name.ilike(pattern), User.company_name.ilike(pattern)))
+    return conditions
+
+def _user_counts():
+    """Totals over all users by role and status, from one GROUP BY."""
+    counts = {'total': 0, 'active': 0, 'inactive': 0, 'by_role': {}}
+    rows = db.session.query(User.role, User.is_active, func.count(User.id))\
+                     .group_by(User.role, User.is_active).all()
+    for role, is_active, count in rows:
+        counts['total'] += count
+        counts['active' if is_active else 'inactive'] += count
+        counts['by_role'][role] = counts['by_role'].get(role, 0) + count
+    return counts
+
 @user_bp.route('/', methods=['GET'])
 @jwt_required()
+@role_required('admin', error='Admin access required')
 def get_users():
+    """Paginated user listing with filters; `format=ndjson|csv` streams every match instead"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user or user.role != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-        
-        users = User.query.all()
-        return jsonify({'users': [user.to_dict() for user in users]}), 200
-        
+        conditions = _user_conditions(request.args)
+        fmt = request.args.get('format', 'json')
+        
+        if fmt in EXPORT_FORMATS:
+            statement = select(*USER_EXPORT_COLUMNS).where(*conditions)\
+                               .order_by(User.created_at.desc(), User.id.desc())
+            return export_response(statement, fmt, f"users-{datetime.utcnow():%Y%m%d}")
+        if fmt != 'json':
+            return jsonify({'error': 'format must be json, ndjson or csv'}), 400
+        
+        query = User.query.filter(*conditions).order_by(User.created_at.desc(), User.id.desc())
+        users, meta = paginate_request(request.args, query, User.created_at, User.id, default_per_page=50)
+        
+        data = {'users': [user.to_dict() for user in users], **meta}
+        if parse_bool(request.args.get('include_counts'), default=False):
+            data['counts'] = _user_counts()
+        return jsonify(data), 200
+        
+    except (InvalidCursor, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch users', 'details': str(e)}), 500
 
@@ -260,35 +370,36 @@ def get_users():
 @jwt_required()
 def get_user(user_id):
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(int(current_user_id))
-        
-        if not current_user:
-            return jsonify({'error': 'User not found'}), 404
+        principal = get_current_principal()
         
         # Users can view their own profile, admins can view any profile
-        if int(current_user_id) != user_id and current_user.role != 'admin':
+        if not principal:
+            return jsonify({'error': 'User not found'}), 404
+        if principal.id != user_id and principal.role != 'admin':
             return jsonify({'error': 'Access denied'}), 403
         
+        validators = user_validators(user_id)
+        if not validators:
+            return jsonify({'error': 'User not found'}), 404
+        unchanged = not_modified(*validators, private=True)
+        if unchanged:
+            return unchanged
+        
         user = User.query.get(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify({'user': user.to_dict()}), 200
+        resp = make_response(jsonify({'user': user.to_dict()}), 200)
+        return apply_validators(resp, *validators, private=True)
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch user', 'details': str(e)}), 500
 
 @user_bp.route('/<int:user_id>/deactivate', methods=['PUT'])
 @jwt_required()
+@role_required('admin', error='Admin access required')
 def deactivate_user(user_id):
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(int(current_user_id))
-        
-        if not current_user or current_user.role != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-        
         user = User.query.get(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
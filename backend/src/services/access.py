@@ -0,0 +1,77 @@
+"""
+Request-scoped caller identity and role checks.
+
+Access tokens carry the user's role and active flag as claims, so most
+authorization decisions need no database query. The caller's `User` row is
+still available through `get_current_user()`, loaded at most once per request
+and memoized on `flask.g`. Tokens minted before the claims existed fall back to
+that row.
+"""
+from collections import namedtuple
+from functools import wraps
+
+from flask import g, jsonify
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity, verify_jwt_in_request
+
+from src.models.user import db, User
+
+Principal = namedtuple('Principal', ['id', 'role', 'is_active'])
+
+
+def token_claims(user):
+    return {'role': user.role, 'active': bool(user.is_active)}
+
+
+def create_user_access_token(user):
+    """Access token for `user` carrying the role/active claims."""
+    return create_access_token(identity=str(user.id), additional_claims=token_claims(user))
+
+
+def get_current_user():
+    """The authenticated `User`, loaded at most once per request (None if absent)."""
+    if 'current_user' not in g:
+        identity = get_jwt_identity()
+        g.current_user = db.session.get(User, int(identity)) if identity else None
+    return g.current_user
+
+
+def get_current_principal():
+    """(id, role, is_active) of the caller, taken from the token claims when present."""
+    if 'current_principal' not in g:
+        identity = get_jwt_identity()
+        principal = None
+        if identity:
+            claims = get_jwt()
+            if 'role' in claims:
+                principal = Principal(int(identity), claims['role'], claims.get('active', True))
+            else:
+                user = get_current_user()
+                if user:
+                    principal = Principal(user.id, user.role, bool(user.is_active))
+        g.current_principal = principal
+    return g.current_principal
+
+
+def get_optional_principal():
+    """Caller principal on endpoints where a JWT is optional; None if anonymous or invalid."""
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return None
+    return get_current_principal()
+
+
+def role_required(*roles, error='Access denied'):
+    """Reject callers whose role is not in `roles` (or who are deactivated) with 403.
+
+    Use below `@jwt_required()`; `error` keeps each endpoint's existing message.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            principal = get_current_principal()
+            if not principal or principal.role not in roles or not principal.is_active:
+                return jsonify({'error': error}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
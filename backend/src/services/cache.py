@@ -0,0 +1,352 @@
+"""
+Response cache for public (anonymous) read endpoints.
+
+Entries are keyed on the request path plus its normalized query string and are
+tagged (e.g. 'jobs', 'job:42'). Invalidation bumps a per-tag version number;
+an entry is only served while every tag version it was stored under is still
+current, so invalidating a tag is O(1) no matter how many entries carry it.
+Versions are read on the lookup that misses, before the response is built, so
+a write racing with that request can never be cached as fresh.
+
+Backends:
+
+* `memory` (default) - per-process LRU with a TTL and an entry bound. Tag
+  invalidation only reaches the worker that performed the write, so with
+  several gunicorn workers CACHE_TTL is the maximum staleness window.
+* `redis` - any server speaking the Redis protocol (CACHE_REDIS_URL). Tag
+  versions live on the server, so an invalidation is seen by every worker
+  immediately. Only GET/SET/MGET/INCR are used, which keeps it usable with
+  lightweight Redis-compatible stand-ins.
+* `null` - caching disabled.
+"""
+import json
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode, urlparse
+
+from flask import current_app, request, make_response
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tag_versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, tags):
+        with self._lock:
+            current = {tag: self._tag_versions.get(tag, 0) for tag in tags}
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, current
+            expires_at, versions, value = entry
+            if expires_at < time.monotonic() or versions != current:
+                del self._entries[key]
+                return None, current
+            self._entries.move_to_end(key)
+            return value, current
+
+    def set(self, key, value, versions, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+
+    def size(self):
+        return len(self._entries)
+
+
+class CacheServerError(RuntimeError):
+    pass
+
+
+class RespConnection:
+    """Minimal Redis protocol (RESP2) client supporting pipelined commands."""
+
+    def __init__(self, url, timeout=0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = self._sock.makefile('rb')
+        setup = []
+        if self.password:
+            setup.append(('AUTH', self.password))
+        if self.db:
+            setup.append(('SELECT', self.db))
+        if setup:
+            self._send(setup)
+            for _ in setup:
+                self._read_reply()
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+                self._file = None
+
+    @staticmethod
+    def _encode(args):
+        out = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            out.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(out)
+
+    def _send(self, commands):
+        self._sock.sendall(b''.join(self._encode(command) for command in commands))
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('Connection closed by cache server')
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode()
+        if prefix == b'-':
+            # Returned rather than raised so the rest of a pipeline is still drained
+            return CacheServerError(payload.decode())
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RuntimeError(f'Unexpected reply from cache server: {line!r}')
+
+    def pipeline(self, commands):
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                self._send(commands)
+                replies = [self._read_reply() for _ in commands]
+            except (OSError, ConnectionError):
+                self.close()
+                raise
+        for reply in replies:
+            if isinstance(reply, CacheServerError):
+                raise reply
+        return replies
+
+    def execute(self, *args):
+        return self.pipeline([args])[0]
+
+
+class RedisBackend:
+    def __init__(self, url, key_prefix='jobconnect:cache:', timeout=0.5):
+        self.connection = RespConnection(url, timeout=timeout)
+        self.key_prefix = key_prefix
+
+    def _tag_keys(self, tags):
+        return [f'{self.key_prefix}tag:{tag}' for tag in tags]
+
+    @staticmethod
+    def _versions(tags, raw):
+        return {tag: int(value or 0) for tag, value in zip(tags, raw)}
+
+    def get(self, key, tags):
+        commands = [('GET', self.key_prefix + key)]
+        if tags:
+            commands.append(('MGET', *self._tag_keys(tags)))
+        replies = self.connection.pipeline(commands)
+        current = self._versions(tags, replies[1]) if tags else {}
+        if replies[0] is None:
+            return None, current
+        entry = json.loads(replies[0])
+        if entry['versions'] != current:
+            return None, current
+        return entry['value'], current
+
+    def set(self, key, value, versions, ttl):
+        payload = json.dumps({'versions': versions, 'value': value})
+        self.connection.execute('SET', self.key_prefix + key, payload, 'PX', int(ttl * 1000))
+
+    def invalidate(self, tags):
+        self.connection.pipeline([('INCR', tag_key) for tag_key in self._tag_keys(tags)])
+
+    def size(self):
+        return None
+
+
+class NullBackend:
+    def get(self, key, tags):
+        return None, None
+
+    def set(self, key, value, versions, ttl):
+        pass
+
+    def invalidate(self, tags):
+        pass
+
+    def size(self):
+        return 0
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'sets': 0, 'invalidations': 0, 'errors': 0}
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+
+def _build_backend(config):
+    name = config.get('CACHE_BACKEND', 'memory')
+    if name == 'redis':
+        return RedisBackend(config['CACHE_REDIS_URL'], timeout=config.get('CACHE_REDIS_TIMEOUT', 0.5))
+    if name == 'memory':
+        return MemoryBackend(max_entries=config.get('CACHE_MAX_ENTRIES', 1024))
+    return NullBackend()
+
+
+class ResponseCache:
+    """Flask extension holding the configured backend and its counters."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'memory')
+        app.config.setdefault('CACHE_TTL', 30)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 1024)
+        app.extensions['response_cache'] = {
+            'backend': _build_backend(app.config),
+            'stats': CacheStats(),
+        }
+
+    @property
+    def _state(self):
+        return current_app.extensions['response_cache']
+
+    @property
+    def backend(self):
+        return self._state['backend']
+
+    @property
+    def stats(self):
+        return self._state['stats']
+
+    def get(self, key, tags):
+        """Return (value, versions); pass `versions` back to set() on a miss."""
+        try:
+            value, versions = self.backend.get(key, tags)
+        except Exception as e:
+            self.stats.incr('errors')
+            logger.warning('Cache get failed for %s: %s', key, e)
+            return None, None
+        self.stats.incr('hits' if value is not None else 'misses')
+        return value, versions
+
+    def set(self, key, value, versions, ttl=None):
+        if versions is None:
+            return
+        try:
+            self.backend.set(key, value, versions, ttl or current_app.config['CACHE_TTL'])
+            self.stats.incr('sets')
+        except Exception as e:
+            self.stats.incr('errors')
+            logger.warning('Cache set failed for %s: %s', key, e)
+
+    def invalidate(self, *tags):
+        """Expire every entry stored under any of `tags`."""
+        try:
+            self.backend.invalidate(tags)
+            self.stats.incr('invalidations', len(tags))
+        except Exception as e:
+            self.stats.incr('errors')
+            logger.warning('Cache invalidation failed for %s: %s', tags, e)
+
+    def info(self):
+        state = self._state
+        return {
+            'backend': current_app.config['CACHE_BACKEND'],
+            'ttl': current_app.config['CACHE_TTL'],
+            'entries': state['backend'].size(),
+            **state['stats'].snapshot(),
+        }
+
+
+response_cache = ResponseCache()
+
+
+# Response headers replayed on cache hits
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+
+def normalized_request_key():
+    """Cache key for the current request: path plus sorted, trimmed query args."""
+    args = sorted((key, value.strip()) for key, value in request.args.items(multi=True))
+    return f'{request.path}?{urlencode(args)}'
+
+
+def cached_response(tags, ttl=None, per_user=True):
+    """Cache successful JSON responses of anonymous GET requests.
+
+    `tags` is a callable receiving the view's keyword arguments and returning
+    the tags to store the entry under. Requests carrying credentials bypass
+    the cache since they may include per-user fields such as `is_saved`,
+    unless `per_user=False` declares the response identical for every caller.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or (per_user and request.headers.get('Authorization')):
+                return view(*args, **kwargs)
+
+            key = normalized_request_key()
+            entry_tags = list(tags(**kwargs))
+            entry, versions = response_cache.get(key, entry_tags)
+            if entry is not None:
+                resp = current_app.response_class(entry['body'], status=200, mimetype='application/json',
+                                                  headers=entry['headers'])
+                resp.headers['X-Cache'] = 'HIT'
+                # Honour If-None-Match/If-Modified-Since against the stored validators
+                return resp.make_conditional(request)
+
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code == 200:
+                headers = {name: resp.headers[name] for name in CACHED_HEADERS if name in resp.headers}
+                response_cache.set(key, {'body': resp.get_data(as_text=True), 'headers': headers}, versions, ttl)
+            resp.headers['X-Cache'] = 'MISS'
+            return resp
+        return wrapper
+    return decorator
@@ -0,0 +1,53 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304) for single resources.
+
+Validators are computed from `(id, updated_at)` with a column-only query, so a
+request whose If-None-Match / If-Modified-Since still matches is answered with
+a bodiless 304 before the full row is loaded or serialized.
+"""
+import hashlib
+from datetime import timezone
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+from src.models.user import db, User
+
+
+def make_etag(*parts):
+    """Strong ETag value for the given identifying parts (e.g. kind, id, updated_at)."""
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _http_datetime(value):
+    # Stored timestamps are naive UTC; HTTP dates have one-second resolution
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def apply_validators(response, etag, last_modified=None, private=False):
+    """Attach validators and force clients to revalidate before reusing the body."""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _http_datetime(last_modified)
+    response.cache_control.no_cache = True
+    if private:
+        response.cache_control.private = True
+        response.vary.add('Authorization')
+    return response
+
+
+def not_modified(etag, last_modified=None, private=False):
+    """Return a 304 response if the request's validators still match, else None."""
+    if is_resource_modified(request.environ, etag=etag, last_modified=_http_datetime(last_modified)):
+        return None
+    response = current_app.response_class(status=304)
+    return apply_validators(response, etag, last_modified, private)
+
+
+def user_validators(user_id):
+    """(etag, last_modified) for a user profile, or None if the user does not exist."""
+    row = db.session.query(User.id, User.updated_at).filter(User.id == int(user_id)).first()
+    if row is None:
+        return None
+    return make_etag('user', row.id, row.updated_at), row.updated_at
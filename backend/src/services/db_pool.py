@@ -0,0 +1,164 @@
+"""
+Database connection pool configuration and health metrics.
+
+`engine_options_from_env()` builds SQLALCHEMY_ENGINE_OPTIONS from DB_POOL_*
+environment variables, so pool size, overflow, timeout, recycle and pre-ping
+can be sized against the Postgres connection limit:
+
+    workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) <= max_connections - headroom
+
+The pool class is a QueuePool that times every checkout. Together with pool
+events it records, per process, checkout latency percentiles, timeouts, peak
+overflow and connection churn. `DatabasePoolMetrics.info()` serves them to the
+admin endpoint.
+"""
+import threading
+import time
+from collections import deque
+
+from flask import current_app
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+LATENCY_WINDOW = 2048
+
+
+def _env_bool(value, default):
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def engine_options_from_env(environ, database_uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for `database_uri` from DB_POOL_* variables."""
+    if database_uri.startswith('sqlite') and ':memory:' in database_uri:
+        return {}
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool(environ.get('DB_POOL_PRE_PING'), True),
+    }
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {'checkouts': 0, 'timeouts': 0, 'connects': 0, 'invalidations': 0, 'checkout_errors': 0}
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def checkout(self, seconds, checked_out, overflow):
+        with self._lock:
+            self.counters['checkouts'] += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+            self.latencies.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            ordered = sorted(self.latencies)
+            checkouts = self.counters['checkouts']
+            return {
+                **self.counters,
+                'peak_checked_out': self.peak_checked_out,
+                'peak_overflow': self.peak_overflow,
+                'checkout_ms': {
+                    'mean': round(self.checkout_seconds / checkouts * 1000, 3) if checkouts else None,
+                    'p50': round(_percentile(ordered, 50) * 1000, 3) if ordered else None,
+                    'p95': round(_percentile(ordered, 95) * 1000, 3) if ordered else None,
+                    'p99': round(_percentile(ordered, 99) * 1000, 3) if ordered else None,
+                    'max': round(self.max_checkout_seconds * 1000, 3),
+                    'window': len(ordered),
+                },
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording checkout wait time, timeouts and overflow into `stats`."""
+
+    stats = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.incr('timeouts')
+            raise
+        except Exception:
+            if self.stats is not None:
+                self.stats.incr('checkout_errors')
+            raise
+        if self.stats is not None:
+            self.stats.checkout(time.perf_counter() - started, self.checkedout(), max(self.overflow(), 0))
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class DatabasePoolMetrics:
+    """Flask extension attaching PoolStats to the app's engine."""
+
+    def __init__(self, app=None, db=None):
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        stats = PoolStats()
+        app.extensions['db_pool'] = {'stats': stats}
+        with app.app_context():
+            engine = db.engine
+        app.extensions['db_pool']['engine'] = engine
+
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.stats = stats
+
+        @event.listens_for(engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            stats.incr('connects')
+
+        @event.listens_for(engine, 'invalidate')
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            stats.incr('invalidations')
+
+    def info(self):
+        state = current_app.extensions['db_pool']
+        pool = state['engine'].pool
+        current = {'class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            current.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': max(pool.overflow(), 0),
+                'timeout': pool.timeout(),
+            })
+        options = current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        config = {key: value for key, value in options.items() if key != 'poolclass'}
+        return {'config': config, 'pool': current, 'stats': state['stats'].snapshot()}
+
+
+pool_metrics = DatabasePoolMetrics()
@@ -0,0 +1,125 @@
+"""
+Facet counts (job_type, location, skills) for active jobs.
+
+Unfiltered counts are read from the `job_facet_counts` rollup, which the job
+write paths adjust incrementally: they capture `facet_values(job)` before and
+after a change and pass both to `record_change`. Filtered counts (search or
+filters present) run a GROUP BY over the matching jobs; those responses are
+cached under the 'jobs' tag like the listings themselves.
+"""
+from collections import Counter
+from sqlalchemy import func, text
+from src.models.user import db
+from src.models.job import Job, Skill, JobSkill, JobFacetCount
+
+FACETS = ('job_type', 'location', 'skills')
+
+_UPSERT_SQL = text(
+    "INSERT INTO job_facet_counts (facet, value, count) VALUES (:facet, :value, :delta) "
+    "ON CONFLICT (facet, value) DO UPDATE SET count = job_facet_counts.count + excluded.count"
+)
+
+
+def facet_values(job):
+    """The (facet, value) pairs an active job contributes to; empty for inactive jobs."""
+    if not job.is_active:
+        return set()
+    values = {('job_type', job.job_type), ('location', job.location)}
+    values.update(('skills', skill.name) for skill in job.skill_list)
+    return {(facet, value) for facet, value in values if value}
+
+
+def change_deltas(before, after):
+    """Counter of count adjustments for a job moving from `before` to `after` values."""
+    deltas = Counter()
+    for key in after - before:
+        deltas[key] += 1
+    for key in before - after:
+        deltas[key] -= 1
+    return deltas
+
+
+def apply_deltas(session, deltas):
+    """Apply a Counter of {(facet, value): delta} to the rollup in one batched statement."""
+    params = [{'facet': facet, 'value': value[:200], 'delta': delta}
+              for (facet, value), delta in deltas.items() if delta]
+    if not params:
+        return
+    session.execute(_UPSERT_SQL, params)
+    session.execute(text("DELETE FROM job_facet_counts WHERE count <= 0"))
+
+
+def record_change(session, before, after):
+    apply_deltas(session, change_deltas(before, after))
+
+
+def rebuild(session):
+    """Recompute the rollup from the jobs tables (repairs any drift)."""
+    session.execute(text("DELETE FROM job_facet_counts"))
+    session.execute(text(
+        "INSERT INTO job_facet_counts (facet, value, count) "
+        "SELECT 'job_type', job_type, count(*) FROM jobs "
+        "WHERE is_active = :active AND job_type IS NOT NULL AND job_type != '' GROUP BY job_type"
+    ), {'active': True})
+    session.execute(text(
+        "INSERT INTO job_facet_counts (facet, value, count) "
+        "SELECT 'location', location, count(*) FROM jobs "
+        "WHERE is_active = :active AND location IS NOT NULL AND location != '' GROUP BY location"
+    ), {'active': True})
+    session.execute(text(
+        "INSERT INTO job_facet_counts (facet, value, count) "
+        "SELECT 'skills', skills.name, count(*) FROM job_skills "
+        "JOIN skills ON skills.id = job_skills.skill_id "
+        "JOIN jobs ON jobs.id = job_skills.job_id "
+        "WHERE jobs.is_active = :active GROUP BY skills.name"
+    ), {'active': True})
+
+
+def _as_buckets(rows, limit):
+    buckets = sorted(({'value': value, 'count': count} for value, count in rows if value),
+                     key=lambda bucket: (-bucket['count'], bucket['value']))
+    return buckets[:limit]
+
+
+def rollup_facets(limit):
+    """Facet counts over all active jobs, read from the rollup table."""
+    rows = db.session.query(JobFacetCount.facet, JobFacetCount.value, JobFacetCount.count)\
+                     .filter(JobFacetCount.count > 0).all()
+    grouped = {facet: [] for facet in FACETS}
+    for facet, value, count in rows:
+        grouped.setdefault(facet, []).append((value, count))
+    total = sum(count for _, count in grouped['job_type'])
+    return {facet: _as_buckets(grouped[facet], limit) for facet in FACETS}, total
+
+
+def filtered_facets(query, limit):
+    """Facet counts over the jobs matched by `query` (an already-filtered Job query)."""
+    base = query.order_by(None)
+    job_ids = base.with_entities(Job.id).subquery()
+    
+    job_type_rows = db.session.query(Job.job_type, func.count(Job.id))\
+                              .filter(Job.id.in_(db.select(job_ids.c.id)))\
+                              .group_by(Job.job_type).all()
+    location_rows = db.session.query(Job.location, func.count(Job.id))\
+                              .filter(Job.id.in_(db.select(job_ids.c.id)))\
+                              .group_by(Job.location).all()
+    skill_rows = db.session.query(Skill.name, func.count(JobSkill.job_id))\
+                           .join(JobSkill, JobSkill.skill_id == Skill.id)\
+                           .filter(JobSkill.job_id.in_(db.select(job_ids.c.id)))\
+                           .group_by(Skill.name).all()
+    
+    facets = {
+        'job_type': _as_buckets(job_type_rows, limit),
+        'location': _as_buckets(location_rows, limit),
+        'skills': _as_buckets(skill_rows, limit),
+    }
+    return facets, sum(count for _, count in job_type_rows)
+
+
+def ensure_rollup(session):
+    """Build the rollup if it is empty while active jobs exist (e.g. a fresh local database)."""
+    has_rollup = session.execute(text("SELECT 1 FROM job_facet_counts LIMIT 1")).scalar()
+    has_jobs = session.execute(text("SELECT 1 FROM jobs WHERE is_active = :active LIMIT 1"), {'active': True}).scalar()
+    if has_jobs and not has_rollup:
+        rebuild(session)
+        session.commit()
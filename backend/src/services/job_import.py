@@ -0,0 +1,208 @@
+"""
+Bulk job import for employers.
+
+Rows come from a JSON array (or {"jobs": [...]}), an NDJSON body or a CSV
+body, either as the raw request body or as a `file` upload. Every row is
+validated like `POST /api/jobs` and problems are reported per row number;
+the valid rows are then written in one transaction with a fixed number of
+batched statements no matter how many rows there are:
+
+* one lookup of existing skills and, for new ones, an insert that skips
+  slugs a concurrent request just added plus a lookup of their ids,
+* one multi-row insert of jobs (ids returned in row order),
+* one executemany of job_skills,
+* one search index update and one facet rollup upsert.
+
+On PostgreSQL SQLAlchemy batches the jobs insert into multi-row INSERT ...
+RETURNING statements. SQLite cannot return ids in parameter order from a
+batch, so there the jobs are inserted row by row; SQLite runs in-process, so
+that costs no network round trips.
+"""
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from src.models.user import db
+from src.models.job import Job, Skill, JobSkill, parse_skills
+from src.services.facets import apply_deltas
+from src.services.search import search_index
+
+REQUIRED_FIELDS = ('title', 'description', 'job_type', 'location')
+# Column lengths of the jobs table
+MAX_LENGTHS = {'title': 200, 'job_type': 50, 'location': 200, 'skills': 500}
+
+
+class InvalidImport(ValueError):
+    """The payload as a whole cannot be read (bad format, too many rows)."""
+
+
+def _format_of(content_type, filename):
+    content_type = (content_type or '').split(';', 1)[0].strip().lower()
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    if content_type in ('text/csv', 'application/csv') or extension == 'csv':
+        return 'csv'
+    if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl') \
+            or extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    if content_type == 'application/json' or extension == 'json':
+        return 'json'
+    raise InvalidImport('Unsupported format: send JSON, NDJSON or CSV')
+
+
+def parse_rows(request, max_rows):
+    """Read the import rows from the request as a list of dicts (or non-dict JSON values)."""
+    upload = request.files.get('file')
+    if upload is not None:
+        fmt = _format_of(upload.mimetype, upload.filename)
+        raw = upload.read()
+    else:
+        fmt = _format_of(request.mimetype, None)
+        raw = request.get_data(cache=False)
+    try:
+        body = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise InvalidImport('Payload must be UTF-8 encoded')
+
+    if fmt == 'csv':
+        # Blank lines come back from DictReader as all-empty rows
+        rows = [row for row in csv.DictReader(io.StringIO(body))
+                if any((value or '').strip() for value in row.values() if isinstance(value, str))]
+    elif fmt == 'ndjson':
+        rows = []
+        for number, line in enumerate(body.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise InvalidImport(f'Line {number} is not valid JSON: {e.msg}')
+    else:
+        try:
+            data = json.loads(body) if body.strip() else None
+        except json.JSONDecodeError as e:
+            raise InvalidImport(f'Invalid JSON: {e.msg}')
+        rows = data.get('jobs') if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            raise InvalidImport('Expected a JSON array of jobs or an object with a "jobs" array')
+
+    if len(rows) > max_rows:
+        raise InvalidImport(f'Too many rows: at most {max_rows} jobs per import')
+    return rows
+
+
+def validate_row(row):
+    """Return (values, errors) for one input row; `errors` maps field -> message."""
+    if not isinstance(row, dict):
+        return None, {'row': 'must be an object'}
+    values, errors = {}, {}
+    for field in REQUIRED_FIELDS:
+        value = row.get(field)
+        value = value.strip() if isinstance(value, str) else value
+        if not value:
+            errors[field] = f'{field} is required'
+        elif not isinstance(value, str):
+            errors[field] = f'{field} must be a string'
+        elif field in MAX_LENGTHS and len(value) > MAX_LENGTHS[field]:
+            errors[field] = f'{field} must be at most {MAX_LENGTHS[field]} characters'
+        else:
+            values[field] = value
+
+    deadline = row.get('deadline')
+    values['deadline'] = None
+    if deadline:
+        try:
+            values['deadline'] = datetime.strptime(str(deadline).strip(), '%Y-%m-%d').date()
+        except ValueError:
+            errors['deadline'] = 'Invalid deadline format. Use YYYY-MM-DD'
+
+    skills = row.get('skills')
+    if skills is not None and not isinstance(skills, (str, list)):
+        errors['skills'] = 'skills must be a list or a comma-separated string'
+    else:
+        values['skill_names'] = parse_skills(skills)
+        if len(', '.join(values['skill_names'])) > MAX_LENGTHS['skills']:
+            errors['skills'] = f"skills must be at most {MAX_LENGTHS['skills']} characters in total"
+    return values, errors
+
+
+def _skills_by_slug(names):
+    """Skill (id, name) per slug for `names`, inserting the missing ones in one statement."""
+    slugs = {}
+    for name in names:
+        slugs.setdefault(Skill.slugify(name), name)
+    found = {}
+
+    def lookup(wanted):
+        for skill_id, slug, name in db.session.query(Skill.id, Skill.slug, Skill.name)\
+                                              .filter(Skill.slug.in_(wanted)):
+            found[slug] = (skill_id, name)
+
+    if slugs:
+        lookup(list(slugs))
+    missing = [{'name': name, 'slug': slug} for slug, name in slugs.items() if slug not in found]
+    if missing:
+        # A concurrent request may add the same skills; its rows are picked up by the lookup
+        Skill.insert_missing(missing)
+        lookup([row['slug'] for row in missing])
+    return found
+
+
+def import_jobs(employer_id, rows, atomic=False):
+    """Validate `rows` and insert the valid ones; returns the result summary.
+
+    With `atomic` nothing is inserted when any row is invalid. The caller
+    commits (or rolls back) the session.
+    """
+    valid, errors = [], []
+    for number, row in enumerate(rows, 1):
+        values, row_errors = validate_row(row)
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+        else:
+            valid.append(values)
+
+    result = {'received': len(rows), 'created': 0, 'failed': len(errors), 'job_ids': [], 'errors': errors}
+    if not valid or (atomic and errors):
+        return result
+
+    skills = _skills_by_slug([name for values in valid for name in values['skill_names']])
+    now = datetime.utcnow()
+    job_rows = []
+    for values in valid:
+        values['skills'] = [skills[Skill.slugify(name)] for name in values['skill_names']]
+        job_rows.append({
+            'title': values['title'],
+            'description': values['description'],
+            'job_type': values['job_type'],
+            'location': values['location'],
+            'deadline': values['deadline'],
+            'skills': ', '.join(values['skill_names']),
+            'employer_id': employer_id,
+            'is_active': True,
+            'created_at': now,
+            'updated_at': now,
+        })
+    job_ids = [row.id for row in db.session.execute(
+        insert(Job).returning(Job.id, sort_by_parameter_order=True), job_rows)]
+
+    job_skill_rows = [{'job_id': job_id, 'skill_id': skill_id, 'position': position}
+                      for job_id, values in zip(job_ids, valid)
+                      for position, (skill_id, _) in enumerate(values['skills'])]
+    if job_skill_rows:
+        db.session.execute(insert(JobSkill), job_skill_rows)
+
+    search_index.index_jobs(db.session, job_ids)
+    deltas = Counter()
+    for values in valid:
+        deltas[('job_type', values['job_type'])] += 1
+        deltas[('location', values['location'])] += 1
+        for _, name in values['skills']:
+            deltas[('skills', name)] += 1
+    apply_deltas(db.session, deltas)
+
+    result.update(created=len(job_ids), job_ids=job_ids)
+    return result
@@ -0,0 +1,281 @@
+"""
+Prometheus metrics for every gunicorn worker, served from any one of them.
+
+Each process records request counts, latency histograms and 5xx counts
+labelled by Flask endpoint (`jobs.get_jobs`, `auth.login`...). Gunicorn
+workers are separate processes, so with METRICS_DIR set (gunicorn.conf.py
+sets it) each worker also writes its numbers to its own JSON file there,
+atomically, at most every METRICS_FLUSH_SECONDS (default 5) from a
+background thread. `/metrics` sums the files of all workers:
+
+* counters and histograms also keep the totals of workers that have exited,
+  so they never go backwards when gunicorn recycles a worker;
+* gauges (pool connections in use, cache entries) only count live workers.
+
+The database pool and response cache counters each service already keeps
+(services/db_pool.py, services/cache.py) are exported alongside. Without
+METRICS_DIR (flask run, a single process) only the serving process is
+reported.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+from flask import current_app, g, request
+from sqlalchemy.pool import QueuePool
+
+from src.services.cache import MemoryBackend
+
+# Request latency buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = 'jobconnect_'
+
+HELP = {
+    'http_requests_total': ('counter', 'Requests handled, by endpoint, method and status.'),
+    'http_request_errors_total': ('counter', 'Requests that ended in a 5xx response, by endpoint.'),
+    'http_request_duration_seconds': ('histogram', 'Time to build the response, by endpoint.'),
+    'db_pool_checkouts_total': ('counter', 'Connections checked out of the pool.'),
+    'db_pool_checkout_timeouts_total': ('counter', 'Checkouts that timed out waiting for a connection.'),
+    'db_pool_checkout_seconds_total': ('counter', 'Time spent waiting for pool checkouts.'),
+    'db_pool_connects_total': ('counter', 'New database connections opened.'),
+    'db_pool_invalidations_total': ('counter', 'Connections invalidated after an error.'),
+    'db_pool_checked_out': ('gauge', 'Connections currently checked out.'),
+    'db_pool_overflow': ('gauge', 'Connections currently open beyond the pool size.'),
+    'cache_operations_total': ('counter', 'Response cache operations, by result.'),
+    'cache_entries': ('gauge', 'Entries in the per-worker memory response caches.'),
+    'metrics_processes': ('gauge', 'Live processes included in these metrics.'),
+}
+
+
+class ProcessMetrics:
+    """Counters and histograms of one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def incr(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    histogram['buckets'][index] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, dict(labels), dict(h, buckets=list(h['buckets']))]
+                               for (name, labels), h in self.histograms.items()],
+            }
+
+
+def _service_samples(app):
+    """(counters, gauges) from the pool and cache stats of this process."""
+    counters, gauges = [], []
+    pool_state = app.extensions.get('db_pool')
+    if pool_state:
+        stats = pool_state['stats'].snapshot()
+        counters += [
+            ['db_pool_checkouts_total', {}, stats['checkouts']],
+            ['db_pool_checkout_timeouts_total', {}, stats['timeouts']],
+            ['db_pool_connects_total', {}, stats['connects']],
+            ['db_pool_invalidations_total', {}, stats['invalidations']],
+            ['db_pool_checkout_seconds_total', {}, pool_state['stats'].checkout_seconds],
+        ]
+        pool = pool_state['engine'].pool
+        if isinstance(pool, QueuePool):
+            gauges += [['db_pool_checked_out', {}, pool.checkedout()],
+                       ['db_pool_overflow', {}, max(pool.overflow(), 0)]]
+    cache_state = app.extensions.get('response_cache')
+    if cache_state:
+        counters += [['cache_operations_total', {'result': result}, value]
+                     for result, value in cache_state['stats'].snapshot().items()]
+        # A redis cache is shared, so only the per-worker memory cache is summed
+        if isinstance(cache_state['backend'], MemoryBackend):
+            gauges.append(['cache_entries', {}, cache_state['backend'].size()])
+    return counters, gauges
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Metrics:
+    """Flask extension recording request metrics and rendering /metrics."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_DIR', None)
+        app.config.setdefault('METRICS_FLUSH_SECONDS', 5)
+        app.config.setdefault('METRICS_TOKEN', None)
+        app.extensions['metrics'] = {'pid': None, 'lock': threading.Lock()}
+
+        @app.before_request
+        def _start_timer():
+            g._metrics_started = time.perf_counter()
+
+        @app.after_request
+        def _record(response):
+            started = g.pop('_metrics_started', None)
+            if started is not None:
+                self.record(app, request.endpoint or 'unmatched', request.method, response.status_code,
+                            time.perf_counter() - started)
+            return response
+
+    def _process(self, app):
+        """This process's metrics, started afresh in each forked worker."""
+        state = app.extensions['metrics']
+        if state['pid'] != os.getpid():
+            with state['lock']:
+                if state['pid'] != os.getpid():
+                    state['metrics'] = ProcessMetrics()
+                    state['file'] = None
+                    directory = app.config['METRICS_DIR']
+                    if directory:
+                        state['file'] = os.path.join(directory, f'{os.getpid()}-{uuid.uuid4().hex[:8]}.json')
+                        interval = app.config['METRICS_FLUSH_SECONDS']
+                        threading.Thread(target=self._flush_loop, args=(app, state['metrics'], state['file'],
+                                                                        interval),
+                                         name='metrics-flush', daemon=True).start()
+                    state['pid'] = os.getpid()
+        return state
+
+    def record(self, app, endpoint, method, status, seconds):
+        metrics = self._process(app)['metrics']
+        metrics.incr('http_requests_total', {'endpoint': endpoint, 'method': method, 'status': str(status)})
+        if status >= 500:
+            metrics.incr('http_request_errors_total', {'endpoint': endpoint})
+        metrics.observe('http_request_duration_seconds', {'endpoint': endpoint}, seconds)
+
+    def _snapshot(self, app, metrics):
+        snapshot = metrics.snapshot()
+        counters, gauges = _service_samples(app)
+        snapshot['counters'] += counters
+        snapshot['gauges'] = gauges
+        snapshot['pid'] = os.getpid()
+        return snapshot
+
+    def _write(self, app, metrics, path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f'{path}.tmp'
+            with open(temporary, 'w') as f:
+                json.dump(self._snapshot(app, metrics), f)
+            os.replace(temporary, path)
+        except OSError as e:
+            app.logger.warning('Writing metrics to %s failed: %s', path, e)
+
+    def _flush_loop(self, app, metrics, path, interval):
+        while True:
+            time.sleep(interval)
+            self._write(app, metrics, path)
+
+    def flush(self, app):
+        """Write this process's metrics now (gunicorn's worker_exit hook)."""
+        state = app.extensions['metrics']
+        if state['pid'] == os.getpid() and state['file']:
+            self._write(app, state['metrics'], state['file'])
+
+    def _snapshots(self, app):
+        state = self._process(app)
+        current = self._snapshot(app, state['metrics'])
+        snapshots = [current]
+        directory = app.config['METRICS_DIR']
+        if not directory or not os.path.isdir(directory):
+            return snapshots
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if not name.endswith('.json') or path == state['file']:
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        """All processes' metrics in the Prometheus text exposition format."""
+        app = current_app._get_current_object()
+        counters, gauges, histograms = {}, {}, {}
+        processes = 0
+        for snapshot in self._snapshots(app):
+            alive = _pid_alive(snapshot['pid'])
+            processes += alive
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(sorted(labels.items())))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, value in snapshot.get('gauges', []) if alive else []:
+                key = (name, tuple(sorted(labels.items())))
+                gauges[key] = gauges.get(key, 0) + value
+            for name, labels, histogram in snapshot['histograms']:
+                key = (name, tuple(sorted(labels.items())))
+                total = histograms.setdefault(key, {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0})
+                total['buckets'] = [a + b for a, b in zip(total['buckets'], histogram['buckets'])]
+                total['sum'] += histogram['sum']
+                total['count'] += histogram['count']
+        gauges[('metrics_processes', ())] = processes
+
+        samples = {}
+        for (name, labels), value in counters.items():
+            samples.setdefault(name, []).append(f'{PREFIX}{name}{_labels(labels)} {_number(value)}')
+        for (name, labels), value in gauges.items():
+            samples.setdefault(name, []).append(f'{PREFIX}{name}{_labels(labels)} {_number(value)}')
+        for (name, labels), histogram in histograms.items():
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram['buckets']):
+                cumulative += count
+                lines.append(f'{PREFIX}{name}_bucket{_labels(labels + (("le", repr(bound)),))} {cumulative}')
+            lines.append(f'{PREFIX}{name}_bucket{_labels(labels + (("le", "+Inf"),))} {histogram["count"]}')
+            lines.append(f'{PREFIX}{name}_sum{_labels(labels)} {_number(histogram["sum"])}')
+            lines.append(f'{PREFIX}{name}_count{_labels(labels)} {histogram["count"]}')
+
+        output = []
+        for name in sorted(samples):
+            kind, description = HELP.get(name, ('untyped', name))
+            output.append(f'# HELP {PREFIX}{name} {description}')
+            output.append(f'# TYPE {PREFIX}{name} {kind}')
+            output.extend(sorted(samples[name]) if kind != 'histogram' else samples[name])
+        return '\n'.join(output) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+metrics = Metrics()
@@ -0,0 +1,116 @@
+"""
+Pagination helpers shared by the listing endpoints.
+
+Two modes are supported:
+
+* page numbers (`page=`/`per_page=`), backed by Flask-SQLAlchemy's OFFSET
+  paginate. This is what existing clients use.
+* keyset cursors (`cursor=`), ordered by `(sort_column, id)` descending. The
+  cursor is an opaque token encoding the last row of the previous page, so
+  every page is an index range scan no matter how deep the client goes.
+
+Both modes accept `include_total=false` to skip the `COUNT(*)` query and cap
+`per_page` at MAX_PER_PAGE.
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+MAX_PER_PAGE = 100
+
+
+class InvalidCursor(ValueError):
+    """A malformed cursor, page or per_page argument; listings answer 400."""
+
+
+def parse_bool(value, default=True):
+    if value is None or value == '':
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def _positive_int(args, name, default):
+    value = args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise InvalidCursor(f'{name} must be a positive integer')
+    return number
+
+
+def encode_cursor(sort_value, row_id):
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def keyset_paginate(query, sort_column, id_column, cursor, per_page, include_total=True):
+    """Return (items, meta) for the page after `cursor` ('' for the first page)."""
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+
+    total = query.order_by(None).count() if include_total else None
+
+    query = query.order_by(None).order_by(sort_column.desc(), id_column.desc())
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+
+    # Fetch one extra row to learn whether another page exists
+    items = query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+    meta = {
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'per_page': per_page,
+    }
+    if include_total:
+        meta['total'] = total
+    return items, meta
+
+
+def page_paginate(query, page, per_page, include_total=True):
+    """Return (items, meta) using page numbers, as the listings always have."""
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    result = query.paginate(page=page, per_page=per_page, error_out=False, count=include_total)
+    meta = {
+        'total': result.total,
+        'pages': result.pages if include_total else None,
+        'current_page': page,
+        'per_page': per_page,
+    }
+    return result.items, meta
+
+
+def paginate_request(args, query, sort_column, id_column, default_per_page=10):
+    """Paginate `query` according to the request args.
+
+    Cursor mode is used when a `cursor` argument is present (empty for the
+    first page); otherwise page-number mode is used.
+    """
+    per_page = _positive_int(args, 'per_page', default_per_page)
+    include_total = parse_bool(args.get('include_total'))
+    cursor = args.get('cursor')
+    if cursor is not None:
+        return keyset_paginate(query, sort_column, id_column, cursor, per_page, include_total)
+    page = _positive_int(args, 'page', 1)
+    return page_paginate(query, page, per_page, include_total)
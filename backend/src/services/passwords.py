@@ -0,0 +1,158 @@
+"""
+Password hashing off the request thread, under a per-process concurrency cap.
+
+Hashing runs in a small thread pool (hashlib's scrypt/pbkdf2 release the GIL),
+so at most PASSWORD_HASH_WORKERS hashes burn CPU at once and the other request
+threads keep serving. At most PASSWORD_HASH_MAX_PENDING hash jobs may wait for
+the pool; beyond that callers get PasswordHasherBusy immediately and the route
+answers 503 instead of queueing logins behind each other.
+
+PASSWORD_HASH_METHOD is a werkzeug method string ("scrypt:32768:8:1",
+"pbkdf2:sha256:1000000"). Stored hashes made with another algorithm or a lower
+cost are reported by `needs_rehash()` and upgraded on the next successful login.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+def _parse_method(method):
+    # "scrypt:32768:8:1" -> ('scrypt', (32768, 8, 1)); "pbkdf2:sha256:600000" -> ('pbkdf2:sha256', (600000,))
+    parts = method.split(':')
+    name = [parts[0]]
+    costs = []
+    for part in parts[1:]:
+        if part.isdigit():
+            costs.append(int(part))
+        elif not costs:
+            name.append(part)
+    if name == ['pbkdf2']:
+        name.append('sha256')  # werkzeug's default digest
+    return ':'.join(name), tuple(costs)
+
+
+class HashStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {'hashes': 0, 'verifications': 0, 'rehashes': 0, 'rejected': 0}
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def timing(self, waited, hashed):
+        with self._lock:
+            self.wait_seconds += waited
+            self.hash_seconds += hashed
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.counters, 'wait_seconds': round(self.wait_seconds, 4),
+                    'hash_seconds': round(self.hash_seconds, 4)}
+
+
+class _Pool:
+    """Thread pool plus admission semaphore, rebuilt after fork (pid check)."""
+
+    def __init__(self, workers, max_pending):
+        self.pid = os.getpid()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.slots = threading.BoundedSemaphore(workers + max_pending)
+
+
+class PasswordHasher:
+    """Flask extension hashing and verifying passwords in a bounded pool."""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._pool = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 16)
+        app.extensions['password_hasher'] = {'stats': HashStats()}
+
+    def _config(self, name, default):
+        return current_app.config.get(name, default) if has_app_context() else default
+
+    @property
+    def method(self):
+        return self._config('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+
+    @property
+    def stats(self):
+        return current_app.extensions['password_hasher']['stats']
+
+    def _get_pool(self):
+        pool = self._pool
+        if pool is None or pool.pid != os.getpid():
+            with self._lock:
+                pool = self._pool
+                if pool is None or pool.pid != os.getpid():
+                    pool = self._pool = _Pool(self._config('PASSWORD_HASH_WORKERS', 2),
+                                              self._config('PASSWORD_HASH_MAX_PENDING', 16))
+        return pool
+
+    def shutdown(self):
+        """Drop the pool; the next hash builds a new one from the current config."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and pool.pid == os.getpid():
+            pool.executor.shutdown(wait=True)
+
+    def _run(self, fn, *args):
+        pool = self._get_pool()
+        stats = self.stats
+        if not pool.slots.acquire(blocking=False):
+            stats.incr('rejected')
+            raise PasswordHasherBusy('Too many concurrent password checks, please retry')
+        submitted = time.perf_counter()
+        try:
+            def timed():
+                started = time.perf_counter()
+                result = fn(*args)
+                stats.timing(started - submitted, time.perf_counter() - started)
+                return result
+            return pool.executor.submit(timed).result()
+        finally:
+            pool.slots.release()
+
+    def hash(self, password):
+        """Hash `password` under the current policy."""
+        self.stats.incr('hashes')
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        self.stats.incr('verifications')
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if `password_hash` uses another algorithm or a lower cost than the policy."""
+        stored_name, stored_costs = _parse_method(password_hash.split('$', 1)[0])
+        policy_name, policy_costs = _parse_method(self.method)
+        if stored_name != policy_name:
+            return True
+        # A bare "scrypt" / "pbkdf2:sha256" policy accepts werkzeug's defaults for that algorithm
+        return any(stored < wanted for stored, wanted in zip(stored_costs, policy_costs))
+
+    def info(self):
+        return {'method': self.method, 'workers': current_app.config['PASSWORD_HASH_WORKERS'],
+                'max_pending': current_app.config['PASSWORD_HASH_MAX_PENDING'], **self.stats.snapshot()}
+
+
+password_hasher = PasswordHasher()
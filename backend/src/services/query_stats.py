@@ -0,0 +1,190 @@
+"""
+Per-request SQL instrumentation.
+
+Cursor events on the engine time every statement. Inside a request the
+statement count, total database time and the SQL_TOP_STATEMENTS slowest
+statements are collected on `flask.g`; when the request ends they are folded
+into per-endpoint totals for this worker (served by `QueryStats.info()`) and,
+with SQL_SERVER_TIMING on, sent back as a Server-Timing header that browser
+dev tools display next to the request:
+
+    Server-Timing: db;dur=12.4;desc="7 queries", app;dur=31.0
+
+Two thresholds feed a structured (one JSON object per line) slow-query log:
+
+* a statement taking SLOW_QUERY_MS or more (default 100) is logged with the
+  endpoint that issued it;
+* a request spending SLOW_REQUEST_DB_MS or more in the database in total
+  (default 500) is logged with its query count and slowest statements, which
+  catches endpoints that are slow through many fast queries.
+
+Parameters are never logged, since they can hold password hashes and tokens.
+Set either threshold to 0 to turn that log off.
+"""
+import heapq
+import json
+import logging
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text kept in logs and stats
+MAX_SQL_LENGTH = 1000
+
+
+def _statement_text(statement):
+    text = ' '.join(statement.split())
+    return text if len(text) <= MAX_SQL_LENGTH else text[:MAX_SQL_LENGTH] + '...'
+
+
+class RequestQueries:
+    """Statements run while handling one request."""
+
+    def __init__(self, keep):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.seconds = 0.0
+        self.keep = keep
+        self._slowest = []
+        self._sequence = 0
+
+    def add(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self._sequence += 1
+        # (seconds, sequence) keeps the heap from ever comparing statements
+        entry = (seconds, self._sequence, statement)
+        if len(self._slowest) < self.keep:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest(self):
+        return [{'duration_ms': round(seconds * 1000, 2), 'sql': _statement_text(statement)}
+                for seconds, _, statement in sorted(self._slowest, reverse=True)]
+
+
+class EndpointTotals:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def add(self, endpoint, queries, seconds):
+        with self._lock:
+            totals = self._endpoints.setdefault(endpoint, {'requests': 0, 'queries': 0, 'seconds': 0.0,
+                                                           'max_seconds': 0.0, 'max_queries': 0})
+            totals['requests'] += 1
+            totals['queries'] += queries
+            totals['seconds'] += seconds
+            totals['max_seconds'] = max(totals['max_seconds'], seconds)
+            totals['max_queries'] = max(totals['max_queries'], queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(totals) for endpoint, totals in self._endpoints.items()}
+
+
+class QueryStats:
+    """Flask extension timing SQL statements per request."""
+
+    def __init__(self, app=None, db=None):
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('SQL_SERVER_TIMING', False)
+        app.config.setdefault('SLOW_QUERY_MS', 100)
+        app.config.setdefault('SLOW_REQUEST_DB_MS', 500)
+        app.config.setdefault('SQL_TOP_STATEMENTS', 3)
+        totals = EndpointTotals()
+        app.extensions['query_stats'] = {'totals': totals}
+        with app.app_context():
+            engine = db.engine
+        # Read once: this check runs on every statement
+        slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000.0
+        keep = app.config['SQL_TOP_STATEMENTS']
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._query_stats_started = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, '_query_stats_started', None)
+            if started is None:
+                return
+            seconds = time.perf_counter() - started
+            in_request = has_request_context()
+            if in_request:
+                queries = g.get('_request_queries')
+                if queries is None:
+                    queries = g._request_queries = RequestQueries(keep)
+                queries.add(statement, seconds)
+            if slow_query_seconds and seconds >= slow_query_seconds:
+                logger.warning(json.dumps({
+                    'event': 'slow_query',
+                    'endpoint': request.endpoint if in_request else None,
+                    'method': request.method if in_request else None,
+                    'path': request.path if in_request else None,
+                    'duration_ms': round(seconds * 1000, 2),
+                    'executemany': executemany,
+                    'sql': _statement_text(statement),
+                }))
+
+        @app.before_request
+        def _start_request():
+            if '_request_queries' not in g:
+                g._request_queries = RequestQueries(keep)
+
+        @app.after_request
+        def _finish_request(response):
+            queries = g.pop('_request_queries', None)
+            if queries is None:
+                return response
+            totals.add(request.endpoint or 'unmatched', queries.count, queries.seconds)
+
+            db_ms = queries.seconds * 1000
+            if app.config['SQL_SERVER_TIMING']:
+                app_ms = (time.perf_counter() - queries.started) * 1000
+                response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{queries.count} queries", '
+                                                      f'app;dur={app_ms:.1f}')
+            slow_request_ms = app.config['SLOW_REQUEST_DB_MS']
+            if slow_request_ms and db_ms >= slow_request_ms:
+                logger.warning(json.dumps({
+                    'event': 'slow_request_db',
+                    'endpoint': request.endpoint,
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'queries': queries.count,
+                    'db_ms': round(db_ms, 2),
+                    'slowest': queries.slowest(),
+                }))
+            return response
+
+    def info(self):
+        """Per-endpoint query counts and database time in this worker."""
+        endpoints = {}
+        for endpoint, totals in sorted(current_app.extensions['query_stats']['totals'].snapshot().items()):
+            requests = totals['requests']
+            endpoints[endpoint] = {
+                'requests': requests,
+                'queries_per_request': round(totals['queries'] / requests, 2),
+                'max_queries': totals['max_queries'],
+                'db_ms_per_request': round(totals['seconds'] / requests * 1000, 3),
+                'max_db_ms': round(totals['max_seconds'] * 1000, 3),
+            }
+        config = current_app.config
+        return {
+            'config': {key: config[key] for key in ('SQL_SERVER_TIMING', 'SLOW_QUERY_MS',
+                                                    'SLOW_REQUEST_DB_MS', 'SQL_TOP_STATEMENTS')},
+            'endpoints': endpoints,
+        }
+
+
+query_stats = QueryStats()
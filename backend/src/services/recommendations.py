@@ -0,0 +1,223 @@
+"""
+Job recommendations for job seekers.
+
+Each worker keeps a TF-IDF model of the active jobs in memory: a SciPy CSR
+matrix of sublinear term frequencies (one row per job, with title and skills
+counted twice), the document frequency of every term and the row norms under
+the current IDF. A seeker's query vector combines their experience/education
+text with the jobs they already applied to; scoring every job is then one
+sparse matrix-vector product and the top k are picked with
+`numpy.argpartition`, so nothing loops over jobs in Python.
+
+The model is kept current incrementally. At most every RECOMMEND_SYNC_SECONDS
+(default 30) a request loads just the jobs whose `updated_at` moved past the
+last sync, and writes made by this worker force a sync on the next request.
+Changed jobs are appended as new rows and their old rows retired; the matrix
+is compacted once retired rows make up a quarter of it.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+import numpy as np
+from scipy import sparse
+
+from flask import current_app
+
+from src.models.job import Job
+
+MAX_LIMIT = 50
+# Jobs updated this close to the last sync are looked at again, so commits
+# that land late (or clocks that differ slightly between hosts) are not missed
+SYNC_OVERLAP = timedelta(minutes=1)
+# Weight of title and skill terms relative to the description
+FIELD_WEIGHT = 2
+
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+STOP_WORDS = frozenset('''
+    a an and are as at be but by for from has have in is it its of on or our that the their this to
+    we will with you your who what when where which while about into over under than then them they
+    us all any can may must should would also more most other some such only own same so too very
+    years year experience work working team role job using use used including
+'''.split())
+
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall((text or '').lower())
+            if token not in STOP_WORDS and (len(token) > 1 or token in ('c', 'r'))]
+
+
+def job_terms(title, description, skills):
+    """Term counts of a job; title and skills weigh more than the description."""
+    counts = Counter(tokenize(description))
+    for _ in range(FIELD_WEIGHT):
+        counts.update(tokenize(title))
+        counts.update(tokenize(skills))
+    return counts
+
+
+class _Model:
+    """The in-memory TF-IDF matrix of one worker."""
+
+    def __init__(self):
+        self.vocab = {}
+        self.df = np.zeros(0)
+        self.tf = sparse.csr_matrix((0, 0))
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.live = np.zeros(0, dtype=bool)
+        self.row_of = {}
+        self.updated_at = {}
+        self.idf = np.zeros(0)
+        self.norms = np.zeros(0)
+        self.watermark = None
+        self.next_sync = 0.0
+        self.lock = threading.Lock()
+
+    def _term_columns(self, counts):
+        columns, weights = [], []
+        for term, count in counts.items():
+            column = self.vocab.setdefault(term, len(self.vocab))
+            columns.append(column)
+            weights.append(1.0 + math.log(count))
+        return columns, weights
+
+    def _retire(self, row):
+        self.live[row] = False
+        self.df[self.tf.indices[self.tf.indptr[row]:self.tf.indptr[row + 1]]] -= 1
+
+    def apply(self, rows):
+        """Fold (id, title, description, skills, is_active, updated_at) rows into the model."""
+        data, indices, indptr, new_ids = [], [], [0], []
+        retired = False
+        for job_id, title, description, skills, is_active, updated_at in rows:
+            if self.updated_at.get(job_id) == updated_at:
+                continue
+            self.updated_at[job_id] = updated_at
+            if self.watermark is None or (updated_at and updated_at > self.watermark):
+                self.watermark = updated_at
+            row = self.row_of.pop(job_id, None)
+            if row is not None and self.live[row]:
+                self._retire(row)
+                retired = True
+            if not is_active:
+                continue
+            columns, weights = self._term_columns(job_terms(title, description, skills))
+            indices.extend(columns)
+            data.extend(weights)
+            indptr.append(len(indices))
+            self.row_of[job_id] = len(self.job_ids) + len(new_ids)
+            new_ids.append(job_id)
+
+        if not new_ids and not retired:
+            return
+        width = len(self.vocab)
+        if len(self.df) < width:
+            self.df = np.concatenate([self.df, np.zeros(width - len(self.df))])
+        if new_ids:
+            added = sparse.csr_matrix((np.array(data), np.array(indices, dtype=np.int32), np.array(indptr)),
+                                      shape=(len(new_ids), width))
+            self.df[added.indices] += 1
+            self.tf.resize((self.tf.shape[0], width))
+            self.tf = sparse.vstack([self.tf, added], format='csr')
+            self.job_ids = np.concatenate([self.job_ids, np.array(new_ids, dtype=np.int64)])
+            self.live = np.concatenate([self.live, np.ones(len(new_ids), dtype=bool)])
+
+        if len(self.live) and (~self.live).sum() * 4 > len(self.live):
+            self._compact()
+        self._reweight()
+
+    def _compact(self):
+        keep = np.flatnonzero(self.live)
+        self.tf = self.tf[keep]
+        self.job_ids = self.job_ids[keep]
+        self.live = np.ones(len(keep), dtype=bool)
+        self.row_of = {int(job_id): row for row, job_id in enumerate(self.job_ids)}
+
+    def _reweight(self):
+        documents = int(self.live.sum())
+        self.idf = np.log((1.0 + documents) / (1.0 + self.df)) + 1.0
+        squared = self.tf.multiply(self.tf).tocsr()
+        self.norms = np.sqrt(squared @ (self.idf ** 2))
+
+    def query_vector(self, text, applied_rows):
+        """Unit query in IDF-weighted term space from profile text and applied-job rows."""
+        query = np.zeros(len(self.vocab))
+        counts = Counter(term for term in tokenize(text) if term in self.vocab)
+        if counts:
+            columns = np.fromiter((self.vocab[term] for term in counts), dtype=np.int64, count=len(counts))
+            weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=float, count=len(counts)))
+            profile = np.zeros(len(self.vocab))
+            profile[columns] = weights * self.idf[columns]
+            query += profile / (np.linalg.norm(profile) or 1.0)
+        if len(applied_rows):
+            rows = self.tf[applied_rows].multiply(self.idf).tocsr()
+            rows = sparse.diags(1.0 / np.maximum(self.norms[applied_rows], 1e-12)) @ rows
+            centroid = np.asarray(rows.sum(axis=0)).ravel()
+            query += centroid / (np.linalg.norm(centroid) or 1.0)
+        return query / (np.linalg.norm(query) or 1.0)
+
+    def top(self, query, limit, exclude_rows):
+        """(job_id, score) of the best `limit` live jobs for `query`, best first."""
+        scores = self.tf @ (query * self.idf)
+        scores = np.divide(scores, self.norms, out=np.zeros_like(scores), where=self.norms > 0)
+        scores[~self.live] = 0.0
+        scores[exclude_rows] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates):
+            return []
+        limit = min(limit, len(candidates))
+        best = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return list(zip(self.job_ids[best].tolist(), scores[best].tolist()))
+
+
+class JobRecommender:
+    """Flask extension holding this worker's recommendation model."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RECOMMEND_SYNC_SECONDS', 30)
+        app.extensions['recommendations'] = _Model()
+
+    @property
+    def _model(self):
+        return current_app.extensions['recommendations']
+
+    def touch(self):
+        """Jobs changed in this worker: sync before the next recommendation."""
+        self._model.next_sync = 0.0
+
+    def _sync(self, model, session):
+        if time.monotonic() < model.next_sync:
+            return
+        columns = (Job.id, Job.title, Job.description, Job.skills, Job.is_active, Job.updated_at)
+        if model.watermark is None:
+            rows = session.query(*columns).filter(Job.is_active == True)
+        else:
+            rows = session.query(*columns).filter(Job.updated_at >= model.watermark - SYNC_OVERLAP)
+        model.apply(rows.all())
+        model.next_sync = time.monotonic() + current_app.config['RECOMMEND_SYNC_SECONDS']
+
+    def recommend(self, session, text, applied_job_ids, limit=10):
+        """[(job_id, score)] of active jobs matching `text` and the applied jobs, best first.
+
+        Jobs the seeker already applied to are never recommended.
+        """
+        model = self._model
+        with model.lock:
+            self._sync(model, session)
+            applied_rows = np.array([model.row_of[job_id] for job_id in applied_job_ids if job_id in model.row_of],
+                                    dtype=np.int64)
+            query = model.query_vector(text, applied_rows)
+            if not query.any():
+                return []
+            return model.top(query, max(1, min(limit, MAX_LIMIT)), applied_rows)
+
+
+job_recommender = JobRecommender()
@@ -0,0 +1,264 @@
+"""
+Full-text search index for job listings.
+
+Jobs are indexed on title, description and skills. PostgreSQL deployments use a
+weighted `tsvector` column on `jobs` with a GIN index; local SQLite databases use
+an FTS5 virtual table keyed on the job id. Any other database falls back to the
+old ILIKE substring matching so the API keeps working.
+
+Search strings are parsed into bare terms and "quoted phrases". Every term and
+phrase must match (AND semantics) and the final bare term is matched as a prefix
+so search-as-you-type keeps returning results while a word is half typed.
+"""
+import re
+from flask import current_app
+from sqlalchemy import bindparam, text, or_, and_, literal_column, func
+
+_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+PG_TEXT_CONFIG = 'english'
+
+
+def parse_query(search):
+    """Split a search string into a list of (kind, tokens) clauses.
+
+    `kind` is either 'term' or 'phrase'; tokens are lowercased word characters
+    only, so they can be embedded safely in FTS5/tsquery syntax.
+    """
+    clauses = []
+    for phrase, word in _QUERY_PATTERN.findall(search or ''):
+        if phrase:
+            tokens = _TOKEN_PATTERN.findall(phrase.lower())
+            if len(tokens) > 1:
+                clauses.append(('phrase', tokens))
+            elif tokens:
+                clauses.append(('term', tokens))
+        else:
+            # A bare word such as "node.js" becomes several AND-ed terms
+            for token in _TOKEN_PATTERN.findall(word.lower()):
+                clauses.append(('term', [token]))
+    return clauses
+
+
+def _is_prefix_clause(clauses, index, search):
+    # Only the trailing bare word of an unterminated query is treated as a prefix
+    kind, _ = clauses[index]
+    return kind == 'term' and index == len(clauses) - 1 and not search.rstrip().endswith('"')
+
+
+class SQLiteFTSBackend:
+    """FTS5 virtual table `jobs_fts` whose rowid mirrors `jobs.id`."""
+
+    name = 'sqlite_fts5'
+
+    def create_schema(self, connection):
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts "
+            "USING fts5(title, description, skills, tokenize='unicode61')"
+        ))
+
+    def index_job(self, session, job):
+        session.execute(text("DELETE FROM jobs_fts WHERE rowid = :id"), {'id': job.id})
+        if job.is_active:
+            session.execute(
+                text("INSERT INTO jobs_fts(rowid, title, description, skills) "
+                     "VALUES (:id, :title, :description, :skills)"),
+                {'id': job.id, 'title': job.title or '', 'description': job.description or '',
+                 'skills': job.skills or ''}
+            )
+
+    def remove_job(self, session, job_id):
+        session.execute(text("DELETE FROM jobs_fts WHERE rowid = :id"), {'id': job_id})
+
+    def index_jobs(self, session, job_ids):
+        ids = bindparam('ids', expanding=True)
+        session.execute(text("DELETE FROM jobs_fts WHERE rowid IN :ids").bindparams(ids), {'ids': job_ids})
+        session.execute(text(
+            "INSERT INTO jobs_fts(rowid, title, description, skills) "
+            "SELECT id, title, description, coalesce(skills, '') FROM jobs WHERE id IN :ids AND is_active = 1"
+        ).bindparams(ids), {'ids': job_ids})
+
+    def rebuild(self, session):
+        session.execute(text("DELETE FROM jobs_fts"))
+        session.execute(text(
+            "INSERT INTO jobs_fts(rowid, title, description, skills) "
+            "SELECT id, title, description, coalesce(skills, '') FROM jobs WHERE is_active = 1"
+        ))
+
+    def needs_rebuild(self, session):
+        indexed = session.execute(text("SELECT count(*) FROM jobs_fts")).scalar()
+        active = session.execute(text("SELECT count(*) FROM jobs WHERE is_active = 1")).scalar()
+        return indexed != active
+
+    def match_expression(self, clauses, search):
+        parts = []
+        for index, (kind, tokens) in enumerate(clauses):
+            expr = '"' + ' '.join(tokens) + '"'
+            if _is_prefix_clause(clauses, index, search):
+                expr += '*'
+            parts.append(expr)
+        return ' AND '.join(parts)
+
+    def apply(self, query, model, clauses, search):
+        match = self.match_expression(clauses, search)
+        matching_ids = text("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH :match").bindparams(match=match)
+        return query.filter(model.id.in_(matching_ids))
+
+
+class PostgresFTSBackend:
+    """Weighted `jobs.search_vector` tsvector column backed by a GIN index."""
+
+    name = 'postgres_tsvector'
+
+    VECTOR_SQL = (
+        "setweight(to_tsvector('{cfg}', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('{cfg}', coalesce(skills, '')), 'B') || "
+        "setweight(to_tsvector('{cfg}', coalesce(description, '')), 'C')"
+    ).format(cfg=PG_TEXT_CONFIG)
+
+    def create_schema(self, connection):
+        connection.execute(text("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING gin (search_vector)"
+        ))
+
+    def index_job(self, session, job):
+        session.execute(
+            text(f"UPDATE jobs SET search_vector = {self.VECTOR_SQL} WHERE id = :id"),
+            {'id': job.id}
+        )
+
+    def remove_job(self, session, job_id):
+        # Inactive jobs are filtered out by is_active; keep the vector so that
+        # reactivating a job does not require re-indexing.
+        pass
+
+    def index_jobs(self, session, job_ids):
+        session.execute(
+            text(f"UPDATE jobs SET search_vector = {self.VECTOR_SQL} WHERE id IN :ids")
+            .bindparams(bindparam('ids', expanding=True)),
+            {'ids': job_ids}
+        )
+
+    def rebuild(self, session):
+        session.execute(text(f"UPDATE jobs SET search_vector = {self.VECTOR_SQL}"))
+
+    def needs_rebuild(self, session):
+        return bool(session.execute(
+            text("SELECT 1 FROM jobs WHERE search_vector IS NULL LIMIT 1")
+        ).scalar())
+
+    def tsquery(self, clauses, search):
+        parts = []
+        for index, (kind, tokens) in enumerate(clauses):
+            if kind == 'phrase':
+                parts.append('(' + ' <-> '.join(tokens) + ')')
+            elif _is_prefix_clause(clauses, index, search):
+                parts.append(tokens[0] + ':*')
+            else:
+                parts.append(tokens[0])
+        return ' & '.join(parts)
+
+    def apply(self, query, model, clauses, search):
+        tsquery = func.to_tsquery(PG_TEXT_CONFIG, self.tsquery(clauses, search))
+        return query.filter(literal_column('jobs.search_vector').op('@@')(tsquery))
+
+
+class LikeBackend:
+    """Fallback for databases without a supported full-text engine."""
+
+    name = 'like'
+
+    def create_schema(self, connection):
+        pass
+
+    def index_job(self, session, job):
+        pass
+
+    def remove_job(self, session, job_id):
+        pass
+
+    def index_jobs(self, session, job_ids):
+        pass
+
+    def rebuild(self, session):
+        pass
+
+    def needs_rebuild(self, session):
+        return False
+
+    def apply(self, query, model, clauses, search):
+        conditions = []
+        for kind, tokens in clauses:
+            needle = f"%{' '.join(tokens)}%"
+            conditions.append(or_(
+                model.title.ilike(needle),
+                model.description.ilike(needle),
+                model.skills.ilike(needle)
+            ))
+        return query.filter(and_(*conditions))
+
+
+_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresFTSBackend,
+}
+
+
+class JobSearchIndex:
+    """Flask extension wiring the dialect-specific search backend to the app."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, db=None):
+        """Pick the backend for the configured database.
+
+        When `db` is given the backend schema is created (if missing) and the
+        index is rebuilt when it is out of step with the `jobs` table.
+        """
+        backend = app.config.get('JOB_SEARCH_BACKEND')
+        if backend is None:
+            uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+            dialect = uri.split(':', 1)[0].split('+', 1)[0]
+            backend = _BACKENDS.get(dialect, LikeBackend)()
+        app.extensions['job_search'] = backend
+
+        if db is not None:
+            with app.app_context():
+                with db.engine.begin() as connection:
+                    backend.create_schema(connection)
+                if backend.needs_rebuild(db.session):
+                    backend.rebuild(db.session)
+                    db.session.commit()
+
+    @property
+    def backend(self):
+        return current_app.extensions.get('job_search') or LikeBackend()
+
+    def filter_query(self, query, model, search):
+        """Restrict `query` to jobs matching every term/phrase in `search`."""
+        clauses = parse_query(search)
+        if not clauses:
+            return query
+        return self.backend.apply(query, model, clauses, search)
+
+    def index_job(self, session, job):
+        """(Re)index `job`; call after flush and before commit."""
+        self.backend.index_job(session, job)
+
+    def remove_job(self, session, job_id):
+        self.backend.remove_job(session, job_id)
+
+    def index_jobs(self, session, job_ids):
+        """(Re)index many jobs with one statement per step; call before commit."""
+        if job_ids:
+            self.backend.index_jobs(session, list(job_ids))
+
+    def rebuild(self, session):
+        self.backend.rebuild(session)
+
+
+search_index = JobSearchIndex()
@@ -0,0 +1,115 @@
+"""
+Static file serving for the built frontend.
+
+The static folder is scanned once when the app is created (once per deploy
+with gunicorn's preload). The manifest maps each URL path to its file, MIME
+type, content ETag and any precompressed `.br`/`.gz` siblings written by the
+frontend build, so serving a request needs no filesystem lookups besides
+opening the chosen file.
+
+Cache policy:
+* fingerprinted build assets (`assets/index-CNzp7k34.js`) never change under
+  the same name: cached for a year and marked immutable;
+* `index.html`, also the fallback for client-side routes, must pick up new
+  asset names after a deploy: STATIC_INDEX_MAX_AGE seconds (default 60) and
+  then revalidated by ETag;
+* anything else (favicon...): STATIC_DEFAULT_MAX_AGE (default 3600).
+
+Restart the app after rebuilding the frontend so the manifest sees new files.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from collections import namedtuple
+
+from flask import current_app, request, send_file
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Vite names build output `<name>-<8+ char hash>.<ext>` under assets/
+_FINGERPRINTED = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+# Preferred first when the client accepts both equally
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+_SKIP = {'.gitkeep'}
+
+StaticAsset = namedtuple('StaticAsset', 'path mimetype etag variants immutable')
+
+
+def _content_etag(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:20]
+
+
+def build_manifest(root):
+    """Map URL paths under `root` to StaticAsset entries."""
+    manifest = {}
+    if not root or not os.path.isdir(root):
+        return manifest
+    suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    for directory, _, files in os.walk(root):
+        names = set(files)
+        for name in files:
+            if name in _SKIP or name.endswith(suffixes):
+                continue
+            path = os.path.join(directory, name)
+            url_path = os.path.relpath(path, root).replace(os.sep, '/')
+            etag = _content_etag(path)
+            # The etag tells the encodings apart so caches never mix them up
+            variants = {encoding: (os.path.join(directory, name + suffix), f'{etag}-{suffix[1:]}')
+                        for encoding, suffix in ENCODINGS if name + suffix in names}
+            mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            manifest[url_path] = StaticAsset(path, mimetype, etag, variants,
+                                             bool(_FINGERPRINTED.match(url_path)))
+    return manifest
+
+
+class StaticFiles:
+    """Flask extension serving the frontend build from a startup manifest."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('STATIC_INDEX_MAX_AGE', 60)
+        app.config.setdefault('STATIC_DEFAULT_MAX_AGE', 3600)
+        app.extensions['static_files'] = {'manifest': build_manifest(app.static_folder)}
+
+    def lookup(self, path):
+        return current_app.extensions['static_files']['manifest'].get(path)
+
+    def _negotiate(self, asset):
+        best, best_quality = None, 0
+        for encoding, _ in ENCODINGS:
+            quality = request.accept_encodings[encoding]
+            if encoding in asset.variants and quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def send(self, asset, url_path):
+        encoding = self._negotiate(asset)
+        path, etag = asset.variants[encoding] if encoding else (asset.path, asset.etag)
+        response = send_file(path, mimetype=asset.mimetype, conditional=True, etag=etag)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if asset.variants:
+            response.vary.add('Accept-Encoding')
+
+        cache_control = response.cache_control
+        cache_control.public = True
+        if asset.immutable:
+            cache_control.max_age = IMMUTABLE_MAX_AGE
+            cache_control.immutable = True
+        elif url_path == 'index.html':
+            cache_control.max_age = current_app.config['STATIC_INDEX_MAX_AGE']
+            cache_control.must_revalidate = True
+        else:
+            cache_control.max_age = current_app.config['STATIC_DEFAULT_MAX_AGE']
+        cache_control.no_cache = None
+        return response
+
+
+static_files = StaticFiles()
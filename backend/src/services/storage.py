@@ -0,0 +1,469 @@
+"""
+Content-addressed upload storage with streaming hashing and size caps.
+
+Multipart file parts are written straight into a `HashingSpool` while the
+request body is parsed: the SHA-256 and size are computed on the fly and the
+upload is aborted with 413 as soon as it passes UPLOAD_MAX_FILE_BYTES, so an
+oversized file is never buffered whole. MAX_CONTENT_LENGTH rejects oversized
+bodies from their Content-Length before any of it is read.
+
+Blobs are stored once per content hash under a sharded key
+(`ab/cd/abcd...`). `file_blobs.ref_count` counts the user fields pointing at a
+blob; releasing the last reference drops the row, and `flask gc-uploads` later
+deletes blobs without a row once they are older than UPLOAD_GC_GRACE seconds
+(the grace period covers an upload stored but not yet committed).
+
+Backends: `local` (a directory, default `src/uploads/blobs`) and `s3`
+(any S3-compatible endpoint, e.g. MinIO locally, signed with SigV4 without
+extra dependencies).
+
+Downloads carry the content hash as a strong ETag and honour Range/If-Range.
+With UPLOAD_DELIVERY=x-accel-redirect (nginx) or x-sendfile (Apache, lighttpd)
+the app only authorizes and picks the blob, and the proxy sends the bytes:
+
+    # local backend
+    location /_protected_uploads/ {           # UPLOAD_ACCEL_PREFIX
+        internal;
+        alias /path/to/uploads/blobs/;
+    }
+
+    # s3 backend: the trailing slash strips the prefix, so the endpoint gets
+    # /<bucket>/<key>?X-Amz-... exactly as presigned, for the signed host
+    location /_protected_uploads/ {
+        internal;
+        proxy_pass https://s3.example.com/;   # UPLOAD_S3_ENDPOINT
+        proxy_set_header Host s3.example.com;
+    }
+
+A local blob missing on disk is answered by the app (404) rather than handed
+to the proxy.
+"""
+import hashlib
+import hmac
+import http.client
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from urllib.parse import quote, urlsplit
+
+import click
+from flask import Request, Response, current_app, request, send_file, stream_with_context
+from flask.cli import with_appcontext
+from sqlalchemy import text
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from src.models.user import db
+from src.models.upload import FileBlob
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+# `app` streams blobs through the worker; the others hand delivery to a fronting proxy
+DELIVERY_MODES = ('app', 'x-accel-redirect', 'x-sendfile')
+
+_ATTACH_SQL = text(
+    "INSERT INTO file_blobs (sha256, size, content_type, ref_count, created_at) "
+    "VALUES (:sha256, :size, :content_type, 1, :created_at) "
+    "ON CONFLICT (sha256) DO UPDATE SET ref_count = file_blobs.ref_count + 1"
+)
+
+
+def blob_key(sha256):
+    """Sharded storage key: two levels of two hex characters, then the full hash."""
+    return f'{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+class HashingSpool:
+    """Writable temp file that hashes and counts what is written, up to `max_bytes`."""
+
+    def __init__(self, directory, max_bytes):
+        fd, self.path = tempfile.mkstemp(prefix='upload-', dir=directory)
+        self.file = os.fdopen(fd, 'w+b')
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise RequestEntityTooLarge(f'File exceeds the upload limit of {self.max_bytes} bytes')
+        self._sha256.update(data)
+        return self.file.write(data)
+
+    def read(self, *args):
+        return self.file.read(*args)
+
+    def seek(self, *args):
+        return self.file.seek(*args)
+
+    def tell(self):
+        return self.file.tell()
+
+    def flush(self):
+        self.file.flush()
+
+    def discard(self):
+        self.close()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+        # The spool is moved into place on success; anything left is garbage
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.path = None
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+
+class UploadRequest(Request):
+    """Request class spooling multipart file parts through a HashingSpool."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        storage = current_app.extensions['upload_storage']['backend']
+        return HashingSpool(storage.spool_dir, current_app.config['UPLOAD_MAX_FILE_BYTES'])
+
+
+class LocalBlobStorage:
+    def __init__(self, root):
+        self.root = root
+        self.spool_dir = os.path.join(root, 'tmp')
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def path_for(self, sha256):
+        return os.path.join(self.root, *blob_key(sha256).split('/'))
+
+    def store(self, sha256, spool_path, size, content_type):
+        path = self.path_for(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(spool_path, path)
+
+    def send(self, sha256, download_name, mimetype):
+        # send_file answers Range/If-Range requests itself
+        return send_file(self.path_for(sha256), mimetype=mimetype, download_name=download_name,
+                         conditional=True, etag=sha256)
+
+    def offload(self, sha256, delivery, accel_prefix):
+        path = self.path_for(sha256)
+        if not os.path.exists(path):
+            # Same as send(): the route turns this into its JSON 404
+            raise FileNotFoundError(path)
+        if delivery == 'x-sendfile':
+            return 'X-Sendfile', os.path.abspath(path)
+        return 'X-Accel-Redirect', f"{accel_prefix.rstrip('/')}/{blob_key(sha256)}"
+
+    def delete(self, sha256):
+        try:
+            os.unlink(self.path_for(sha256))
+        except FileNotFoundError:
+            pass
+
+    def iter_blobs(self):
+        """Yield (sha256, modified_timestamp) of every stored blob, plus stale spools as (None, ...)."""
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                if directory == self.spool_dir:
+                    yield None, os.path.getmtime(path), path
+                elif _SHA256.match(name):
+                    yield name, os.path.getmtime(path), path
+
+
+class S3BlobStorage:
+    """Minimal SigV4 client for PUT/GET/DELETE/ListObjectsV2 on one bucket (path-style URLs)."""
+
+    def __init__(self, endpoint, bucket, access_key, secret_key, region='us-east-1', prefix='', timeout=30):
+        parts = urlsplit(endpoint)
+        self.secure = parts.scheme == 'https'
+        self.netloc = parts.netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix
+        self.timeout = timeout
+        self.spool_dir = None
+
+    def _connection(self):
+        cls = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+        return cls(self.netloc, timeout=self.timeout)
+
+    def _sign(self, now, canonical):
+        """SigV4 signature of a canonical request; returns (scope, signature)."""
+        scope = f"{now.strftime('%Y%m%d')}/{self.region}/s3/aws4_request"
+        string_to_sign = '\n'.join(['AWS4-HMAC-SHA256', now.strftime('%Y%m%dT%H%M%SZ'), scope,
+                                    hashlib.sha256(canonical.encode()).hexdigest()])
+        key = ('AWS4' + self.secret_key).encode()
+        for part in scope.split('/'):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        return scope, hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    def _signed_headers(self, method, path, query, payload_hash, extra=None):
+        now = datetime.now(timezone.utc)
+        headers = {'host': self.netloc, 'x-amz-content-sha256': payload_hash,
+                   'x-amz-date': now.strftime('%Y%m%dT%H%M%SZ')}
+        headers.update({name.lower(): str(value) for name, value in (extra or {}).items()})
+        signed = ';'.join(sorted(headers))
+        canonical = '\n'.join([
+            method, path, query,
+            ''.join(f'{name}:{headers[name].strip()}\n' for name in sorted(headers)),
+            signed, payload_hash,
+        ])
+        scope, signature = self._sign(now, canonical)
+        headers['authorization'] = (f'AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, '
+                                    f'SignedHeaders={signed}, Signature={signature}')
+        return headers
+
+    def _path(self, key=None):
+        return quote(f'/{self.bucket}' + (f'/{self.prefix}{key}' if key is not None else ''), safe='/~')
+
+    @staticmethod
+    def _query(params):
+        return '&'.join(f"{quote(name, safe='~')}={quote(str(value), safe='~')}"
+                        for name, value in sorted(params.items()))
+
+    def presigned_path(self, key, expires=300):
+        """Path and query of a GET for `key` authorized by a query-string signature."""
+        now = datetime.now(timezone.utc)
+        path = self._path(key)
+        scope = f"{now.strftime('%Y%m%d')}/{self.region}/s3/aws4_request"
+        params = {
+            'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+            'X-Amz-Credential': f'{self.access_key}/{scope}',
+            'X-Amz-Date': now.strftime('%Y%m%dT%H%M%SZ'),
+            'X-Amz-Expires': str(expires),
+            'X-Amz-SignedHeaders': 'host',
+        }
+        canonical = '\n'.join(['GET', path, self._query(params), f'host:{self.netloc}\n', 'host',
+                               'UNSIGNED-PAYLOAD'])
+        params['X-Amz-Signature'] = self._sign(now, canonical)[1]
+        return f'{path}?{self._query(params)}'
+
+    def _request(self, method, key=None, query_params=None, body=None, payload_hash='UNSIGNED-PAYLOAD',
+                 extra_headers=None):
+        path = self._path(key)
+        query = self._query(query_params or {})
+        headers = self._signed_headers(method, path, query, payload_hash, extra_headers)
+        connection = self._connection()
+        connection.request(method, path + (f'?{query}' if query else ''), body=body, headers=headers)
+        return connection, connection.getresponse()
+
+    def _check(self, connection, response, *ok):
+        if response.status not in ok:
+            detail = response.read()[:300]
+            connection.close()
+            raise IOError(f'S3 request failed with {response.status}: {detail!r}')
+
+    def store(self, sha256, spool_path, size, content_type):
+        with open(spool_path, 'rb') as body:
+            # The payload hash S3 verifies is exactly the content address
+            connection, response = self._request(
+                'PUT', blob_key(sha256), body=body, payload_hash=sha256,
+                extra_headers={'Content-Length': size, 'Content-Type': content_type or 'application/octet-stream'})
+            self._check(connection, response, 200)
+            response.read()
+            connection.close()
+        os.unlink(spool_path)
+
+    def send(self, sha256, download_name, mimetype):
+        extra_headers = {}
+        # S3 cuts the range; If-Range is checked here against the content hash
+        if request.range is not None and (not request.headers.get('If-Range') or request.if_range.etag == sha256):
+            extra_headers['Range'] = request.headers['Range']
+        connection, response = self._request('GET', blob_key(sha256), extra_headers=extra_headers)
+        if response.status == 404:
+            connection.close()
+            raise FileNotFoundError(sha256)
+        self._check(connection, response, 200, 206, 416)
+
+        def body():
+            try:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                connection.close()
+
+        resp = Response(stream_with_context(body()), status=response.status, mimetype=mimetype)
+        for name in ('Content-Length', 'Content-Range'):
+            if response.getheader(name):
+                resp.headers[name] = response.getheader(name)
+        resp.headers['Content-Disposition'] = f'inline; filename="{download_name}"'
+        resp.accept_ranges = 'bytes'
+        return resp
+
+    def offload(self, sha256, delivery, accel_prefix):
+        if delivery != 'x-accel-redirect':
+            return None
+        # The proxy's internal location forwards the presigned request to the endpoint
+        return 'X-Accel-Redirect', accel_prefix.rstrip('/') + self.presigned_path(blob_key(sha256))
+
+    def delete(self, sha256):
+        connection, response = self._request('DELETE', blob_key(sha256))
+        self._check(connection, response, 200, 204, 404)
+        response.read()
+        connection.close()
+
+    def iter_blobs(self):
+        token = None
+        namespace = {'s3': 'http://s3.amazonaws.com/doc/2006-03-01/'}
+        while True:
+            params = {'list-type': '2', 'prefix': self.prefix}
+            if token:
+                params['continuation-token'] = token
+            connection, response = self._request('GET', query_params=params)
+            self._check(connection, response, 200)
+            root = ET.fromstring(response.read())
+            connection.close()
+            for item in root.findall('s3:Contents', namespace):
+                key = item.findtext('s3:Key', namespaces=namespace)
+                name = key.rsplit('/', 1)[-1]
+                if _SHA256.match(name):
+                    modified = datetime.strptime(item.findtext('s3:LastModified', namespaces=namespace)[:19],
+                                                 '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+                    yield name, modified.timestamp(), key
+            if root.findtext('s3:IsTruncated', namespaces=namespace) != 'true':
+                break
+            token = root.findtext('s3:NextContinuationToken', namespaces=namespace)
+
+
+def _build_backend(config):
+    if config['UPLOAD_STORAGE'] == 's3':
+        return S3BlobStorage(config['UPLOAD_S3_ENDPOINT'], config['UPLOAD_S3_BUCKET'],
+                             config['UPLOAD_S3_ACCESS_KEY'], config['UPLOAD_S3_SECRET_KEY'],
+                             region=config.get('UPLOAD_S3_REGION') or 'us-east-1',
+                             prefix=config.get('UPLOAD_S3_PREFIX') or '')
+    return LocalBlobStorage(config['UPLOAD_STORAGE_PATH'])
+
+
+class UploadStorage:
+    """Flask extension owning the blob backend and the upload request class."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('UPLOAD_STORAGE', 'local')
+        app.config.setdefault('UPLOAD_STORAGE_PATH',
+                              os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'blobs'))
+        app.config.setdefault('UPLOAD_MAX_FILE_BYTES', 5 * 1024 * 1024)
+        app.config.setdefault('UPLOAD_GC_GRACE', 3600)
+        app.config.setdefault('UPLOAD_DELIVERY', 'app')
+        app.config.setdefault('UPLOAD_ACCEL_PREFIX', '/_protected_uploads')
+        if app.config['UPLOAD_DELIVERY'] not in DELIVERY_MODES:
+            raise ValueError(f"UPLOAD_DELIVERY must be one of {', '.join(DELIVERY_MODES)}")
+        app.extensions['upload_storage'] = {'backend': _build_backend(app.config)}
+        app.request_class = UploadRequest
+        app.cli.add_command(gc_command)
+
+    @property
+    def backend(self):
+        return current_app.extensions['upload_storage']['backend']
+
+    def save(self, file):
+        """Store an uploaded FileStorage; returns (sha256, size, content_type).
+
+        The caller records the reference with attach() in its transaction.
+        """
+        spool = file.stream
+        if not isinstance(spool, HashingSpool):
+            # Not parsed through UploadRequest (e.g. a programmatic FileStorage)
+            spool = HashingSpool(self.backend.spool_dir, current_app.config['UPLOAD_MAX_FILE_BYTES'])
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                spool.write(chunk)
+        spool.flush()
+
+        sha256, size = spool.sha256, spool.size
+        content_type = mimetypes.guess_type(file.filename or '')[0] or file.mimetype or 'application/octet-stream'
+        if db.session.get(FileBlob, sha256) is None:
+            self.backend.store(sha256, spool.path, size, content_type)
+            spool.path = None
+        spool.close()
+        return sha256, size, content_type
+
+    def attach(self, sha256, size, content_type):
+        db.session.execute(_ATTACH_SQL, {'sha256': sha256, 'size': size, 'content_type': content_type,
+                                         'created_at': datetime.utcnow()})
+
+    def release(self, sha256):
+        """Drop one reference; the blob itself is removed later by gc-uploads."""
+        if not sha256:
+            return
+        db.session.execute(text("UPDATE file_blobs SET ref_count = ref_count - 1 WHERE sha256 = :sha256"),
+                           {'sha256': sha256})
+        db.session.execute(text("DELETE FROM file_blobs WHERE sha256 = :sha256 AND ref_count <= 0"),
+                           {'sha256': sha256})
+
+    def send(self, sha256, download_name):
+        """Response for a stored blob: 304, offloaded to the proxy, or streamed by the app."""
+        if request.if_none_match.contains(sha256):
+            response = Response(status=304)
+        else:
+            blob = db.session.get(FileBlob, sha256)
+            mimetype = ((blob.content_type if blob else None) or mimetypes.guess_type(download_name)[0]
+                        or 'application/octet-stream')
+            delivery = current_app.config['UPLOAD_DELIVERY']
+            header = None
+            if delivery != 'app':
+                header = self.backend.offload(sha256, delivery, current_app.config['UPLOAD_ACCEL_PREFIX'])
+            if header:
+                # Headers only; the proxy sends the bytes and answers Range itself
+                response = Response(mimetype=mimetype)
+                response.headers[header[0]] = header[1]
+                response.headers['Content-Disposition'] = f'inline; filename="{download_name}"'
+            else:
+                response = self.backend.send(sha256, download_name, mimetype)
+        # Content-addressed, so the hash is a strong validator across backends and deploys
+        response.set_etag(sha256)
+        response.cache_control.no_cache = True
+        return response
+
+    def collect_garbage(self, grace=None):
+        """Delete blobs no row references and stale spools older than `grace` seconds."""
+        grace = current_app.config['UPLOAD_GC_GRACE'] if grace is None else grace
+        cutoff = time.time() - grace
+        deleted = kept = 0
+        for sha256, modified, path in self.backend.iter_blobs():
+            if modified > cutoff:
+                kept += 1
+                continue
+            if sha256 is None:
+                os.unlink(path)
+                deleted += 1
+            elif db.session.get(FileBlob, sha256) is None:
+                self.backend.delete(sha256)
+                deleted += 1
+            else:
+                kept += 1
+        return {'deleted': deleted, 'kept': kept}
+
+
+upload_storage = UploadStorage()
+
+
+@click.command('gc-uploads')
+@click.option('--grace', type=int, default=None, help='Only delete blobs older than this many seconds')
+@with_appcontext
+def gc_command(grace):
+    """Delete stored upload blobs that no user references any more."""
+    result = upload_storage.collect_garbage(grace)
+    click.echo(f"Deleted {result['deleted']} unreferenced blob(s), kept {result['kept']}")
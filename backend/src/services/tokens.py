@@ -0,0 +1,253 @@
+"""
+Refresh-token store: hashed lookups, rotation families and compaction.
+
+Only the SHA-256 of a refresh token is stored, so lookups hit the unique
+`token_hash` index and a leaked table does not leak usable cookies. Every login
+starts a family; each refresh revokes the presented token and issues its
+successor in the same family. Presenting an already rotated token again (after
+a short grace period covering concurrent tabs) revokes the whole family, since
+either the client or an attacker holds a stolen copy.
+
+Expired tokens and tokens revoked longer ago than the retention window are
+deleted by `purge()` in bounded batches, each in its own transaction. It runs
+from the `flask purge-refresh-tokens` command and, when
+REFRESH_TOKEN_PURGE_INTERVAL is set, from a background thread that each
+worker starts on its first request (threads do not survive gunicorn's fork of
+the preloaded app).
+"""
+import hashlib
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, case, delete, func, or_, select, update
+
+from src.models.user import db, User, RefreshToken
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidRefreshToken(Exception):
+    """Raised when a presented refresh token cannot be exchanged."""
+
+
+def hash_token(raw_token):
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+class PurgeStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {'runs': 0, 'deleted': 0, 'seconds': 0.0}
+        self.last_run = None
+
+    def record(self, deleted, batches, seconds):
+        with self._lock:
+            self.totals['runs'] += 1
+            self.totals['deleted'] += deleted
+            self.totals['seconds'] += seconds
+            self.last_run = {
+                'finished_at': datetime.utcnow().isoformat(),
+                'deleted': deleted,
+                'batches': batches,
+                'seconds': round(seconds, 4),
+                'rows_per_second': round(deleted / seconds, 1) if seconds else None,
+            }
+            return dict(self.last_run)
+
+    def snapshot(self):
+        with self._lock:
+            return {'totals': dict(self.totals), 'last_run': dict(self.last_run) if self.last_run else None}
+
+
+class RefreshTokenStore:
+    """Flask extension issuing, rotating, revoking and compacting refresh tokens."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('REFRESH_TOKEN_TTL', 7 * 24 * 3600)
+        # Window in which a just-rotated token is rejected without revoking its family
+        app.config.setdefault('REFRESH_TOKEN_REUSE_GRACE', 30)
+        # Revoked tokens are kept this long so reuse can still be detected
+        app.config.setdefault('REFRESH_TOKEN_REVOKED_RETENTION', 24 * 3600)
+        app.config.setdefault('REFRESH_TOKEN_PURGE_BATCH', 1000)
+        app.config.setdefault('REFRESH_TOKEN_PURGE_INTERVAL', 0)
+        app.extensions['refresh_tokens'] = {'stats': PurgeStats(), 'worker': None, 'pid': None,
+                                            'lock': threading.Lock()}
+        app.cli.add_command(purge_command)
+
+        if app.config['REFRESH_TOKEN_PURGE_INTERVAL']:
+            @app.before_request
+            def _ensure_purge_worker():
+                self.start_purge_worker(app)
+
+    @property
+    def stats(self):
+        return current_app.extensions['refresh_tokens']['stats']
+
+    def issue(self, user_id, family_id=None):
+        """Add a new token for `user_id` to the session and return its raw value."""
+        raw_token = secrets.token_urlsafe(32)
+        db.session.add(RefreshToken(
+            token_hash=hash_token(raw_token),
+            family_id=family_id or uuid.uuid4().hex,
+            user_id=user_id,
+            expires_at=datetime.utcnow() + timedelta(seconds=current_app.config['REFRESH_TOKEN_TTL']),
+        ))
+        return raw_token
+
+    def rotate(self, raw_token):
+        """Exchange `raw_token` for its successor; returns (user, new_raw_token).
+
+        The caller commits. Raises InvalidRefreshToken with a client-facing
+        message when the token is unknown, expired, reused or its user inactive.
+        """
+        now = datetime.utcnow()
+        token = RefreshToken.query.filter_by(token_hash=hash_token(raw_token)).first()
+        if not token:
+            raise InvalidRefreshToken('Invalid refresh token')
+
+        if token.revoked:
+            grace = timedelta(seconds=current_app.config['REFRESH_TOKEN_REUSE_GRACE'])
+            if token.revoked_at is None or now - token.revoked_at > grace:
+                if self.revoke_family(token.family_id):
+                    logger.warning('Refresh token reuse in family %s; revoked the family', token.family_id)
+                    db.session.commit()
+            raise InvalidRefreshToken('Invalid refresh token')
+
+        if token.expires_at < now:
+            raise InvalidRefreshToken('Refresh token expired')
+
+        user = db.session.get(User, token.user_id)
+        if not user or not user.is_active:
+            raise InvalidRefreshToken('User not found or inactive')
+
+        # Conditional update so two concurrent refreshes cannot both rotate the token
+        claimed = db.session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == token.id, RefreshToken.revoked == False)
+            .values(revoked=True, revoked_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            raise InvalidRefreshToken('Invalid refresh token')
+
+        return user, self.issue(user.id, family_id=token.family_id)
+
+    def _revoke_where(self, *criteria):
+        return db.session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.revoked == False, *criteria)
+            .values(revoked=True, revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def revoke(self, raw_token):
+        """Revoke the family of `raw_token` (logout from one device)."""
+        family_id = db.session.query(RefreshToken.family_id)\
+                              .filter_by(token_hash=hash_token(raw_token)).scalar()
+        return self.revoke_family(family_id) if family_id else 0
+
+    def revoke_family(self, family_id):
+        return self._revoke_where(RefreshToken.family_id == family_id)
+
+    def revoke_user(self, user_id):
+        return self._revoke_where(RefreshToken.user_id == user_id)
+
+    def _purgeable(self, now):
+        retention = timedelta(seconds=current_app.config['REFRESH_TOKEN_REVOKED_RETENTION'])
+        return or_(
+            RefreshToken.expires_at < now,
+            and_(RefreshToken.revoked == True, RefreshToken.revoked_at < now - retention),
+        )
+
+    def purge(self, batch_size=None, max_batches=None):
+        """Delete expired / long-revoked tokens in batches; returns the run's metrics."""
+        batch_size = batch_size or current_app.config['REFRESH_TOKEN_PURGE_BATCH']
+        purgeable = self._purgeable(datetime.utcnow())
+        started = time.perf_counter()
+        deleted = batches = 0
+        while max_batches is None or batches < max_batches:
+            ids = db.session.scalars(select(RefreshToken.id).where(purgeable).limit(batch_size)).all()
+            if not ids:
+                break
+            db.session.execute(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+            db.session.commit()
+            deleted += len(ids)
+            batches += 1
+            if len(ids) < batch_size:
+                break
+        return self.stats.record(deleted, batches, time.perf_counter() - started)
+
+    def table_stats(self):
+        """Row counts of the token table by state."""
+        now = datetime.utcnow()
+        row = db.session.query(
+            func.count(RefreshToken.id),
+            func.sum(case((RefreshToken.revoked == True, 1), else_=0)),
+            func.sum(case((and_(RefreshToken.revoked == False, RefreshToken.expires_at < now), 1), else_=0)),
+            func.count(func.distinct(RefreshToken.family_id)),
+        ).one()
+        total, revoked, expired, families = (value or 0 for value in row)
+        return {
+            'total': total,
+            'live': total - revoked - expired,
+            'revoked': revoked,
+            'expired': expired,
+            'purgeable': db.session.query(func.count(RefreshToken.id)).filter(self._purgeable(now)).scalar(),
+            'families': families,
+        }
+
+    def info(self):
+        return {'table': self.table_stats(), 'purge': self.stats.snapshot()}
+
+    def start_purge_worker(self, app):
+        """Run purge() every REFRESH_TOKEN_PURGE_INTERVAL seconds in a daemon thread of this process."""
+        state = app.extensions['refresh_tokens']
+        if state['pid'] == os.getpid():
+            return state['worker']
+
+        def run():
+            while True:
+                time.sleep(app.config['REFRESH_TOKEN_PURGE_INTERVAL'])
+                with app.app_context():
+                    try:
+                        self.purge()
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.warning('Refresh token purge failed: %s', e)
+
+        with state['lock']:
+            if state['pid'] != os.getpid():
+                state['worker'] = threading.Thread(target=run, name='refresh-token-purge', daemon=True)
+                state['worker'].start()
+                state['pid'] = os.getpid()
+        return state['worker']
+
+
+refresh_tokens = RefreshTokenStore()
+
+
+@click.command('purge-refresh-tokens')
+@click.option('--batch-size', type=int, default=None, help='Rows deleted per transaction')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches')
+@with_appcontext
+def purge_command(batch_size, max_batches):
+    """Delete expired and long-revoked refresh tokens."""
+    before = refresh_tokens.table_stats()
+    run = refresh_tokens.purge(batch_size=batch_size, max_batches=max_batches)
+    after = refresh_tokens.table_stats()
+    click.echo(f"Purged {run['deleted']} token(s) in {run['batches']} batch(es), "
+               f"{run['seconds']}s ({run['rows_per_second'] or 0} rows/s)")
+    click.echo(f"refresh_tokens: {before['total']} -> {after['total']} rows, "
+               f"{after['live']} live, {after['purgeable']} still purgeable")
@@ -0,0 +1,142 @@
+"""
+Worker boot time and memory with and without gunicorn's preload.
+
+Seeds a throwaway SQLite database, then starts gunicorn (with gunicorn.conf.py)
+twice, once with GUNICORN_PRELOAD=0 and once with preload. For each run it
+reports every worker's boot time (fork to ready, from the config's
+post_worker_init log line) and, once the server answers, each process's RSS,
+PSS and private (unshared) memory from /proc/<pid>/smaps_rollup. PSS and
+private memory show what copy-on-write sharing saves; RSS counts shared pages
+in every process. Linux only.
+
+Usage (from backend/):
+    python -m tools.bench_boot [--workers 4] [--json out.json]
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from tools.seed import create_seeded_app
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_READY_LINE = re.compile(r'Worker (\d+) ready in ([\d.]+)s')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _memory_kb(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss_kb': fields.get('Rss', 0),
+        'pss_kb': fields.get('Pss', 0),
+        'private_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The parent pid is the second field after the parenthesized command name
+        if int(stat.rsplit(')', 1)[1].split()[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def run_server(database_path, workers, preload, timeout=60):
+    port = _free_port()
+    env = dict(os.environ,
+               DATABASE_URL=f'sqlite:///{database_path}', CACHE_BACKEND='null', PORT=str(port),
+               WEB_CONCURRENCY=str(workers), GUNICORN_PRELOAD='1' if preload else '0')
+    started = time.monotonic()
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'], cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    boot_times = {}
+    log_lines = []
+
+    def read_log():
+        for line in proc.stderr:
+            log_lines.append(line)
+            match = _READY_LINE.search(line)
+            if match:
+                boot_times[int(match.group(1))] = float(match.group(2))
+
+    reader = threading.Thread(target=read_log, daemon=True)
+    reader.start()
+    try:
+        while len(boot_times) < workers:
+            if proc.poll() is not None or time.monotonic() - started > timeout:
+                raise RuntimeError('gunicorn did not start:\n' + ''.join(log_lines[-20:]))
+            time.sleep(0.05)
+        all_ready = time.monotonic() - started
+        urllib.request.urlopen(f'http://127.0.0.1:{port}/api/jobs?per_page=1', timeout=10).read()
+
+        master = _memory_kb(proc.pid)
+        worker_memory = {pid: _memory_kb(pid) for pid in _children(proc.pid)}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    boots = sorted(boot_times.values())
+    return {
+        'preload': preload,
+        'workers': workers,
+        'seconds_until_all_workers_ready': round(all_ready, 3),
+        'worker_boot_seconds': {'mean': round(sum(boots) / len(boots), 3), 'max': round(boots[-1], 3)},
+        'master': master,
+        'worker_mean': {key: round(sum(m[key] for m in worker_memory.values()) / len(worker_memory))
+                        for key in ('rss_kb', 'pss_kb', 'private_kb')},
+        'total_pss_kb': master['pss_kb'] + sum(m['pss_kb'] for m in worker_memory.values()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    args = parser.parse_args(argv)
+
+    database_path = os.path.join(tempfile.mkdtemp(prefix='jobconnect-bench-boot-'), 'bench.db')
+    create_seeded_app(database_path, jobs=args.jobs)
+
+    results = []
+    for preload in (False, True):
+        result = run_server(database_path, args.workers, preload)
+        results.append(result)
+        print(f"preload={'on ' if preload else 'off'} all ready {result['seconds_until_all_workers_ready']}s, "
+              f"worker boot mean {result['worker_boot_seconds']['mean']}s, "
+              f"worker private {result['worker_mean']['private_kb']} kB, "
+              f"worker PSS {result['worker_mean']['pss_kb']} kB, total PSS {result['total_pss_kb']} kB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Worker occupancy of resume downloads, streamed by the app vs. offloaded.
+
+Seeds a throwaway SQLite database, uploads one resume of --size-kb, then runs
+gunicorn (with gunicorn.conf.py) once per delivery mode. In each run --clients
+slow clients download the resume --downloads times each, reading at
+--client-kbps, while a probe thread requests the job listing. Gunicorn's
+access log gives how long a worker was tied up by each request.
+
+With UPLOAD_DELIVERY=app a sync worker is held until the slow client has read
+the whole file, so downloads starve other requests. With x-accel-redirect the
+worker returns headers only; there is no proxy in this benchmark, so the time
+the proxy would spend sending the bytes is (by design) not measured.
+
+Usage (from backend/):
+    python -m tools.bench_downloads [--workers 2] [--clients 8] [--client-kbps 4096] [--json out.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from tools.bench_boot import BACKEND_DIR, _free_port
+from tools.bench_login import summarize
+from tools.seed import create_seeded_app, SEED_PASSWORD
+
+# Access log: path, status, request time in microseconds
+_ACCESS_FORMAT = '%(U)s %(s)s %(D)s'
+_ACCESS_LINE = re.compile(r'^(/\S*) (\d{3}) (\d+)$')
+
+
+def prepare(workdir, size_kb):
+    """Seed the database and upload a resume; returns (database_path, storage_path, resume_url)."""
+    database_path = os.path.join(workdir, 'bench.db')
+    storage_path = os.path.join(workdir, 'blobs')
+    os.environ['UPLOAD_STORAGE_PATH'] = storage_path
+    os.environ['UPLOAD_MAX_FILE_BYTES'] = str(max(size_kb * 1024, 5 * 1024 * 1024))
+    app, _ = create_seeded_app(database_path, jobs=200, job_seekers=5, employers=2,
+                               applications_per_seeker=0, saved_per_seeker=0, refresh_tokens_per_user=0)
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'seeker0@example.com', 'password': SEED_PASSWORD})
+    headers = {'Authorization': f"Bearer {token.get_json()['access_token']}"}
+    payload = os.urandom(size_kb * 1024)
+    with tempfile.TemporaryFile() as f:
+        f.write(payload)
+        f.seek(0)
+        response = client.post('/api/users/upload-resume', headers=headers,
+                               data={'file': (f, 'resume.pdf')}, content_type='multipart/form-data')
+    filename = response.get_json()['filename']
+    return database_path, storage_path, f'/api/users/resume/{filename}'
+
+
+def slow_download(port, url, kbps):
+    # A small receive buffer, like a far-away client, so the server cannot
+    # hand the whole file to the kernel and move on
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)
+    sock.settimeout(120)
+    sock.connect(('127.0.0.1', port))
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.sock = sock
+    connection.request('GET', url)
+    response = connection.getresponse()
+    chunk = 64 * 1024
+    received = 0
+    while True:
+        data = response.read(chunk)
+        if not data:
+            break
+        received += len(data)
+        time.sleep(len(data) / (kbps * 1024.0))
+    connection.close()
+    return response.status, received
+
+
+def run_mode(delivery, database_path, storage_path, resume_url, args):
+    port = _free_port()
+    env = dict(os.environ,
+               DATABASE_URL=f'sqlite:///{database_path}', CACHE_BACKEND='null', PORT=str(port),
+               WEB_CONCURRENCY=str(args.workers), UPLOAD_STORAGE_PATH=storage_path, UPLOAD_DELIVERY=delivery)
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                             '--access-logformat', _ACCESS_FORMAT],
+                            cwd=BACKEND_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    busy = {'download': [], 'probe': []}
+
+    def read_log():
+        for line in proc.stdout:
+            match = _ACCESS_LINE.match(line.strip())
+            if match:
+                kind = 'download' if match.group(1) == resume_url else 'probe'
+                busy[kind].append(int(match.group(3)) / 1e6)
+
+    threading.Thread(target=read_log, daemon=True).start()
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                connection.request('GET', '/api/jobs?per_page=1')
+                connection.getresponse().read()
+                break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.1)
+        busy['probe'].clear()
+
+        probe_latencies = []
+        statuses = {}
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def downloader():
+            for _ in range(args.downloads):
+                status, _ = slow_download(port, resume_url, args.client_kbps)
+                with lock:
+                    statuses[status] = statuses.get(status, 0) + 1
+
+        def prober():
+            while not done.is_set():
+                started = time.perf_counter()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+                connection.request('GET', '/api/jobs?per_page=1')
+                connection.getresponse().read()
+                connection.close()
+                probe_latencies.append(time.perf_counter() - started)
+                time.sleep(0.05)
+
+        probe = threading.Thread(target=prober)
+        clients = [threading.Thread(target=downloader) for _ in range(args.clients)]
+        started = time.perf_counter()
+        probe.start()
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        wall = time.perf_counter() - started
+        done.set()
+        probe.join()
+        time.sleep(0.5)  # let the last access log lines arrive
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    downloads = busy['download']
+    worker_seconds = sum(downloads)
+    return {
+        'delivery': delivery,
+        'workers': args.workers,
+        'wall_seconds': round(wall, 3),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'worker_busy_seconds_downloads': round(worker_seconds, 3),
+        'download_worker_time': summarize(downloads),
+        'probe_latency': summarize(probe_latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=8, help='concurrent slow downloaders')
+    parser.add_argument('--downloads', type=int, default=3, help='downloads per client')
+    parser.add_argument('--size-kb', type=int, default=4096, help='resume size')
+    parser.add_argument('--client-kbps', type=int, default=4096, help='read rate of each client')
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='jobconnect-bench-downloads-')
+    database_path, storage_path, resume_url = prepare(workdir, args.size_kb)
+
+    results = []
+    for delivery in ('app', 'x-accel-redirect'):
+        result = run_mode(delivery, database_path, storage_path, resume_url, args)
+        results.append(result)
+        print(f"{delivery:<16} worker busy {result['worker_busy_seconds_downloads']}s, per download p50="
+              f"{result['download_worker_time']['p50_ms']}ms, probe p50={result['probe_latency']['p50_ms']}ms "
+              f"p99={result['probe_latency']['p99_ms']}ms, statuses={result['statuses']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Endpoint benchmark: latency percentiles and queries per request for the API.
+
+Seeds a throwaway SQLite database (or the empty database at --database-url,
+e.g. a local PostgreSQL one) with tools.seed, then sends every scenario in
+build_scenarios() --iterations times through the Flask test client after
+--warmup untimed rounds. Each scenario reports its status codes, p50/p95/p99
+latency and the number of SQL statements executed inside the request.
+
+Scenarios that change data get distinct targets per iteration (a different
+job to apply to, a fresh email to register...), so later iterations measure
+the same work as the first. The report is JSON with a stable layout; pass an
+earlier report to --compare to see what changed between two versions.
+
+Usage (from backend/):
+    python -m tools.bench_endpoints [--jobs 2000] [--iterations 30] [--only jobs] [--json report.json]
+    python -m tools.bench_endpoints --compare before.json --json after.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from src.models.user import db, User
+from src.models.job import Job, Application, SavedJob
+from src.services.access import create_user_access_token
+from tools.bench_login import summarize, percentile
+from tools.seed import create_seeded_app, SEED_PASSWORD
+
+# `path` and `body` may be callables taking the iteration number;
+# `before(client, headers, i)` runs untimed ahead of each request; `upload`
+# sends the body as a multipart file instead of JSON.
+Scenario = namedtuple('Scenario', 'name method path role body before upload')
+
+
+def scenario(name, method, path, role=None, body=None, before=None, upload=False):
+    return Scenario(name, method, path, role, body, before, upload)
+
+
+def _cycle(values, fallback=1):
+    values = list(values) or [fallback]
+    return lambda i: values[i % len(values)]
+
+
+def _login(email, first_only=False):
+    def before(client, headers, i):
+        if i == 0 or not first_only:
+            client.post('/api/auth/login', json={'email': email, 'password': SEED_PASSWORD})
+    return before
+
+
+def _upload(url, content, filename):
+    def before(client, headers, i):
+        client.post(url, headers=headers, data={'file': (io.BytesIO(content), filename)},
+                    content_type='multipart/form-data')
+    return before
+
+
+def build_scenarios(app, rounds, employer_id, seeker_id):
+    """Requests covering the job, auth and user routes, in run order."""
+    with app.app_context():
+        employer_jobs = [job_id for (job_id,) in db.session.query(Job.id)
+                         .filter_by(employer_id=employer_id, is_active=True).order_by(Job.id)]
+        applied = {job_id for (job_id,) in db.session.query(Application.job_id).filter_by(applicant_id=seeker_id)}
+        saved = [job_id for (job_id,) in db.session.query(SavedJob.job_id).filter_by(user_id=seeker_id)]
+        open_jobs = [job_id for (job_id,) in db.session.query(Job.id).filter_by(is_active=True).order_by(Job.id)
+                     .limit(rounds + len(applied) + len(saved) + 1) if job_id not in applied and job_id not in saved]
+        application = Application.query.filter(Application.job_id.in_(employer_jobs[:50] or [0])).first()
+        application_ids = [application_id for (application_id,) in db.session.query(Application.id)
+                           .filter(Application.job_id == (application.job_id if application else 0))]
+        # Accounts the admin deactivates: the last seeded seekers, away from the benchmark users
+        deactivate = [user_id for (user_id,) in db.session.query(User.id).filter_by(role='job_seeker')
+                      .order_by(User.id.desc()).limit(rounds)]
+        seeker_email = db.session.get(User, seeker_id).email
+
+    job_id = employer_jobs[0] if employer_jobs else 1
+    application_id = application.id if application else 1
+    application_job = application.job_id if application else job_id
+    saved_job = saved[0] if saved else job_id
+    deactivate = _cycle(deactivate)
+    # One posting per iteration, never the one the other scenarios use
+    delete = _cycle(reversed(employer_jobs[1:]))
+    apply_to = _cycle(open_jobs)
+    save = _cycle(reversed(open_jobs))
+    new_job = {'title': 'Benchmark Job', 'description': 'Created by the endpoint benchmark',
+               'job_type': 'Full-time', 'location': 'Remote', 'skills': ['Python', 'Benchmark']}
+    import_rows = [dict(new_job, title=f'Imported Job {n}') for n in range(50)]
+    resume = (b'%PDF-1.4\n' + b'0' * 64 * 1024, 'resume.pdf')
+    logo = (b'\x89PNG\r\n\x1a\n' + b'0' * 16 * 1024, 'logo.png')
+
+    return [
+        # routes/jobs.py
+        scenario('list jobs', 'GET', '/api/jobs'),
+        scenario('list jobs page 5', 'GET', '/api/jobs?page=5'),
+        scenario('list jobs cursor', 'GET', '/api/jobs?cursor=&include_total=false'),
+        scenario('search jobs', 'GET', '/api/jobs?search=engineer'),
+        scenario('filter jobs', 'GET', '/api/jobs?location=Lagos&job_type=Full-time&skills=python,react'),
+        scenario('list jobs as seeker', 'GET', '/api/jobs', 'job_seeker'),
+        scenario('facets', 'GET', '/api/jobs/facets'),
+        scenario('facets filtered', 'GET', '/api/jobs/facets?search=engineer'),
+        scenario('recommended', 'GET', '/api/jobs/recommended', 'job_seeker'),
+        scenario('job detail', 'GET', f'/api/jobs/{job_id}'),
+        scenario('job detail as seeker', 'GET', f'/api/jobs/{job_id}', 'job_seeker'),
+        scenario('create job', 'POST', '/api/jobs', 'employer', new_job),
+        scenario('bulk import 50 jobs', 'POST', '/api/jobs/bulk', 'employer', import_rows),
+        scenario('update job', 'PUT', f'/api/jobs/{job_id}', 'employer', {'title': 'Updated title', 'skills': 'Go, SQL'}),
+        scenario('my jobs', 'GET', '/api/jobs/my-jobs', 'employer'),
+        scenario('my jobs summary', 'GET', '/api/jobs/my-jobs/summary', 'employer'),
+        scenario('apply', 'POST', lambda i: f'/api/jobs/{apply_to(i)}/apply', 'job_seeker',
+                 {'cover_letter': 'Benchmark application'}),
+        scenario('my applications', 'GET', '/api/jobs/my-applications', 'job_seeker'),
+        scenario('job applications', 'GET', f'/api/jobs/{application_job}/applications', 'employer'),
+        scenario('update application status', 'PUT', f'/api/jobs/applications/{application_id}/status', 'employer',
+                 {'status': 'Under Review'}),
+        scenario('bulk application status', 'PUT', f'/api/jobs/{application_job}/applications/status', 'employer',
+                 {'status': 'Under Review', 'application_ids': application_ids or [application_id]}),
+        scenario('saved jobs', 'GET', '/api/jobs/saved', 'job_seeker'),
+        scenario('save job', 'POST', lambda i: f'/api/jobs/{save(i)}/save', 'job_seeker'),
+        scenario('unsave job', 'DELETE', lambda i: f'/api/jobs/{save(i)}/unsave', 'job_seeker'),
+        scenario('is saved', 'GET', f'/api/jobs/{saved_job}/is-saved', 'job_seeker'),
+        scenario('delete job', 'DELETE', lambda i: f'/api/jobs/{delete(i)}', 'employer'),
+        # routes/auth.py
+        scenario('register', 'POST', '/api/auth/register', None,
+                 lambda i: {'email': f'bench{i}-{time.time_ns()}@example.com', 'password': SEED_PASSWORD,
+                            'role': 'job_seeker', 'first_name': 'Bench', 'last_name': str(i)}),
+        scenario('login', 'POST', '/api/auth/login', None, {'email': seeker_email, 'password': SEED_PASSWORD}),
+        scenario('refresh', 'POST', '/api/auth/refresh', before=_login(seeker_email, first_only=True)),
+        scenario('logout', 'POST', '/api/auth/logout', before=_login(seeker_email)),
+        scenario('me', 'GET', '/api/auth/me', 'job_seeker'),
+        # routes/user.py
+        scenario('profile', 'GET', '/api/users/profile', 'job_seeker'),
+        scenario('update profile', 'PUT', '/api/users/profile', 'job_seeker', {'first_name': 'Benchmark'}),
+        scenario('upload resume', 'POST', '/api/users/upload-resume', 'job_seeker', resume, upload=True),
+        scenario('download resume', 'GET', f'/api/users/resume/resume_{seeker_id}_resume.pdf', 'job_seeker'),
+        scenario('delete resume', 'DELETE', '/api/users/delete-resume', 'job_seeker',
+                 before=_upload('/api/users/upload-resume', *resume)),
+        scenario('upload logo', 'POST', '/api/users/upload-logo', 'employer', logo, upload=True),
+        scenario('download logo', 'GET', f'/api/users/logo/logo_{employer_id}_logo.png', 'employer'),
+        scenario('admin users', 'GET', '/api/users/?include_counts=true', 'admin'),
+        scenario('admin users search', 'GET', '/api/users/?search=seeker1&role=job_seeker', 'admin'),
+        scenario('admin users cursor', 'GET', '/api/users/?cursor=&per_page=50', 'admin'),
+        scenario('admin users export', 'GET', '/api/users/?format=ndjson', 'admin'),
+        scenario('user by id', 'GET', f'/api/users/{seeker_id}', 'admin'),
+        scenario('deactivate user', 'PUT', lambda i: f'/api/users/{deactivate(i)}/deactivate', 'admin'),
+    ]
+
+
+def _resolve(value, i):
+    return value(i) if callable(value) else value
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='jobconnect-bench-endpoints-')
+    os.environ['UPLOAD_STORAGE_PATH'] = os.path.join(workdir, 'blobs')
+    app, counts = create_seeded_app(os.path.join(workdir, 'bench.db'), database_url=args.database_url,
+                                    jobs=args.jobs, job_seekers=args.job_seekers, employers=args.employers,
+                                    applications_per_seeker=args.applications_per_seeker,
+                                    saved_per_seeker=args.saved_per_seeker)
+    rounds = args.warmup + args.iterations
+    employer_id, seeker_id = 2, args.employers + 2
+    scenarios = build_scenarios(app, rounds, employer_id, seeker_id)
+    if args.only:
+        scenarios = [s for s in scenarios if any(term in s.name for term in args.only.split(','))]
+
+    with app.app_context():
+        engine = db.engine
+        dialect = engine.dialect.name
+        tokens = {
+            'admin': create_user_access_token(db.session.get(User, 1)),
+            'employer': create_user_access_token(db.session.get(User, employer_id)),
+            'job_seeker': create_user_access_token(db.session.get(User, seeker_id)),
+        }
+
+    statements = [0]
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            statements[0] += 1
+
+    results = []
+    try:
+        for item in scenarios:
+            client = app.test_client()
+            headers = {'Authorization': f'Bearer {tokens[item.role]}'} if item.role else {}
+            latencies, queries, statuses, endpoint = [], [], {}, None
+            for i in range(rounds):
+                if item.before:
+                    item.before(client, headers, i)
+                path, body = _resolve(item.path, i), _resolve(item.body, i)
+                if item.upload:
+                    options = {'data': {'file': (io.BytesIO(body[0]), body[1])}, 'content_type': 'multipart/form-data'}
+                else:
+                    options = {'json': body}
+                statements[0] = 0
+                started = time.perf_counter()
+                with client.open(path, method=item.method, headers=headers, **options) as response:
+                    response.get_data()
+                elapsed = time.perf_counter() - started
+                endpoint = endpoint or request_endpoint(app, path, item.method)
+                if i < args.warmup:
+                    continue
+                latencies.append(elapsed)
+                queries.append(statements[0])
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            results.append({
+                'name': item.name,
+                'method': item.method,
+                'endpoint': endpoint,
+                'statuses': dict(sorted(statuses.items())),
+                'latency': {'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2), **summarize(latencies)},
+                'queries': {'p50': percentile(queries, 50), 'max': max(queries)},
+            })
+    finally:
+        event.remove(engine, 'before_cursor_execute', _count)
+
+    return {
+        'meta': {
+            'generated_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'database': dialect,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'seed': counts,
+        },
+        'scenarios': results,
+    }
+
+
+def request_endpoint(app, path, method):
+    """The view function `path` routes to, e.g. 'jobs.get_jobs'."""
+    adapter = app.url_map.bind('localhost')
+    try:
+        return adapter.match(path.split('?', 1)[0], method=method)[0]
+    except Exception:
+        return None
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report):
+    meta = report['meta']
+    print(f"Seeded ({meta['database']}): {', '.join(f'{k}={v}' for k, v in meta['seed'].items())}")
+    print(f"{meta['iterations']} iterations after {meta['warmup']} warmup, commit {meta['git_commit']}\n")
+    print(f"{'scenario':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}  statuses")
+    for result in report['scenarios']:
+        latency = result['latency']
+        print(f"{result['name']:<28} {latency['p50_ms']:>8} {latency['p95_ms']:>8} {latency['p99_ms']:>8} "
+              f"{result['queries']['p50']:>8}  {result['statuses']}")
+
+
+def print_comparison(before, after):
+    """p50 latency and query count changes per scenario between two reports."""
+    previous = {result['name']: result for result in before['scenarios']}
+    print(f"\nCompared with {before['meta'].get('git_commit')} ({before['meta']['generated_at']}):")
+    print(f"{'scenario':<28} {'p50 ms':>18} {'change':>8} {'queries':>10}")
+    for result in after['scenarios']:
+        old = previous.get(result['name'])
+        if old is None:
+            print(f"{result['name']:<28} {'new':>18}")
+            continue
+        old_p50, new_p50 = old['latency']['p50_ms'], result['latency']['p50_ms']
+        change = f'{(new_p50 - old_p50) / old_p50 * 100:+.0f}%' if old_p50 else '-'
+        queries = f"{old['queries']['p50']}->{result['queries']['p50']}"
+        print(f"{result['name']:<28} {f'{old_p50} -> {new_p50}':>18} {change:>8} {queries:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--job-seekers', type=int, default=200)
+    parser.add_argument('--employers', type=int, default=20)
+    parser.add_argument('--applications-per-seeker', type=int, default=5)
+    parser.add_argument('--saved-per-seeker', type=int, default=5)
+    parser.add_argument('--database-url', help='seed this empty database instead of a throwaway SQLite file')
+    parser.add_argument('--iterations', type=int, default=30, help='timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed requests per scenario first')
+    parser.add_argument('--only', help='comma-separated substrings of the scenario names to run')
+    parser.add_argument('--compare', metavar='PATH', help='earlier report to compare against')
+    parser.add_argument('--json', metavar='PATH', help='also write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    failed = [result['name'] for result in report['scenarios']
+              if any(status.startswith('5') for status in result['statuses'])]
+    if failed:
+        print(f"\nServer errors in: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Login latency under concurrent load, per password-hashing pool size.
+
+Seeds a throwaway SQLite database, then for each value of --hash-workers fires
+--requests logins from --concurrency client threads while --listing-threads
+threads keep requesting the job listing. Reports p50/p95/p99 latency for both,
+plus how many logins were shed with 503, so the pool size and
+PASSWORD_HASH_MAX_PENDING can be chosen against real numbers.
+
+By default requests go through the Flask test client in this process. With
+--gunicorn each round instead starts gunicorn with gunicorn.conf.py (worker
+processes, gthread request threads, the hash pool sized from them) against the
+seeded database and sends real HTTP requests.
+
+Usage (from backend/):
+    python -m tools.bench_login [--concurrency 16] [--requests 200] [--hash-workers 1,2,4] [--json out.json]
+    python -m tools.bench_login --gunicorn [--port 5099] [--hash-workers 1,2]
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from src.services.passwords import password_hasher
+from tools.seed import create_seeded_app, SEED_PASSWORD
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class HttpResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class HttpClient:
+    """The part of the Flask test client interface the rounds use, over a keep-alive connection."""
+
+    def __init__(self, port):
+        self.port = port
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+
+    def _request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                response.read()
+                return HttpResponse(response.status)
+            except (http.client.HTTPException, OSError):
+                # The server closed an idle keep-alive connection; reconnect once
+                self.connection.close()
+                self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=120)
+                if attempt:
+                    raise
+
+    def get(self, path):
+        return self._request('GET', path)
+
+    def post(self, path, **kwargs):
+        return self._request('POST', path, body=json.dumps(kwargs['json']))
+
+
+@contextmanager
+def gunicorn_server(database_path, port, environ):
+    """Run gunicorn with gunicorn.conf.py against `database_path` until the block exits."""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}', PORT=str(port), **environ)
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'], cwd=BACKEND_DIR,
+                               env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if HttpClient(port).get('/healthz').status_code == 200:
+                    break
+            except OSError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError('gunicorn did not start')
+            time.sleep(0.2)
+        yield
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        'count': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        'max_ms': round(max(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def run_round(make_client, concurrency, total_requests, listing_threads, job_seekers):
+    login_latencies = []
+    listing_latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    remaining = [total_requests]
+    done = threading.Event()
+
+    def login_worker(worker_index):
+        client = make_client()
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+                n = remaining[0]
+            email = f'seeker{(n + worker_index) % job_seekers}@example.com'
+            started = time.perf_counter()
+            response = client.post('/api/auth/login', json={'email': email, 'password': SEED_PASSWORD})
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    login_latencies.append(elapsed)
+
+    def listing_worker():
+        client = make_client()
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get('/api/jobs?per_page=20')
+            elapsed = time.perf_counter() - started
+            with lock:
+                listing_latencies.append(elapsed)
+
+    listers = [threading.Thread(target=listing_worker) for _ in range(listing_threads)]
+    logins = [threading.Thread(target=login_worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in listers + logins:
+        thread.start()
+    for thread in logins:
+        thread.join()
+    wall = time.perf_counter() - started
+    done.set()
+    for thread in listers:
+        thread.join()
+
+    return {
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 3),
+        'logins_per_second': round(statuses.get(200, 0) / wall, 1) if wall else None,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'login': summarize(login_latencies),
+        'listing': summarize(listing_latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent login clients')
+    parser.add_argument('--requests', type=int, default=200, help='logins per round')
+    parser.add_argument('--hash-workers', default='1,2,4', help='comma-separated pool sizes to compare')
+    parser.add_argument('--listing-threads', type=int, default=2, help='concurrent job listing clients')
+    parser.add_argument('--job-seekers', type=int, default=50)
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    parser.add_argument('--gunicorn', action='store_true',
+                        help='benchmark a gunicorn server started from gunicorn.conf.py (WEB_CONCURRENCY, '
+                             'GUNICORN_THREADS... are read from the environment as usual)')
+    parser.add_argument('--port', type=int, default=5099, help='port for --gunicorn')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='jobconnect-bench-login-')
+    database_path = os.path.join(workdir, 'bench.db')
+    app, _ = create_seeded_app(database_path, jobs=500, job_seekers=args.job_seekers,
+                               employers=10, applications_per_seeker=0, saved_per_seeker=0,
+                               refresh_tokens_per_user=0)
+    results = []
+    for hash_workers in [int(value) for value in args.hash_workers.split(',') if value]:
+        if args.gunicorn:
+            with gunicorn_server(database_path, args.port, {'PASSWORD_HASH_WORKERS': str(hash_workers)}):
+                result = run_round(lambda: HttpClient(args.port), args.concurrency, args.requests,
+                                   args.listing_threads, args.job_seekers)
+        else:
+            app.config['PASSWORD_HASH_WORKERS'] = hash_workers
+            password_hasher.shutdown()
+            result = run_round(app.test_client, args.concurrency, args.requests,
+                               args.listing_threads, args.job_seekers)
+        result = {'hash_workers': hash_workers, **result}
+        results.append(result)
+        print(f"hash_workers={hash_workers:<3} logins p50={result['login']['p50_ms']}ms "
+              f"p99={result['login']['p99_ms']}ms  listing p99={result['listing']['p99_ms']}ms  "
+              f"{result['logins_per_second']} logins/s  statuses={result['statuses']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'method': app.config['PASSWORD_HASH_METHOD'], 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
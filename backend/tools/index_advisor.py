@@ -0,0 +1,207 @@
+"""
+Index advisor: EXPLAIN every query the API issues and report sequential scans.
+
+Seeds a throwaway SQLite database, drives each endpoint in SCENARIOS through
+the Flask test client while recording the SQL it executes, then runs
+EXPLAIN QUERY PLAN on each statement. Full table scans on anything other than
+the tables listed in EXPECTED_SCANS are reported and make the command exit 1,
+so a new query without a supporting index is caught before it ships.
+
+Usage (from backend/):
+    python -m tools.index_advisor [--jobs 2000] [--json report.json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from collections import OrderedDict
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from src.models.user import db, User
+from src.models.job import Job, SavedJob, Application
+from src.services.access import create_user_access_token
+from tools.seed import create_seeded_app, SEED_PASSWORD
+
+# Tables that are meant to be read in full, with the reason
+EXPECTED_SCANS = {
+    'job_facet_counts': 'facet rollup is small and read whole by design',
+    'skills': 'skill dictionary is a small dimension table',
+}
+
+_SCAN_PATTERN = re.compile(r'^SCAN (\S+)(.*)$')
+_ANALYZED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+
+def build_scenarios(app):
+    """Requests exercising every query path: (name, method, path, role, json body)."""
+    with app.app_context():
+        employer_job = Job.query.filter_by(employer_id=2, is_active=True).first()
+        saved = SavedJob.query.first()
+        application = Application.query.filter_by(job_id=employer_job.id).first() if employer_job else None
+    job_id = employer_job.id if employer_job else 1
+    saved_job_id = saved.job_id if saved else 1
+    application_id = application.id if application else 1
+
+    return [
+        ('list jobs', 'GET', '/api/jobs', None, None),
+        ('list jobs page 5', 'GET', '/api/jobs?page=5', None, None),
+        ('list jobs cursor', 'GET', '/api/jobs?cursor=&include_total=false', None, None),
+        ('search jobs', 'GET', '/api/jobs?search=senior%20python', None, None),
+        ('filter jobs', 'GET', '/api/jobs?location=lagos&job_type=full', None, None),
+        ('filter skills any', 'GET', '/api/jobs?skills=python,react', None, None),
+        ('filter skills all', 'GET', '/api/jobs?skills=python,react&skills_match=all', None, None),
+        ('list jobs as seeker', 'GET', '/api/jobs', 'job_seeker', None),
+        ('recommended', 'GET', '/api/jobs/recommended', 'job_seeker', None),
+        ('facets', 'GET', '/api/jobs/facets', None, None),
+        ('facets filtered', 'GET', '/api/jobs/facets?search=engineer', None, None),
+        ('job detail', 'GET', f'/api/jobs/{job_id}', None, None),
+        ('job detail as seeker', 'GET', f'/api/jobs/{job_id}', 'job_seeker', None),
+        ('create job', 'POST', '/api/jobs', 'employer',
+         {'title': 'Advisor Job', 'description': 'Created by the index advisor', 'job_type': 'Full-time',
+          'location': 'Remote', 'skills': ['Python', 'Advisor']}),
+        ('update job', 'PUT', f'/api/jobs/{job_id}', 'employer', {'title': 'Updated title', 'skills': 'Go, SQL'}),
+        ('my jobs', 'GET', '/api/jobs/my-jobs', 'employer', None),
+        ('my jobs summary', 'GET', '/api/jobs/my-jobs/summary', 'employer', None),
+        ('job applications', 'GET', f'/api/jobs/{job_id}/applications', 'employer', None),
+        ('update application status', 'PUT', f'/api/jobs/applications/{application_id}/status', 'employer',
+         {'status': 'Under Review'}),
+        ('apply', 'POST', f'/api/jobs/{job_id}/apply', 'job_seeker', {'cover_letter': 'Hello'}),
+        ('my applications', 'GET', '/api/jobs/my-applications', 'job_seeker', None),
+        ('my applications cursor', 'GET', '/api/jobs/my-applications?cursor=', 'job_seeker', None),
+        ('saved jobs', 'GET', '/api/jobs/saved', 'job_seeker', None),
+        ('saved jobs cursor', 'GET', '/api/jobs/saved?cursor=', 'job_seeker', None),
+        ('is saved', 'GET', f'/api/jobs/{saved_job_id}/is-saved', 'job_seeker', None),
+        ('save job', 'POST', f'/api/jobs/{job_id}/save', 'job_seeker', None),
+        ('unsave job', 'DELETE', f'/api/jobs/{job_id}/unsave', 'job_seeker', None),
+        ('delete job', 'DELETE', f'/api/jobs/{job_id}', 'employer', None),
+        ('login', 'POST', '/api/auth/login', None, {'email': 'seeker0@example.com', 'password': SEED_PASSWORD}),
+        ('refresh', 'POST', '/api/auth/refresh', None, None),
+        ('me', 'GET', '/api/auth/me', 'job_seeker', None),
+        ('logout', 'POST', '/api/auth/logout', 'job_seeker', None),
+        ('profile', 'GET', '/api/users/profile', 'job_seeker', None),
+        ('update profile', 'PUT', '/api/users/profile', 'job_seeker', {'first_name': 'Advisor'}),
+        ('user by id', 'GET', '/api/users/5', 'admin', None),
+        ('admin users', 'GET', '/api/users/?include_counts=true', 'admin', None),
+        ('admin users by role', 'GET', '/api/users/?role=employer&is_active=true&cursor=', 'admin', None),
+        ('admin users export', 'GET', '/api/users/?format=csv&created_from=2020-01-01', 'admin', None),
+    ]
+
+
+def _scan_findings(plan_rows):
+    findings = []
+    for row in plan_rows:
+        detail = row[-1]
+        match = _SCAN_PATTERN.match(detail)
+        if not match:
+            continue
+        table, rest = match.groups()
+        if 'USING' in rest or 'VIRTUAL TABLE' in rest or table.startswith('(') or table == 'CONSTANT':
+            continue
+        findings.append(table)
+    return findings
+
+
+def run(jobs, job_seekers, employers):
+    workdir = tempfile.mkdtemp(prefix='jobconnect-advisor-')
+    app, counts = create_seeded_app(os.path.join(workdir, 'advisor.db'), jobs=jobs,
+                                    job_seekers=job_seekers, employers=employers)
+
+    captured = []
+
+    with app.app_context():
+        engine = db.engine
+        seeker_id = employers + 2
+        tokens = {
+            'admin': create_user_access_token(db.session.get(User, 1)),
+            'employer': create_user_access_token(db.session.get(User, 2)),
+            'job_seeker': create_user_access_token(db.session.get(User, seeker_id)),
+        }
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and not executemany:
+            captured.append((request.endpoint, statement, parameters))
+
+    client = app.test_client()
+    scenarios = build_scenarios(app)
+    statements = OrderedDict()
+    errors = []
+    for name, method, path, role, body in scenarios:
+        headers = {'Authorization': f'Bearer {tokens[role]}'} if role else {}
+        del captured[:]
+        response = client.open(path, method=method, json=body, headers=headers)
+        if response.status_code >= 500:
+            errors.append({'scenario': name, 'status': response.status_code, 'body': response.get_data(as_text=True)})
+        for endpoint, statement, parameters in captured:
+            key = (endpoint, statement)
+            if key not in statements:
+                statements[key] = {'scenarios': [], 'parameters': parameters}
+            statements[key]['scenarios'].append(name)
+
+    event.remove(engine, 'before_cursor_execute', _record)
+
+    report = {'seed': counts, 'statements': [], 'unexpected_scans': [], 'errors': errors}
+    with engine.connect() as conn:
+        for (endpoint, statement), info in statements.items():
+            if not statement.lstrip().upper().startswith(_ANALYZED_STATEMENTS):
+                continue
+            plan = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, info['parameters']).fetchall()
+            scans = _scan_findings(plan)
+            entry = {
+                'endpoint': endpoint,
+                'scenarios': info['scenarios'],
+                'sql': ' '.join(statement.split()),
+                'plan': [row[-1] for row in plan],
+                'scans': scans,
+            }
+            report['statements'].append(entry)
+            for table in scans:
+                if table not in EXPECTED_SCANS:
+                    report['unexpected_scans'].append({'endpoint': endpoint, 'table': table, 'sql': entry['sql']})
+    return report
+
+
+def print_report(report, verbose=False):
+    print(f"Seeded: {', '.join(f'{k}={v}' for k, v in report['seed'].items())}")
+    print(f"Analyzed {len(report['statements'])} distinct statements\n")
+    for entry in report['statements']:
+        unexpected = [table for table in entry['scans'] if table not in EXPECTED_SCANS]
+        if not unexpected and not verbose:
+            continue
+        status = 'SEQ SCAN' if unexpected else 'ok'
+        print(f"[{status}] {entry['endpoint']} ({', '.join(entry['scenarios'])})")
+        print(f"    {entry['sql'][:300]}")
+        for line in entry['plan']:
+            print(f"      {line}")
+    for error in report['errors']:
+        print(f"[ERROR] scenario '{error['scenario']}' returned {error['status']}")
+    if report['unexpected_scans']:
+        tables = sorted({scan['table'] for scan in report['unexpected_scans']})
+        print(f"\n{len(report['unexpected_scans'])} statement(s) scan tables without an index: {', '.join(tables)}")
+    else:
+        print('No unexpected sequential scans.')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--job-seekers', type=int, default=200)
+    parser.add_argument('--employers', type=int, default=20)
+    parser.add_argument('--json', metavar='PATH', help='also write the full report as JSON')
+    parser.add_argument('--verbose', action='store_true', help='print plans for every statement')
+    args = parser.parse_args(argv)
+
+    report = run(args.jobs, args.job_seekers, args.employers)
+    print_report(report, verbose=args.verbose)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    return 1 if report['unexpected_scans'] or report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Synthetic data generator for local analysis and benchmarking.
+
+Rows are written with bulk INSERTs in batches so seeding scales to large
+volumes. Derived structures (full-text index, facet rollup) are rebuilt once at
+the end, exactly as a migration would backfill them.
+
+Every seeded account shares SEED_PASSWORD. The hash is computed once and reused
+so seeding does not spend minutes hashing.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from werkzeug.security import generate_password_hash
+
+from src.models.user import db, User, RefreshToken
+from src.models.job import Job, Application, SavedJob, Skill, JobSkill
+from src.services.search import search_index
+from src.services.tokens import hash_token
+from src.services import facets
+
+SEED_PASSWORD = 'password123'
+BATCH_SIZE = 5000
+
+SKILLS = ['Python', 'JavaScript', 'React', 'Django', 'Flask', 'SQL', 'PostgreSQL', 'Go', 'Rust', 'Java',
+          'Kotlin', 'Swift', 'AWS', 'Docker', 'Kubernetes', 'Figma', 'Excel', 'Marketing', 'Sales', 'Support']
+JOB_TYPES = ['Full-time', 'Part-time', 'Contract', 'Internship', 'Remote']
+LOCATIONS = ['Lagos', 'Abuja', 'Nairobi', 'Accra', 'Remote', 'London', 'Berlin', 'Kigali']
+TITLE_WORDS = ['Senior', 'Junior', 'Lead', 'Backend', 'Frontend', 'Data', 'Product', 'Mobile', 'Platform']
+ROLES = ['Engineer', 'Developer', 'Analyst', 'Designer', 'Manager', 'Scientist', 'Specialist']
+WORDS = ('build maintain scale design ship services customers teams data pipelines reliable modern '
+         'platform product features testing growth users mobile cloud analytics support').split()
+
+
+def _batched(rows, size=BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _bulk_insert(model, rows):
+    for batch in _batched(rows):
+        db.session.execute(insert(model), batch)
+
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def seed_database(job_seekers=100, employers=20, jobs=1000, applications_per_seeker=5,
+                  saved_per_seeker=5, refresh_tokens_per_user=2, seed=42):
+    """Populate an empty database (inside an app context) and return the row counts."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(SEED_PASSWORD)
+
+    user_rows = [{
+        'id': 1, 'email': 'admin@example.com', 'password_hash': password_hash, 'role': 'admin',
+        'first_name': 'Admin', 'last_name': 'User', 'is_active': True,
+        'created_at': now - timedelta(days=400), 'updated_at': now - timedelta(days=400),
+    }]
+    employer_ids = []
+    for i in range(employers):
+        user_id = len(user_rows) + 1
+        employer_ids.append(user_id)
+        created = now - timedelta(days=rng.randint(30, 400))
+        user_rows.append({
+            'id': user_id, 'email': f'employer{i}@example.com', 'password_hash': password_hash,
+            'role': 'employer', 'company_name': f'Company {i}', 'is_active': True,
+            'company_description': _sentence(rng), 'created_at': created, 'updated_at': created,
+        })
+    seeker_ids = []
+    for i in range(job_seekers):
+        user_id = len(user_rows) + 1
+        seeker_ids.append(user_id)
+        created = now - timedelta(days=rng.randint(1, 400))
+        user_rows.append({
+            'id': user_id, 'email': f'seeker{i}@example.com', 'password_hash': password_hash,
+            'role': 'job_seeker', 'first_name': 'Seeker', 'last_name': str(i), 'is_active': rng.random() > 0.02,
+            'experience': ' '.join(rng.sample(SKILLS, 4)) + ' ' + _sentence(rng),
+            'education': _sentence(rng, 6), 'created_at': created, 'updated_at': created,
+        })
+    _bulk_insert(User, user_rows)
+
+    skill_rows = [{'id': i + 1, 'name': name, 'slug': name.lower()} for i, name in enumerate(SKILLS)]
+    _bulk_insert(Skill, skill_rows)
+
+    job_rows = []
+    job_skill_rows = []
+    for job_id in range(1, jobs + 1):
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        skill_ids = rng.sample(range(1, len(SKILLS) + 1), rng.randint(1, 5))
+        job_rows.append({
+            'id': job_id,
+            'title': f'{rng.choice(TITLE_WORDS)} {rng.choice(ROLES)}',
+            'description': ' '.join(_sentence(rng) for _ in range(5)),
+            'skills': ', '.join(SKILLS[skill_id - 1] for skill_id in skill_ids),
+            'job_type': rng.choice(JOB_TYPES),
+            'location': rng.choice(LOCATIONS),
+            'created_at': created,
+            'updated_at': created,
+            'is_active': rng.random() > 0.1,
+            'employer_id': rng.choice(employer_ids) if employer_ids else 1,
+        })
+        job_skill_rows.extend({'job_id': job_id, 'skill_id': skill_id, 'position': position}
+                              for position, skill_id in enumerate(skill_ids))
+    _bulk_insert(Job, job_rows)
+    _bulk_insert(JobSkill, job_skill_rows)
+
+    application_rows = []
+    saved_rows = []
+    statuses = ['Applied', 'Under Review', 'Accepted', 'Rejected']
+    job_ids = list(range(1, jobs + 1))
+    for seeker_id in seeker_ids:
+        for job_id in rng.sample(job_ids, min(applications_per_seeker, len(job_ids))):
+            applied = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+            application_rows.append({
+                'job_id': job_id, 'applicant_id': seeker_id, 'status': rng.choice(statuses),
+                'applied_at': applied, 'updated_at': applied, 'cover_letter': _sentence(rng),
+            })
+        for job_id in rng.sample(job_ids, min(saved_per_seeker, len(job_ids))):
+            saved_rows.append({
+                'job_id': job_id, 'user_id': seeker_id,
+                'saved_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            })
+    _bulk_insert(Application, application_rows)
+    _bulk_insert(SavedJob, saved_rows)
+
+    token_rows = []
+    for user in user_rows:
+        for i in range(refresh_tokens_per_user):
+            token_rows.append({
+                'token_hash': hash_token(f'seed-{user["id"]}-{i}-{rng.getrandbits(64):016x}'),
+                'family_id': f'{user["id"]:08x}{rng.getrandbits(96):024x}',
+                'user_id': user['id'], 'revoked': i > 0, 'revoked_at': now - timedelta(days=i) if i else None,
+                'created_at': now - timedelta(days=i), 'expires_at': now + timedelta(days=7 - i),
+            })
+    _bulk_insert(RefreshToken, token_rows)
+
+    if db.engine.dialect.name == 'postgresql':
+        # Explicit ids bypass the serial sequences; move them past the seeded rows
+        for table in ('users', 'skills', 'jobs', 'applications', 'saved_jobs', 'refresh_tokens'):
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 1)) FROM {table}"
+            ))
+
+    search_index.rebuild(db.session)
+    facets.rebuild(db.session)
+    db.session.commit()
+
+    return {
+        'users': len(user_rows),
+        'jobs': len(job_rows),
+        'job_skills': len(job_skill_rows),
+        'applications': len(application_rows),
+        'saved_jobs': len(saved_rows),
+        'refresh_tokens': len(token_rows),
+    }
+
+
+def create_seeded_app(database_path, database_url=None, **volumes):
+    """Build the Flask app against a fresh SQLite file and seed it.
+
+    `database_url` seeds that database instead (e.g. a local PostgreSQL
+    database created for the run); its tables are created from the models
+    and it must not hold any users yet.
+
+    Returns (app, row_counts). The response cache is disabled so every request
+    reaches the database.
+    """
+    from src.main import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url or f'sqlite:///{database_path}',
+                      'CACHE_BACKEND': 'null'})
+
+    with app.app_context():
+        if database_url and not database_url.startswith('sqlite'):
+            db.create_all()
+            search_index.init_app(app, db=db)
+            if db.session.query(User.id).first() is not None:
+                raise RuntimeError(f'Refusing to seed {db.engine.url!r}: it already has users')
+        counts = seed_database(**volumes)
+    return app, counts
@@ -8,7 +8,9 @@ import { Badge } from '@/components/ui/badge'
 import { Alert, AlertDescription } from '@/components/ui/alert'
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs'
-import { Search, Users, Briefcase, UserX, Loader2, CheckCircle, AlertTriangle, Eye } from 'lucide-react'
+import { Search, Users, Briefcase, UserX, Loader2, CheckCircle, AlertTriangle, Eye, Download } from 'lucide-react'
+
+const USERS_PER_PAGE = 50
 
 const AdminDashboard = () => {
   const { user } = useAuth()
@@ -19,18 +21,35 @@ const AdminDashboard = () => {
   const [searchTerm, setSearchTerm] = useState('')
   const [filterRole, setFilterRole] = useState('all')
   const [filterStatus, setFilterStatus] = useState('all')
+  const [page, setPage] = useState(1)
+  const [pages, setPages] = useState(1)
+  const [counts, setCounts] = useState(null)
 
+  // Filters are applied by the server; the search box waits for a pause in typing
   useEffect(() => {
-    if (user?.role === 'admin') {
-      fetchUsers()
+    if (user?.role !== 'admin') {
+      return
     }
-  }, [user])
+    const timer = setTimeout(() => fetchUsers(), searchTerm ? 300 : 0)
+    return () => clearTimeout(timer)
+  }, [user, page, searchTerm, filterRole, filterStatus])
+
+  const filterParams = () => {
+    const params = {}
+    if (searchTerm) params.search = searchTerm
+    if (filterRole !== 'all') params.role = filterRole
+    if (filterStatus !== 'all') params.is_active = filterStatus === 'active'
+    return params
+  }
 
   const fetchUsers = async () => {
     try {
-      setLoading(true)
-      const response = await axios.get(`/users/`)
+      const response = await axios.get(`/users/`, {
+        params: { ...filterParams(), page, per_page: USERS_PER_PAGE, include_counts: true }
+      })
       setUsers(response.data.users)
+      setPages(response.data.pages || 1)
+      setCounts(response.data.counts)
     } catch (error) {
       console.error('Error fetching users:', error)
       setError('Failed to fetch users')
@@ -39,6 +58,24 @@ const AdminDashboard = () => {
     }
   }
 
+  const handleExport = async () => {
+    try {
+      const response = await axios.get(`/users/`, {
+        params: { ...filterParams(), format: 'csv' },
+        responseType: 'blob'
+      })
+      const url = window.URL.createObjectURL(response.data)
+      const link = document.createElement('a')
+      link.href = url
+      link.download = 'users.csv'
+      link.click()
+      window.URL.revokeObjectURL(url)
+    } catch (error) {
+      console.error('Error exporting users:', error)
+      setError('Failed to export users')
+    }
+  }
+
   const handleDeactivateUser = async (userId, userName) => {
     if (!window.confirm(`Are you sure you want to deactivate ${userName}? This action cannot be undone.`)) {
       return
@@ -56,21 +93,6 @@ const AdminDashboard = () => {
     }
   }
 
-  const filteredUsers = users.filter(u => {
-    const matchesSearch = 
-      u.email.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      (u.first_name && u.first_name.toLowerCase().includes(searchTerm.toLowerCase())) ||
-      (u.last_name && u.last_name.toLowerCase().includes(searchTerm.toLowerCase())) ||
-      (u.company_name && u.company_name.toLowerCase().includes(searchTerm.toLowerCase()))
-    
-    const matchesRole = filterRole === 'all' || u.role === filterRole
-    const matchesStatus = filterStatus === 'all' || 
-      (filterStatus === 'active' && u.is_active) || 
-      (filterStatus === 'inactive' && !u.is_active)
-
-    return matchesSearch && matchesRole && matchesStatus
-  })
-
   const getUserDisplayName = (user) => {
     if (user.role === 'job_seeker') {
       return `${user.first_name || ''} ${user.last_name || ''}`.trim() || user.email
@@ -107,14 +129,15 @@ const AdminDashboard = () => {
   }
 
   const getStats = () => {
-    const total = users.length
-    const active = users.filter(u => u.is_active).length
-    const inactive = users.filter(u => !u.is_active).length
-    const jobSeekers = users.filter(u => u.role === 'job_seeker').length
-    const employers = users.filter(u => u.role === 'employer').length
-    const admins = users.filter(u => u.role === 'admin').length
-
-    return { total, active, inactive, jobSeekers, employers, admins }
+    const byRole = counts?.by_role || {}
+    return {
+      total: counts?.total || 0,
+      active: counts?.active || 0,
+      inactive: counts?.inactive || 0,
+      jobSeekers: byRole.job_seeker || 0,
+      employers: byRole.employer || 0,
+      admins: byRole.admin || 0
+    }
   }
 
   // Redirect if not admin
@@ -243,14 +266,14 @@ const AdminDashboard = () => {
                   <Input
                     placeholder="Search users by name, email, or company..."
                     value={searchTerm}
-                    onChange={(e) => setSearchTerm(e.target.value)}
+                    onChange={(e) => { setSearchTerm(e.target.value); setPage(1) }}
                     className="pl-9"
                   />
                 </div>
                 
                 <select
                   value={filterRole}
-                  onChange={(e) => setFilterRole(e.target.value)}
+                  onChange={(e) => { setFilterRole(e.target.value); setPage(1) }}
                   className="px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"
                 >
                   <option value="all">All Roles</option>
@@ -261,13 +284,18 @@ const AdminDashboard = () => {
 
                 <select
                   value={filterStatus}
-                  onChange={(e) => setFilterStatus(e.target.value)}
+                  onChange={(e) => { setFilterStatus(e.target.value); setPage(1) }}
                   className="px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"
                 >
                   <option value="all">All Status</option>
                   <option value="active">Active</option>
                   <option value="inactive">Inactive</option>
                 </select>
+
+                <Button variant="outline" onClick={handleExport}>
+                  <Download className="h-4 w-4 mr-1" />
+                  Export CSV
+                </Button>
               </div>
 
               {/* Users Table */}
@@ -284,7 +312,7 @@ const AdminDashboard = () => {
                     </TableRow>
                   </TableHeader>
                   <TableBody>
-                    {filteredUsers.map((u) => (
+                    {users.map((u) => (
                       <TableRow key={u.id}>
                         <TableCell>
                           <div className="flex items-center">
@@ -333,11 +361,23 @@ const AdminDashboard = () => {
                 </Table>
               </div>
 
-              {filteredUsers.length === 0 && (
+              {users.length === 0 && (
                 <div className="text-center py-8 text-gray-500">
                   No users found matching your criteria.
                 </div>
               )}
+
+              {pages > 1 && (
+                <div className="flex justify-between items-center mt-4">
+                  <Button variant="outline" size="sm" disabled={page <= 1} onClick={() => setPage(page - 1)}>
+                    Previous
+                  </Button>
+                  <span className="text-sm text-gray-600">Page {page} of {pages}</span>
+                  <Button variant="outline" size="sm" disabled={page >= pages} onClick={() => setPage(page + 1)}>
+                    Next
+                  </Button>
+                </div>
+              )}
             </CardContent>
           </Card>
         </TabsContent>
@@ -12,8 +12,12 @@ import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, Di
 import { Alert, AlertDescription } from '@/components/ui/alert'
 import { Plus, Edit, Trash2, Users, Eye, Loader2, Calendar } from 'lucide-react'
 
+const JOBS_PER_PAGE = 20
+
 const EmployerDashboard = () => {
   const [jobs, setJobs] = useState([])
+  const [page, setPage] = useState(1)
+  const [pages, setPages] = useState(1)
   const [applications, setApplications] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -34,12 +38,16 @@ const EmployerDashboard = () => {
 
   useEffect(() => {
     fetchJobs()
-  }, [])
+  }, [page])
 
+  // One request returns the page of jobs with their application counts
   const fetchJobs = async () => {
     try {
-      const response = await axios.get('/jobs/my-jobs')
+      const response = await axios.get('/jobs/my-jobs/summary', {
+        params: { page, per_page: JOBS_PER_PAGE }
+      })
       setJobs(response.data.jobs)
+      setPages(response.data.pages || 1)
     } catch (error) {
       console.error('Error fetching jobs:', error)
       setError('Failed to fetch jobs')
@@ -156,6 +164,7 @@ const EmployerDashboard = () => {
       if (currentJob) {
         fetchJobApplications(currentJob.id)
       }
+      fetchJobs()
     } catch (error) {
       console.error('Error updating application status:', error)
       setError('Failed to update application status')
@@ -247,7 +256,7 @@ const EmployerDashboard = () => {
                       onClick={() => fetchJobApplications(job.id)}
                     >
                       <Users className="h-4 w-4 mr-1" />
-                      Applications
+                      Applications ({job.application_total})
                     </Button>
                     <Button
                       variant="outline"
@@ -265,8 +274,15 @@ const EmployerDashboard = () => {
                     </Button>
                   </div>
                 </div>
-                <div className="text-sm text-gray-500">
-                  Posted {new Date(job.created_at).toLocaleDateString()}
+                <div className="flex flex-wrap items-center gap-2 text-sm text-gray-500">
+                  <span className="mr-2">Posted {new Date(job.created_at).toLocaleDateString()}</span>
+                  {Object.entries(job.application_counts)
+                    .filter(([, count]) => count > 0)
+                    .map(([status, count]) => (
+                      <Badge key={status} className={getStatusColor(status)}>
+                        {status}: {count}
+                      </Badge>
+                    ))}
                 </div>
               </CardContent>
             </Card>
@@ -274,6 +290,18 @@ const EmployerDashboard = () => {
         )}
       </div>
 
+      {pages > 1 && (
+        <div className="flex justify-between items-center mt-6">
+          <Button variant="outline" size="sm" disabled={page <= 1} onClick={() => setPage(page - 1)}>
+            Previous
+          </Button>
+          <span className="text-sm text-gray-600">Page {page} of {pages}</span>
+          <Button variant="outline" size="sm" disabled={page >= pages} onClick={() => setPage(page + 1)}>
+            Next
+          </Button>
+        </div>
+      )}
+
       {/* Job Form Dialog */}
       <Dialog open={showJobForm} onOpenChange={setShowJobForm}>
         <DialogContent className="max-w-2xl">
@@ -23,6 +23,7 @@ import {
 const JobSeekerDashboard = () => {
   const [jobs, setJobs] = useState([])
   const [applications, setApplications] = useState([])
+  const [recommended, setRecommended] = useState([])
   const [loading, setLoading] = useState(true)
   const [searchLoading, setSearchLoading] = useState(false)
   const [savingJob, setSavingJob] = useState(null)
@@ -44,6 +45,7 @@ const JobSeekerDashboard = () => {
   useEffect(() => {
     fetchJobs()
     fetchApplications()
+    fetchRecommended()
   }, [])
 
   const fetchJobs = async (filters = {}, page = 1) => {
@@ -90,6 +92,15 @@ const JobSeekerDashboard = () => {
     }
   }
 
+  const fetchRecommended = async () => {
+    try {
+      const response = await axios.get('/jobs/recommended', { params: { limit: 5 } })
+      setRecommended(response.data.jobs)
+    } catch (error) {
+      console.error('Error fetching recommendations:', error)
+    }
+  }
+
   const handleSearch = (e) => {
     e.preventDefault()
     setPagination(prev => ({ ...prev, currentPage: 1 }))
@@ -394,7 +405,36 @@ const JobSeekerDashboard = () => {
         </div>
 
         {/* Applications Sidebar */}
-        <div>
+        <div className="space-y-6">
+          <Card>
+            <CardHeader>
+              <CardTitle>Recommended for You</CardTitle>
+              <CardDescription>Based on your profile and applications</CardDescription>
+            </CardHeader>
+            <CardContent>
+              {recommended.length === 0 ? (
+                <p className="text-gray-500 text-center py-4">
+                  Add your experience and education to your <Link to="/profile" className="text-blue-600 hover:underline">profile</Link> to get recommendations
+                </p>
+              ) : (
+                <div className="space-y-4">
+                  {recommended.map((job) => (
+                    <div key={job.id} className="border-b pb-4 last:border-b-0">
+                      <h4 className="font-medium text-sm">
+                        <Link to={`/job/${job.id}`} className="hover:text-blue-600">
+                          {job.title}
+                        </Link>
+                      </h4>
+                      <p className="text-xs text-gray-500 mt-1">
+                        {job.employer_name} · {job.location}
+                      </p>
+                    </div>
+                  ))}
+                </div>
+              )}
+            </CardContent>
+          </Card>
+
           <Card>
             <CardHeader>
               <CardTitle>My Applications</CardTitle>
@@ -1,11 +1,50 @@
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
 import tailwindcss from '@tailwindcss/vite'
+import fs from 'fs'
 import path from 'path'
+import zlib from 'zlib'
+
+const COMPRESSIBLE = /\.(js|mjs|css|html|svg|json|txt|ico|map)$/
+const MIN_SIZE = 1024
+
+// Writes .br and .gz next to each compressible build file; the Flask server
+// picks them up at startup and serves them by Accept-Encoding.
+function precompress() {
+  let outDir
+  return {
+    name: 'precompress',
+    apply: 'build',
+    configResolved(config) {
+      outDir = path.resolve(config.root, config.build.outDir)
+    },
+    closeBundle() {
+      const walk = (dir) => fs.readdirSync(dir, { withFileTypes: true }).flatMap((entry) =>
+        entry.isDirectory() ? walk(path.join(dir, entry.name)) : [path.join(dir, entry.name)])
+      for (const file of walk(outDir)) {
+        if (!COMPRESSIBLE.test(file)) continue
+        const source = fs.readFileSync(file)
+        if (source.length < MIN_SIZE) continue
+        const variants = {
+          '.br': zlib.brotliCompressSync(source, {
+            params: {
+              [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+              [zlib.constants.BROTLI_PARAM_SIZE_HINT]: source.length,
+            },
+          }),
+          '.gz': zlib.gzipSync(source, { level: zlib.constants.Z_BEST_COMPRESSION }),
+        }
+        for (const [ext, compressed] of Object.entries(variants)) {
+          if (compressed.length < source.length) fs.writeFileSync(file + ext, compressed)
+        }
+      }
+    },
+  }
+}
 
 // https://vite.dev/config/
 export default defineConfig({
-  plugins: [react(),tailwindcss()],
+  plugins: [react(),tailwindcss(),precompress()],
   resolve: {
     alias: {
       "@": path.resolve(__dirname, "./src"),
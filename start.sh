@@ -16,7 +16,8 @@ echo "📦 Checking for gunicorn..."
 # Try to use gunicorn first (production server)
 if command -v gunicorn &> /dev/null; then
     echo "✅ Starting with gunicorn on port $PORT..."
-    exec gunicorn --bind 0.0.0.0:$PORT --workers 1 --timeout 120 src.main:app
+    export PORT WEB_CONCURRENCY=${WEB_CONCURRENCY:-1}
+    exec gunicorn -c gunicorn.conf.py
 else
     echo "⚠️  Gunicorn not found, starting with Flask built-in server on port $PORT..."
     exec python -m src.main